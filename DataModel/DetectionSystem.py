@@ -3,29 +3,50 @@ import cv2
 import tkinter as tk
 import threading
 import time
-import queue
 import numpy as np
 from face_detection import *
 from ultralytics import YOLO
 from deep_sort_realtime.deepsort_tracker import DeepSort
 import torch
 import torch.nn as nn
-from torchvision.transforms import transforms
 from Reid_model import ReIDModel
+from inference_pool import InferencePool, yolo_boxes_to_detections
+from frame_ring import FrameRing
+from motion_gate import MotionGate
+from detection_stride import AdaptiveStride
+from descriptor_index import DescriptorIndex
+from face_mosaic import upper_body_box, build_mosaics, map_mosaic_boxes
+from identity_cache import IdentityCache
+from best_shot import BestShotBuffer
+from face_association import associate_faces
+from face_kalman import BatchedKalmanTracker
+from trajectory import TrajectoryRing
+from track_registry import TrackRegistry
+from capture import CaptureEngine
 
 
 
 class Person:
-    def __init__(self, person_id, x, y, w, h, confidence):
+    """
+    A tracked person. Slotted, with monotonic timestamps and a bounded
+    trajectory, so memory per person stays small and flat on long runs.
+    """
+    __slots__ = ("person_id", "camera_name", "x", "y", "w", "h", "confidence",
+                 "faces", "last_seen", "feature_vector", "trajectory")
+
+    def __init__(self, person_id, x, y, w, h, confidence, camera_name=None, history_size=64):
         self.person_id = person_id
+        self.camera_name = camera_name  # Camera this person was detected in
         self.x = x
         self.y = y
         self.w = w
         self.h = h
         self.confidence = confidence
         self.faces = {}  # Dictionary of faces detected within this person {face_id: Face}
-        self.last_seen = time.time()
+        self.last_seen = time.monotonic()
         self.feature_vector = None  # Re-ID feature vector
+        self.trajectory = TrajectoryRing(history_size)  # Recent (time, x, y, w, h)
+        self.trajectory.append(self.last_seen, x, y, w, h)
 
     def update_position(self, x, y, w, h, confidence):
         self.x = x
@@ -33,7 +54,8 @@ class Person:
         self.w = w
         self.h = h
         self.confidence = confidence
-        self.last_seen = time.time()
+        self.last_seen = time.monotonic()
+        self.trajectory.append(self.last_seen, x, y, w, h)
 
     def add_face(self, face):
         self.faces[face.face_id] = face
@@ -51,7 +73,14 @@ class Person:
 
 
 class Face:
-    def __init__(self, name, x, y, w, h, face_id, confidence, tracker, person_id=None):
+    """
+    A tracked face. Its Kalman filter lives in the DetectionSystem's
+    BatchedKalmanTracker under the same face_id.
+    """
+    __slots__ = ("name", "x", "y", "w", "h", "face_id", "confidence",
+                 "person_id", "last_seen", "trajectory")
+
+    def __init__(self, name, x, y, w, h, face_id, confidence, person_id=None, history_size=64):
         self.name = name
         self.x = x
         self.y = y
@@ -59,31 +88,49 @@ class Face:
         self.h = h
         self.face_id = face_id
         self.confidence = confidence
-        self.tracker = tracker
         self.person_id = person_id  # Link to parent person
-        self.last_seen = time.time()
+        self.last_seen = time.monotonic()
+        self.trajectory = TrajectoryRing(history_size)  # Recent (time, x, y, w, h)
+        self.trajectory.append(self.last_seen, x, y, w, h)
 
     def position_update(self, x, y, w, h):
         self.x = x
         self.y = y
         self.w = w
         self.h = h
-        self.last_seen = time.time()
+        self.last_seen = time.monotonic()
+        self.trajectory.append(self.last_seen, x, y, w, h)
 
-    def position_and_tracker_update(self, x, y, w, h, tracker):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
+
+class CameraState:
+    """Per-camera pipeline state: its frame buffer, person tracker and scheduling credit."""
+    def __init__(self, name, frame_buffer, tracker):
+        self.name = name
+        self.frame_buffer = frame_buffer
         self.tracker = tracker
-        self.last_seen = time.time()
+        self.credit = 0.0          # Scheduling credit, cameras with the most go first
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.last_dropped = 0      # Frames dropped right before the last frame taken
+        self.last_seq = -1         # Frame ring sequence number of the last frame taken
+        self.last_skipped = 0      # Producer's skipped-frame count at the last frame taken
+        self.person_keys = set()   # tracked_persons keys seen in the last processed frame
 
 
 class DetectionSystem:
-    def __init__(self, db_path="Faces_db", video_path="test_videos/3.mov"):
+    def __init__(self, db_path="Faces_db", video_path="test_videos/3.mov", camera_buffers=None,
+                 use_process_pool=False, num_workers=None):
         """
         Initialize the entire detection system.
         All global variables and configurations become instance attributes.
+
+        'camera_buffers' is a {camera_name: FrameRing} dict such as
+        MainWindow.camera_buffers. One pipeline serves all of them; cameras
+        added to the dict later are picked up automatically. Without it, the
+        system reads 'video_path' itself as a single camera.
+
+        With 'use_process_pool', person detection and face recognition run in
+        'num_workers' worker processes fed through shared memory rings.
         """
         print("[INFO] Initializing Detection System...")
         
@@ -96,30 +143,93 @@ class DetectionSystem:
         self.CONFIDENCE_THRESHOLD = 0.6
         self.MIN_FACE_SIZE = (120, 120)
         self.PERSON_CONFIDENCE_THRESHOLD = 0.5
+        self.REID_INPUT_SIZE = (128, 256)  # (width, height) expected by ReIDModel
+        self.REID_MAX_BATCH = 32           # Flush pending Re-ID crops at this batch size
+        self.REID_MAX_DELAY = 0.1          # ... or once the oldest crop has waited this long (s)
+        self.MAX_CAMERAS_PER_BATCH = 16    # Frames per batched YOLO call
+        self.CAMERA_SCHEDULING = "round_robin"  # or "motion" to favour cameras with activity
+        self.MIN_MOTION_WEIGHT = 0.1       # Share of turns a static camera still gets
+        self.USE_PROCESS_POOL = use_process_pool
+        self.NUM_INFERENCE_WORKERS = num_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.MOTION_GATING = True          # Skip detection on frames without motion
+        self.MAX_DETECTION_STRIDE = 5      # Detect at least every Nth frame, Kalman predictions in between
+        self.FACE_REGION_FRACTION = 0.5    # Top part of a person box searched for faces
+        self.FACE_MOSAIC_CELL = 192        # Cell size of the face detection mosaic (px)
+        self.FACE_MOSAIC_GRID = (4, 4)     # Cells per mosaic (columns, rows)
+        self.IDENTITY_TTL = 30.0           # Re-verify a recognized track at least this often (s)
+        self.IDENTITY_HALF_LIFE = 10.0     # Half-life of a cached identity's confidence margin (s)
+        self.IDENTITY_MIN_MARGIN = 0.1     # Re-verify once the decayed margin drops below this
+        self.IDENTITY_MAX_DRIFT = 0.3      # Re-verify if the Re-ID embedding drifts further (cosine)
+        self.UNKNOWN_RETRY_INTERVAL = 1.0  # Seconds between recognition attempts of unknown tracks
+        self.BEST_SHOT_TOP_K = 3           # Best crops kept per face track
+        self.BEST_SHOT_WINDOW = 0.5        # Seconds of crops compared before recognizing the best one
+        self.BEST_SHOT_MAX_FRAMES = 12     # ... or this many crops, whichever comes first
+        # Crops below this quality are only recognized when a track has no
+        # better one for BEST_SHOT_FALLBACK_WINDOWS windows. The score is
+        # sharpness * 0.5 + entropy * 50 + size * 50, so a well exposed crop
+        # (~6-7 bits of entropy) needs little sharpness to pass, while blurred,
+        # dark or low-contrast crops score well below it
+        self.BEST_SHOT_MIN_QUALITY = 300.0
+        self.BEST_SHOT_FALLBACK_WINDOWS = 3  # ... unless a track had no better crop for this many windows
+        self.FACE_ASSOCIATION = "hungarian"  # or "greedy" to link new faces to previous ones
+        self.FACE_FEATURE_MATCH_SCORE = 0.4  # ORB match score below which a new face takes a live face's name
+        self.TRAJECTORY_LENGTH = 64        # Boxes of history kept per person and face
+        self.PERSON_TIMEOUT = 2.0          # Remove persons not seen for this long (s)
+        self.PERSON_TRACKING_MAX_AGE = 30  # DeepSort: frames a track survives without a match
+        self.PERSON_TRACKING_N_INIT = 3    # DeepSort: matches before a track is confirmed
+        self.FRAME_QUEUE_SIZE = 4          # Frame slots of the internal video source's ring
+        self.ANALYTICS_MAX_SIZE = None     # e.g. (960, 540) to scale frames of the internal source down
+        self.STATS_REPORT_INTERVAL = 30.0  # Seconds between watchdog statistics reports
         # ... (all other config constants) ...
         
         # --- Threading & State ---
-        self.frame_queue = queue.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+        self.frame_ring = FrameRing(slots=self.FRAME_QUEUE_SIZE)  # Frames of the internal video source
         self.stop_event = threading.Event()
         self.lock = threading.Lock()
-        self.last_frame_buffer = {"frame": None, "timestamp": 0.0}
+
+        # --- Cameras ---
+        # With no external buffers, the internal video thread is the only camera
+        self.owns_source = camera_buffers is None
+        self.camera_buffers = {"default": self.frame_ring} if camera_buffers is None else camera_buffers
+        self.camera_states = {}  # camera name -> CameraState
+        # One motion measure serves both detection gating and "motion" scheduling
+        use_motion = self.MOTION_GATING or self.CAMERA_SCHEDULING == "motion"
+        self.motion_gate = MotionGate() if use_motion else None
+        self.identity_cache = IdentityCache(
+            distance_threshold=RECOGNITION_DISTANCE_THRESHOLD, ttl=self.IDENTITY_TTL,
+            half_life=self.IDENTITY_HALF_LIFE, min_margin=self.IDENTITY_MIN_MARGIN,
+            max_drift=self.IDENTITY_MAX_DRIFT, unknown_ttl=self.UNKNOWN_RETRY_INTERVAL)
+        self.best_shots = BestShotBuffer(
+            top_k=self.BEST_SHOT_TOP_K, window=self.BEST_SHOT_WINDOW,
+            max_frames=self.BEST_SHOT_MAX_FRAMES, min_quality=self.BEST_SHOT_MIN_QUALITY,
+            fallback_windows=self.BEST_SHOT_FALLBACK_WINDOWS)
+        # Predicted frames age DeepSort tracks, so the stride must stay below max_age
+        self.detection_stride = AdaptiveStride(
+            max_stride=min(self.MAX_DETECTION_STRIDE, self.PERSON_TRACKING_MAX_AGE - 1))
 
         # --- Tracked Data ---
-        self.tracked_persons = {}  # Was global 'tracked_persons'
-        self.identified_faces = {} # Was global 'identified_faces'
+        self.track_registry = TrackRegistry()  # Indexes persons and faces for cheap eviction
+        self.tracked_persons = self.track_registry.persons  # (camera_name, track_id) -> Person
+        self.identified_faces = self.track_registry.faces   # Was global 'identified_faces'
+        self.face_tracker = BatchedKalmanTracker()  # Kalman filters of all faces, stepped together
+        self.face_descriptors = DescriptorIndex()   # ORB descriptors of all live faces
         self.next_face_id = 0
         self.next_person_id = 0
         
         # ... (other 'global' variables) ...
         self.yolo_detect_face = []
         self.frame_count = 0
+        self.reid_pending = []  # (person_obj, person_crop, enqueue_time) awaiting Re-ID
+        self.pending_recognitions = {}  # face_id -> (face crop, quality) sent to the inference pool
 
         # --- Models ---
         self.yolo_model = None
         self.yolo_face_model = None
         self.reid_model = None
-        self.person_tracker = None
-        self.face_cascade = None
+        self.reid_device = None
+        self.reid_mean = None
+        self.reid_std = None
+        self.inference_pool = None
         
         self.initialize_models() # Call helper method to load models
         
@@ -141,17 +251,23 @@ class DetectionSystem:
         print("[INFO] Starting all threads...")
         self.stop_event.clear()
 
-        self.cam_thread = threading.Thread(target=self.camera_thread_function)
-        self.cam_thread.daemon = True
-        self.cam_thread.start()
+        if self.inference_pool is not None:
+            self.inference_pool.start()
+
+        if self.owns_source:
+            self.cam_thread = threading.Thread(target=self.camera_thread_function)
+            self.cam_thread.daemon = True
+            self.cam_thread.start()
 
         self.proc_thread = threading.Thread(target=self.processing_thread_function)
         self.proc_thread.daemon = True
         self.proc_thread.start()
 
-        self.disp_thread = threading.Thread(target=self.display_thread_function)
-        self.disp_thread.daemon = True
-        self.disp_thread.start()
+        if self.owns_source:
+            # With external buffers the caller (e.g. MainWindow) shows the feeds
+            self.disp_thread = threading.Thread(target=self.display_thread_function)
+            self.disp_thread.daemon = True
+            self.disp_thread.start()
 
         self.watchdog_thread = threading.Thread(target=self.watchdog_thread_function)
         self.watchdog_thread.daemon = True
@@ -171,260 +287,712 @@ class DetectionSystem:
             self.disp_thread.join(timeout=2.0)
         if self.watchdog_thread:
             self.watchdog_thread.join(timeout=2.0)
-            
-        cv2.destroyAllWindows()
+
+        if self.inference_pool is not None:
+            self.inference_pool.close()
+
+        # Faces added since the last debounced cache write
+        flush_face_gallery()
+
+        if self.owns_source:
+            # Only the standalone mode opens its own windows
+            cv2.destroyAllWindows()
         print("[INFO] System shut down.")
     
     def initialize_models(self):
         """Initialize and load all models."""
         # Note: 'global' keywords are gone. We use 'self.'
-        self.yolo_model = YOLO("yolov8n.pt")
+        if self.USE_PROCESS_POOL:
+            # Person detection and recognition run in the worker processes
+            self.inference_pool = InferencePool(self.NUM_INFERENCE_WORKERS,
+                                                person_model="yolov8n.pt",
+                                                person_confidence=self.PERSON_CONFIDENCE_THRESHOLD)
+        else:
+            self.yolo_model = YOLO("yolov8n.pt")
         self.yolo_face_model = YOLO("yolov11n-face.pt")
         
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.reid_model = ReIDModel().to(device)
+        # Re-ID model plus its normalization constants, created once and reused
+        self.reid_device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.reid_model = ReIDModel().to(self.reid_device)
         self.reid_model.eval()
+        self.reid_mean = torch.tensor([0.485, 0.456, 0.406], device=self.reid_device).view(1, 3, 1, 1)
+        self.reid_std = torch.tensor([0.229, 0.224, 0.225], device=self.reid_device).view(1, 3, 1, 1)
 
-        self.person_tracker = DeepSort(max_age=self.PERSON_TRACKING_MAX_AGE, 
-                                       n_init=self.PERSON_TRACKING_N_INIT)
-        
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
         print("[INFO] Models loaded.")
-    
-    def extract_person_features(self,person_crop):
-        
-        """Extract Re-ID features from person crop"""
-        
-        reid_model = self.reid_model
+
+    def create_person_tracker(self):
+        """Create a DeepSort tracker. Every camera gets its own."""
+        return DeepSort(max_age=self.PERSON_TRACKING_MAX_AGE,
+                        n_init=self.PERSON_TRACKING_N_INIT)
+
+    def detect_persons_yolo(self, frame):
+        """Detect persons in a single frame."""
+        return self.detect_persons_yolo_batch([frame])[0]
+
+    def detect_persons_yolo_batch(self, frames):
+        """
+        Detect persons in frames from several cameras with one YOLO call.
+        Returns: one list of DeepSort detections ([x, y, w, h], confidence, class)
+        per input frame
+        """
+        if not frames:
+            return []
+
         try:
-            if person_crop.shape[0] == 0 or person_crop.shape[1] == 0:
-                return None
+            results = self.yolo_model(frames, classes=[0], conf=self.PERSON_CONFIDENCE_THRESHOLD, verbose=False)
+        except Exception as e:
+            print(f"Error detecting persons: {e}")
+            return [[] for _ in frames]
+
+        return [yolo_boxes_to_detections(result.boxes) for result in results]
+    
+    def extract_person_features(self, person_crop):
+        """Extract Re-ID features from a single person crop"""
+        return self.extract_person_features_batch([person_crop])[0]
 
-            # Preprocess for Re-ID model
-            preprocess = transforms.Compose([
-                transforms.ToPILImage(),
-                transforms.Resize((256, 128)),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-            ])
+    def extract_person_features_batch(self, person_crops):
+        """
+        Extract Re-ID features for many person crops with one forward pass.
+        Crops are resized into a single preallocated batch and normalized
+        in one vectorized step on the model's device.
+        Returns: list of feature vectors in input order (None for empty crops)
+        """
+        features = [None] * len(person_crops)
+        valid = [i for i, crop in enumerate(person_crops)
+                 if crop is not None and crop.shape[0] > 0 and crop.shape[1] > 0]
+        if not valid:
+            return features
 
-            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            processed_image = preprocess(cv2.cvtColor(person_crop, cv2.COLOR_BGR2RGB))
-            processed_image = processed_image.unsqueeze(0).to(device)
+        try:
+            width, height = self.REID_INPUT_SIZE
+            batch = np.empty((len(valid), height, width, 3), dtype=np.uint8)
+            for slot, i in enumerate(valid):
+                crop = person_crops[i]
+                # Antialias when shrinking, like the PIL resize the model was trained with
+                shrinking = crop.shape[1] > width or crop.shape[0] > height
+                cv2.resize(crop, (width, height), dst=batch[slot],
+                           interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR)
+
+            # BGR -> RGB, NHWC -> NCHW, scale to [0, 1] and normalize
+            images = torch.from_numpy(batch[..., ::-1].copy()).to(self.reid_device)
+            images = images.permute(0, 3, 1, 2).float().div_(255.0)
+            images = (images - self.reid_mean) / self.reid_std
 
             with torch.no_grad():
-                features = reid_model(processed_image)
+                output = self.reid_model(images)
 
-            return features.squeeze().cpu().numpy()
+            output = output.reshape(len(valid), -1).cpu().numpy()
+            for slot, i in enumerate(valid):
+                features[i] = output[slot]
 
         except Exception as e:
             print(f"Error extracting person features: {e}")
-            return None
-    
+
+        return features
+
+    def queue_person_features(self, person_obj, person_crop):
+        """Queue a person crop for the next batched Re-ID pass."""
+        # Copy: the frame the crop points into may be reused before the flush
+        self.reid_pending.append((person_obj, person_crop.copy(), time.time()))
+
+    def flush_person_features(self, force=False):
+        """
+        Run Re-ID on the queued crops once the batch is full or the oldest
+        crop has waited REID_MAX_DELAY seconds.
+        """
+        if not self.reid_pending:
+            return
+        if (not force and len(self.reid_pending) < self.REID_MAX_BATCH
+                and time.time() - self.reid_pending[0][2] < self.REID_MAX_DELAY):
+            return
+
+        pending = self.reid_pending[:self.REID_MAX_BATCH]
+        self.reid_pending = self.reid_pending[self.REID_MAX_BATCH:]
+
+        features = self.extract_person_features_batch([crop for _, crop, _ in pending])
+        for (person_obj, _, _), feature_vector in zip(pending, features):
+            if feature_vector is not None:
+                person_obj.feature_vector = feature_vector
+
+    def detect_faces_in_persons(self, face_jobs):
+        """
+        Detect faces in the upper bodies of many persons with one batched
+        face model call. The upper-body crops are tiled into mosaics, so only
+        the regions where faces can be are scanned.
+        'face_jobs' is a list of (frame, person_key, person_box).
+        Returns: list of face boxes (x, y, w, h) in frame coordinates, per job
+        """
+        face_boxes = [[] for _ in face_jobs]
+        crops, origins = [], []
+        for job_index, (frame, _, person_box) in enumerate(face_jobs):
+            region = upper_body_box(person_box, frame.shape, self.FACE_REGION_FRACTION)
+            if region is None:
+                continue
+            x1, y1, x2, y2 = region
+            crops.append(frame[y1:y2, x1:x2])
+            origins.append((job_index, x1, y1))
+
+        if not crops:
+            return face_boxes
+
+        mosaics = build_mosaics(crops, self.FACE_MOSAIC_CELL, self.FACE_MOSAIC_GRID)
+        try:
+            results = self.yolo_face_model([mosaic for mosaic, _ in mosaics], verbose=False)
+        except Exception as e:
+            print(f"Error detecting faces: {e}")
+            return face_boxes
+
+        for (_, placements), result in zip(mosaics, results):
+            mapped = map_mosaic_boxes(result.boxes.xyxy.cpu().numpy(), result.boxes.conf.cpu().numpy(),
+                                      placements, self.FACE_MOSAIC_CELL)
+            for crop_index, boxes in mapped.items():
+                job_index, x1, y1 = origins[crop_index]
+                for bx1, by1, bx2, by2, _ in boxes:
+                    fx, fy = x1 + int(bx1), y1 + int(by1)
+                    face_boxes[job_index].append((fx, fy, x1 + int(bx2) - fx, y1 + int(by2) - fy))
+
+        return face_boxes
+
+    def process_faces(self, face_jobs):
+        """
+        Detect the faces of all persons collected in a tick and attach them
+        to their parent Person.
+        'face_jobs' is a list of (frame, person_key, person_box).
+        """
+        shots = []  # (face, face_crop, frame_shape) of every face found in this tick
+        corrections = []  # (face_id, measured box) of every re-associated face
+
+        # Predict where every face of these persons is now, so new detections
+        # are associated with the predicted boxes rather than the last ones
+        previous_ids = [face.face_id for _, person_key, _ in face_jobs
+                        for face in self.track_registry.faces_of(person_key) if face.face_id in self.face_tracker]
+        predicted = dict(zip(previous_ids, self.face_tracker.predict(previous_ids))) if previous_ids else {}
+
+        for (frame, person_key, _), face_boxes in zip(face_jobs, self.detect_faces_in_persons(face_jobs)):
+            person_obj = self.tracked_persons.get(person_key)
+            if person_obj is None:
+                continue
+
+            face_ids = self.process_faces_in_person(frame, person_key, face_boxes, shots, corrections, predicted)
+            print(f"[{person_key[0]}] Returned face id to person-{person_key[1]} is {face_ids}")
+            # Update person's faces
+            person_obj.faces = {fid: self.identified_faces[fid] for fid in face_ids if fid in self.identified_faces}
+
+        # Correct the (already predicted) filters of every re-associated face at
+        # once and move the faces to the filtered boxes
+        corrections = [(face_id, box) for face_id, box in corrections if face_id in predicted]
+        if corrections:
+            face_ids = [face_id for face_id, _ in corrections]
+            self.apply_face_boxes(face_ids, self.face_tracker.correct(face_ids, [box for _, box in corrections]))
+
+        # Score every face crop of the tick in one batch
+        if shots:
+            qualities = calculate_face_quality_batch([crop for _, crop, _ in shots],
+                                                     [shape for _, _, shape in shots])
+            for (face, face_crop, _), quality in zip(shots, qualities):
+                self.offer_face_shot(face, face_crop, float(quality))
+
+    def carry_faces(self, carried, predicted_faces):
+        """
+        Move the faces that were not detected in this tick along their Kalman
+        filters: 'carried' (face_id, box) pairs are stepped with the box as
+        the measurement, 'predicted_faces' are only predicted.
+        """
+        carried = [(face_id, box) for face_id, box in carried if face_id in self.face_tracker]
+        if carried:
+            face_ids = [face_id for face_id, _ in carried]
+            self.apply_face_boxes(face_ids, self.face_tracker.step(face_ids, [box for _, box in carried]))
+
+        predicted_faces = [face_id for face_id in predicted_faces if face_id in self.face_tracker]
+        if predicted_faces:
+            self.apply_face_boxes(predicted_faces, self.face_tracker.predict(predicted_faces))
+
+    def apply_face_boxes(self, face_ids, boxes):
+        """Move faces to their Kalman filter boxes, (K, 4) as (x, y, w, h)."""
+        for face_id, box in zip(face_ids, np.rint(boxes).astype(int)):
+            face = self.identified_faces.get(face_id)
+            if face is not None:
+                face.position_update(*map(int, box))
+
+    def process_faces_in_person(self, frame, person_id, face_boxes, shots, corrections, predicted):
+        """
+        Track the faces detected inside one person's bounding box. Detections
+        are associated with the person's earlier faces at their Kalman
+        predictions ('predicted', {face_id: box}), falling back to the last
+        box. Re-associated faces are added to 'corrections' as
+        (face_id, box) for the batched Kalman update, which moves them.
+        Only persons without a valid cached identity get here, so every face
+        found is (re-)recognized from the best crop of a short window: its
+        crop is added to 'shots' as (face, face_crop, frame_shape). Face
+        crops are sliced straight out of the frame and handed to recognition
+        as arrays, so nothing is written to disk.
+        Returns: list of face ids belonging to this person
+        """
+        previous_faces = self.track_registry.faces_of(person_id)
+        face_boxes = [box for box in face_boxes if box[2] > 0 and box[3] > 0]
+        face_ids = []
+
+        # Re-associate all faces with the ones this person already had at once
+        previous_boxes = [predicted.get(face.face_id, (face.x, face.y, face.w, face.h)) for face in previous_faces]
+        matches = dict(associate_faces(face_boxes, previous_boxes, method=self.FACE_ASSOCIATION))
+
+        for box_index, (fx, fy, fw, fh) in enumerate(face_boxes):
+            # A view, not a copy: the crop flows straight from the frame buffer
+            face_crop = frame[fy:fy + fh, fx:fx + fw]
+            matched_face = previous_faces[matches[box_index]] if box_index in matches else None
+
+            if matched_face is not None:
+                corrections.append((matched_face.face_id, (fx, fy, fw, fh)))
+                shots.append((matched_face, face_crop, frame.shape))
+
+                face_ids.append(matched_face.face_id)
+                continue
+
+            # New face: start a Kalman track and recognize it
+            face_id = self.next_face_id
+            self.next_face_id += 1
+            self.face_tracker.add(face_id, (fx, fy, fw, fh))
+            face = Face("Unknown", fx, fy, fw, fh, face_id, 1.0, person_id=person_id,
+                        history_size=self.TRAJECTORY_LENGTH)
+            self.track_registry.add_face(face)
+
+            # A face that looks like a live, recognized one (e.g. its person
+            # was re-tracked under a new id) shows that name until recognized
+            _, descriptors = extract_face_features(face_crop)
+            if descriptors is not None:
+                known_id, score = match_face_features(descriptors, self.face_descriptors)
+                known_face = self.identified_faces.get(known_id)
+                if known_face is not None and known_face.name != "Unknown" and score < self.FACE_FEATURE_MATCH_SCORE:
+                    face.name, face.confidence = known_face.name, known_face.confidence
+                self.face_descriptors.add(face_id, descriptors)
+            face_ids.append(face_id)
+
+            shots.append((face, face_crop, frame.shape))
+
+        return face_ids
+
+    def offer_face_shot(self, face, face_crop, quality):
+        """
+        Add a scored crop to the face's best-shot window and recognize the
+        best crop of the window once it is complete.
+        """
+        if face.face_id in self.pending_recognitions:
+            return  # A recognition of this face is already in flight
+
+        if self.best_shots.add(face.face_id, face_crop, quality):
+            best_crop, best_quality = self.best_shots.pop(face.face_id)
+            if best_crop is not None:
+                self.request_recognition(face, best_crop, best_quality)
+
+    def request_recognition(self, face, face_crop, quality):
+        """
+        Recognize a face crop. Without a process pool this happens inline;
+        with one, the crop is sent to a worker and the result is applied by
+        apply_pool_recognitions.
+        """
+        if self.inference_pool is None:
+            name, confidence = recognize_face(face_crop)
+            self.apply_recognition(face, name, confidence, face_crop, quality)
+            return
+
+        self.inference_pool.submit_recognition(face.face_id, face_crop)
+        # Keep the crop for the database update once the name comes back
+        self.pending_recognitions[face.face_id] = (face_crop, quality)
+
+    def apply_pool_recognitions(self):
+        """Apply the recognitions the worker processes have finished."""
+        for face_id, name, confidence in self.inference_pool.poll_recognitions():
+            face_crop, quality = self.pending_recognitions.pop(face_id, (None, None))
+            face = self.identified_faces.get(face_id)
+            if face is None or name is None:
+                continue  # Face already gone, or recognition failed
+            self.apply_recognition(face, name, confidence, face_crop, quality)
+
+    def apply_recognition(self, face, name, confidence, face_crop, quality):
+        """Store a recognition result and keep the best shots of known users."""
+        face.name = name
+        face.confidence = confidence
+
+        # Reuse the identity for this track until it needs re-verification
+        person_obj = self.tracked_persons.get(face.person_id)
+        if person_obj is not None:
+            self.identity_cache.store(face.person_id, name, confidence, person_obj.feature_vector)
+
+        if (name != "Unknown" and face_crop is not None
+                and face_crop.shape[1] >= self.MIN_FACE_SIZE[0] and face_crop.shape[0] >= self.MIN_FACE_SIZE[1]):
+            # Fallback crops are good enough to recognize, not to become references
+            if quality > QUALITY_THRESHOLD and quality >= self.BEST_SHOT_MIN_QUALITY:
+                update_user_faces(name, face_crop, quality)
+
     def camera_thread_function(self):
         """Thread function to capture frames from camera."""
         
-        video_path = os.path.join("test_videos", "1.mp4")
+        video_path = self.video_path
         print(f"[THREAD] Video thread started, attempting to open: {video_path}")
 
-        # Initialize video capture with the file path instead of camera index (0)
-        cap = cv2.VideoCapture(video_path)
-
-        delay_s = 0.04  # Corresponds to your original ~25 FPS rate
+        # Frames larger than the screen (or the analytics size) are scaled
+        # down straight into the ring
+        max_size = self.get_screen_resolution()
+        if self.ANALYTICS_MAX_SIZE is not None:
+            max_size = (min(max_size[0], self.ANALYTICS_MAX_SIZE[0]), min(max_size[1], self.ANALYTICS_MAX_SIZE[1]))
+        capture = CaptureEngine(video_path, max_size=max_size)
 
-        if not cap.isOpened():
+        if not capture.open():
             print(f"Error: Could not open video file at {video_path}. Check the path and file integrity.")
             self.stop_event.set()
             return
 
-        # --- Get Original Video Dimensions ---
-        original_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        original_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        original_width, original_height = capture.frame_size
         print(f"Video Original Resolution: {original_width}x{original_height}")
 
-        # Get the resolution once
-        max_screen_width, max_screen_height = self.get_screen_resolution()
-
-        target_width = original_width
-        target_height = original_height
-
-        if original_width > max_screen_width or original_height > max_screen_height:
-            # Only scale down if the video is too large for the screen/limit
-            scale_w = max_screen_width / original_width
-            scale_h = max_screen_height / original_height
-            scale_factor = min(scale_w, scale_h)
-
-            target_width = int(original_width * scale_factor)
-            target_height = int(original_height * scale_factor)
-
+        # Grab every frame, paced by the video's timestamps, but only decode
+        # one once the processing thread has taken the previous frame
         while not self.stop_event.is_set():
-            ret, frame = cap.read()
-            # For testing - you can uncomment the next two lines to use static image
-            # image_path = "E:\Campus\Data_Management_project\iiro.jpg"
-            # frame = cv2.imread(image_path, cv2.IMREAD_COLOR)
-
-            if not ret:
-                # Check if we reached the end of the video
-                if not frame is None:  # frame is None might happen if reading failed initially
-                    print("Error: Failed to capture frame.")
-                    time.sleep(0.1)
-                    continue
-                else:
-                    print("Info: Reached end of video file.")
-                    # Option 2: Stop the thread (recommended for processing a single video)
-                    break
-
-            if target_width != original_width or target_height != original_height:
-                frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_AREA)
-
-            # Always update the shared buffer
-            with self.lock:
-                self.last_frame_buffer["frame"] = frame.copy()
-                self.last_frame_buffer["timestamp"] = time.time()
-
-            # If queue is full, remove oldest frame
-            if self.frame_queue.full():
-                try:
-                    self.frame_queue.get_nowait()
-                except:
-                    pass
-
-            # Add new frame to queue
-            try:
-                self.frame_queue.put(frame, block=False)
-            except:
-                pass
+            if not capture.grab():
+                print("Info: Reached end of video file.")
+                break
 
-            time.sleep(0.04)  # ~25 FPS capture
+            if self.frame_ring.wants_frame():
+                capture.retrieve(self.frame_ring)
 
-        cap.release()
-        print("[THREAD] Camera thread stopped")
+        capture.release()
+        print(f"[THREAD] Camera thread stopped, decoded {capture.decode_ratio():.0%} of frames")
     
   
-    def processing_thread_function(self):
-        """Enhanced thread function to process frames with person and face detection"""
-        print("[THREAD] Processing thread started")
+    def sync_camera_states(self):
+        """Create state for newly added camera buffers and drop removed ones."""
+        for name, frame_buffer in list(self.camera_buffers.items()):
+            state = self.camera_states.get(name)
+            if state is None or state.frame_buffer is not frame_buffer:
+                self.camera_states[name] = CameraState(name, frame_buffer, self.create_person_tracker())
+
+        for name in list(self.camera_states):
+            if name not in self.camera_buffers:
+                del self.camera_states[name]
+                if self.motion_gate is not None:
+                    self.motion_gate.forget(name)
+                self.detection_stride.forget(name)
+
+    def grab_latest_frame(self, state):
+        """
+        Take a view of a camera's newest frame (or None). The frame stays
+        pinned in its ring until release_frames is called.
+        """
+        seq, frame = state.frame_buffer.get_latest(state.last_seq, timeout=0)
+        if seq is None:
+            return None
+        # Frames published but overwritten before we read them, plus frames
+        # the producer grabbed but never published (not decoded)
+        skipped = state.frame_buffer.skipped_count(seq) or 0
+        if state.last_seq >= 0:
+            state.last_dropped = seq - state.last_seq - 1 + max(0, skipped - state.last_skipped)
+        else:
+            state.last_dropped = 0
+        state.frames_dropped += state.last_dropped
+        state.last_seq = seq
+        state.last_skipped = skipped
+        return frame
+
+    def release_frames(self, batch, seqs):
+        """Hand the frames of a tick back to their rings. 'seqs' holds each frame's sequence number."""
+        for (state, _), seq in zip(batch, seqs):
+            state.frame_buffer.release(seq)
+
+    def schedule_cameras(self):
+        """
+        Pick up to MAX_CAMERAS_PER_BATCH cameras with a pending frame for this tick.
+        Every waiting camera earns credit each tick (1 in round-robin mode, its
+        MotionGate activity in "motion" mode) and the cameras with the most credit are
+        served first, so busy cameras are favoured but none of them starves.
+        Returns: list of (CameraState, frame)
+        """
+        self.sync_camera_states()
+        weighted = self.CAMERA_SCHEDULING == "motion"
+
+        ready = [state for state in self.camera_states.values() if state.frame_buffer.has_new(state.last_seq)]
+        for state in ready:
+            state.credit += self.motion_gate.activity(state.name, self.MIN_MOTION_WEIGHT) if weighted else 1.0
+        ready.sort(key=lambda state: state.credit, reverse=True)
+
+        batch = []
+        for state in ready[:self.MAX_CAMERAS_PER_BATCH]:
+            frame = self.grab_latest_frame(state)
+            if frame is None:
+                continue
+            state.credit = 0.0
+            batch.append((state, frame))
 
-        global next_person_id, tracked_persons, person_tracker
+        return batch
 
-        frame_count = 0
-        temp_face_path = "temp_face.jpg"
-        last_processed_time = time.time()
+    def processing_thread_function(self):
+        """
+        Enhanced thread function to process frames with person and face detection.
+        Each tick takes the latest frame of the scheduled cameras and runs one
+        batched YOLO call across all of them before tracking each camera.
+
+        With the inference pool, ticks are pipelined: tick N+1 is scheduled and
+        its frames are queued to the workers before tick N's detections are
+        collected and tracked, so the coordinator tracks one tick while the
+        workers detect the next. Each frame stays pinned until its tick finishes.
+        """
+        print("[THREAD] Processing thread started")
 
+        pending = []  # Begun ticks as [batch, frame seqs, tick], oldest first
         while not self.stop_event.is_set():
+            batch = []
             try:
-                if self.frame_queue.qsize() > 5:
-                    # Discard frame if queue is backed up
-                    frame = self.frame_queue.get(timeout=0.01)
-                    print("[INFO] Processing thread skipping frame to reduce backlog.")
-                    continue  # Skip all processing and grab the next frame immediately
-
-                    # Normal frame retrieval
-                frame = self.frame_queue.get(timeout=1.0)
-                last_processed_time = time.time()
-                frame_count += 1
-
-                # 1. Detect persons using YOLO
-                person_detections = self.detect_persons_yolo(frame)
-
-                # 2. Update person tracker
-                tracks = person_tracker.update_tracks(person_detections, frame=frame)
-
-                # 3. Process tracked persons
-                current_tracked_persons = {}
-
-                for track in tracks:
-                    if not track.is_confirmed():
-                        continue
-
-                    track_id = track.track_id
-                    ltrb = track.to_ltrb()
-                    px, py, px2, py2 = map(int, ltrb)
-                    pw, ph = px2 - px, py2 - py
-
-                    # Update or create person object
-                    if track_id in tracked_persons:
-                        person_obj = tracked_persons[track_id]
-                        person_obj.update_position(px, py, pw, ph,
-                                                track.confidence if hasattr(track, 'confidence') else 0.8)
-                    else:
-                        person_obj = Person(track_id, px, py, pw, ph,
-                                            track.confidence if hasattr(track, 'confidence') else 0.8)
-                        tracked_persons[track_id] = person_obj
-
-                        # Extract Re-ID features
-                        person_crop = frame[py:py + ph, px:px + pw]
-                        features = self.extract_person_features(person_crop)
-                        if features is not None:
-                            person_obj.feature_vector = features
-
-                    current_tracked_persons[track_id] = person_obj
-
-                    # 4. Process faces within this person
-                    face_ids = self.process_faces_in_person(frame, (px, py, pw, ph), track_id, temp_face_path)
-                    print(f"Returned face id to person-{track_id} is {face_ids}")
-                    # face_ids = []
-                    # Update person's faces
-                    person_obj.faces = {fid: self.identified_faces[fid] for fid in face_ids if fid in self.identified_faces}
-
-                # 5. Clean up old persons and faces
-                with self.lock:
-                    # Remove persons not seen in current frame
-                    persons_to_remove = []
-                    for person_id, person_obj in tracked_persons.items():
-                        if person_id not in current_tracked_persons:
-                            if time.time() - person_obj.last_seen > 2.0:  # Remove if not seen for 2 seconds
-                                persons_to_remove.append(person_id)
-
-                    for person_id in persons_to_remove:
-                        # Remove associated faces
-                        faces_to_remove = [fid for fid, face in self.identified_faces.items() if face.person_id == person_id]
-                        for face_id in faces_to_remove:
-                            del self.identified_faces[face_id]
-                        del tracked_persons[person_id]
-
-            except queue.Empty:
-                time.sleep(0.1)
-                continue
+                batch = self.schedule_cameras()
+                if batch:
+                    pending.append([batch, [state.last_seq for state, _ in batch], None])
+                    pending[-1][2] = self.begin_batch(batch)
+
+                # Keep the newest tick in flight while the pool detects it
+                in_flight = 1 if self.inference_pool is not None and batch else 0
+                while len(pending) > in_flight:
+                    oldest_batch, seqs, tick = pending.pop(0)
+                    try:
+                        if tick is not None:
+                            self.finish_batch(tick)
+                    finally:
+                        self.release_frames(oldest_batch, seqs)
+
+                if not batch:
+                    time.sleep(0.01)
+
             except Exception as e:
                 print(f"Error in processing thread: {e}")
                 time.sleep(0.1)
 
-        # Clean up
-        if os.path.exists(temp_face_path):
-            try:
-                os.remove(temp_face_path)
-            except:
-                pass
-
+        for batch, seqs, _ in pending:
+            self.release_frames(batch, seqs)
         print("[THREAD] Processing thread stopped")
-    
-        
+
+    def process_batch(self, batch):
+        """Run one tick of the pipeline over a list of (CameraState, frame)."""
+        self.finish_batch(self.begin_batch(batch))
+
+    def begin_batch(self, batch):
+        """
+        Start a tick: decide which cameras need detection and start it.
+        Nothing here touches the trackers, so a later tick can begin before
+        an earlier one is finished.
+        Returns: tick to pass to finish_batch
+        """
+        # 0. Skip detection on cameras whose scene has not changed
+        coasted = []
+        if self.MOTION_GATING:
+            active = []
+            for state, frame in batch:
+                if self.motion_gate.check(state.name, frame):
+                    active.append((state, frame))
+                else:
+                    coasted.append(state)
+        else:
+            active = batch
+            if self.motion_gate is not None:
+                # Only measured, for "motion" scheduling
+                for state, frame in batch:
+                    self.motion_gate.update(state.name, frame)
+
+        # Between detections, tracks move along their Kalman predictions
+        due, predicted = [], []
+        for state, frame in active:
+            if self.detection_stride.should_detect(state.name):
+                due.append((state, frame))
+            else:
+                predicted.append(state)
+        active = due
+
+        # 1. Detect persons in every scheduled camera with one YOLO call,
+        #    or queue them to the worker processes
+        if not active:
+            person_detections = []
+        elif self.inference_pool is not None:
+            person_detections, _ = self.inference_pool.submit_detections(
+                [(state.name, frame) for state, frame in active])
+        else:
+            person_detections = self.detect_persons_yolo_batch([frame for _, frame in active])
+
+        # A later tick may grab newer frames before this one finishes
+        dropped = [state.last_dropped for state, _ in batch]
+        return batch, dropped, coasted, predicted, active, person_detections
+
+    def finish_batch(self, tick):
+        """Track, find faces and clean up for a tick returned by begin_batch."""
+        batch, dropped, coasted, predicted, active, person_detections = tick
+
+        # Faces not detected in this tick follow their Kalman filters
+        carried = []          # (face_id, measured box) of faces of cached or coasted tracks
+        predicted_faces = []  # Face ids of tracks moved by prediction alone
+        for state in coasted:
+            self.coast_camera(state, carried)
+        for state in predicted:
+            state.person_keys = self.predict_camera(state, predicted_faces)
+
+        if self.inference_pool is not None:
+            if active:
+                # person_detections holds the pool's task ids
+                person_detections = self.inference_pool.collect_detections(person_detections)
+            self.apply_pool_recognitions()
+
+        # 2-3. Track persons camera by camera
+        face_jobs = []
+        for (state, frame), detections in zip(active, person_detections):
+            state.frames_processed += 1
+            state.person_keys = self.process_camera_frame(state, frame, detections, face_jobs, carried)
+
+        # 4. Find the faces of every confirmed person of this tick in one pass
+        self.process_faces(face_jobs)
+        self.carry_faces(carried, predicted_faces)
+
+        # Detect less often on cameras the pipeline is falling behind on
+        for (state, _), last_dropped in zip(batch, dropped):
+            self.detection_stride.update(state.name, last_dropped, len(state.person_keys))
+
+        # Re-ID every person first seen in this (or a recent) tick in one pass
+        self.flush_person_features()
+
+        # 5. Clean up old persons and faces. Every person seen in this tick
+        #    has just refreshed its last_seen, so only the expired ones are visited
+        with self.lock:
+            expired = self.track_registry.expire(self.PERSON_TIMEOUT)
+
+        for person_key, face_ids in expired:
+            for face_id in face_ids:
+                self.best_shots.forget(face_id)
+                self.face_tracker.remove(face_id)
+                self.face_descriptors.remove(face_id)
+            self.identity_cache.forget(person_key)
+
+    def coast_camera(self, state, carried):
+        """
+        Carry a static camera's persons over without running detection or
+        touching its tracker: nothing moved, so their last boxes still hold.
+        Their faces are added to 'carried' with their last box as the
+        measurement, which also damps the velocity of their Kalman filters.
+        Returns: set of tracked_persons keys of this camera
+        """
+        now = time.monotonic()
+        for person_key in state.person_keys:
+            person_obj = self.tracked_persons.get(person_key)
+            if person_obj is not None:
+                person_obj.last_seen = now
+                for face in person_obj.faces.values():
+                    carried.append((face.face_id, (face.x, face.y, face.w, face.h)))
+        return state.person_keys
+
+    def predict_camera(self, state, predicted_faces):
+        """
+        Advance a camera's tracks by one frame using only the Kalman motion
+        model, without detection, and move its persons to the predicted boxes.
+        Their face ids are added to 'predicted_faces' so the faces follow
+        their own Kalman predictions.
+        Returns: set of tracked_persons keys of this camera
+        """
+        state.tracker.tracker.predict()
+
+        person_keys = set()
+        for track in state.tracker.tracker.tracks:
+            if not track.is_confirmed():
+                continue
+            person_key = (state.name, track.track_id)
+            person_obj = self.tracked_persons.get(person_key)
+            if person_obj is None:
+                continue
+
+            px, py, px2, py2 = map(int, track.to_ltrb())
+            person_obj.update_position(px, py, px2 - px, py2 - py, person_obj.confidence)
+            predicted_faces.extend(person_obj.faces)
+            person_keys.add(person_key)
+
+        return person_keys
+
+    def get_skip_ratios(self):
+        """Return {camera_name: fraction of frames that skipped detection}."""
+        return self.motion_gate.stats() if self.MOTION_GATING else {}
+
+    def process_camera_frame(self, state, frame, person_detections, face_jobs, carried):
+        """
+        Track persons in one camera's frame. Every confirmed person without a
+        valid cached identity is added to 'face_jobs' as
+        (frame, person_key, person_box) for face processing. The faces of the
+        others are added to 'carried' as (face_id, box shifted with the person).
+        Returns: set of tracked_persons keys seen in this frame
+        """
+        tracks = state.tracker.update_tracks(person_detections, frame=frame)
+        current_tracked_persons = set()
+
+        for track in tracks:
+            if not track.is_confirmed():
+                continue
+
+            track_id = track.track_id
+            person_key = (state.name, track_id)
+            ltrb = track.to_ltrb()
+            px, py, px2, py2 = map(int, ltrb)
+            pw, ph = px2 - px, py2 - py
+            confidence = track.confidence if hasattr(track, 'confidence') else 0.8
+
+            # Update or create person object
+            if person_key in self.tracked_persons:
+                person_obj = self.tracked_persons[person_key]
+                dx, dy = px - person_obj.x, py - person_obj.y
+                person_obj.update_position(px, py, pw, ph, confidence)
+
+                if self.identity_cache.lookup(person_key, person_obj.feature_vector) is not None:
+                    # Known track: carry its faces along instead of detecting and recognizing them again
+                    for face in person_obj.faces.values():
+                        carried.append((face.face_id, (face.x + dx, face.y + dy, face.w, face.h)))
+                    # Refresh the Re-ID embedding now and then to catch identity drift
+                    if self.identity_cache.reid_due(person_key):
+                        person_crop = frame[max(0, py):py + ph, max(0, px):px + pw]
+                        if person_crop.size > 0:
+                            self.queue_person_features(person_obj, person_crop)
+                    current_tracked_persons.add(person_key)
+                    continue
+            else:
+                person_obj = Person(track_id, px, py, pw, ph, confidence, camera_name=state.name,
+                                    history_size=self.TRAJECTORY_LENGTH)
+                self.track_registry.add_person(person_key, person_obj)
+
+                # Queue for batched Re-ID feature extraction
+                person_crop = frame[max(0, py):py + ph, max(0, px):px + pw]
+                if person_crop.size > 0:
+                    self.queue_person_features(person_obj, person_crop)
+
+            current_tracked_persons.add(person_key)
+            face_jobs.append((frame, person_key, (px, py, pw, ph)))
+
+        return current_tracked_persons
+
     def watchdog_thread_function(self):
         """Thread to monitor and recover from potential issues."""
         print("[THREAD] Watchdog thread started")
+        last_report = time.time()
 
         while not self.stop_event.is_set():
             try:
                 time.sleep(1.0)
                 current_time = time.time()
 
-                # Check frame buffer health
-                with self.lock:
-                    if self.last_frame_buffer["timestamp"] > 0:
-                        frame_age = current_time - self.last_frame_buffer["timestamp"]
+                # Report how much detection work motion gating saves
+                if current_time - last_report > self.STATS_REPORT_INTERVAL:
+                    last_report = current_time
+                    for name, ratio in self.get_skip_ratios().items():
+                        print(f"[WATCHDOG] {name}: detection skipped on {ratio:.0%} of frames")
+                    for name, stride in self.detection_stride.strides().items():
+                        if stride > 1:
+                            print(f"[WATCHDOG] {name}: detecting every {stride} frames to keep up")
+                    print(f"[WATCHDOG] Identity cache: {len(self.identity_cache)} tracks, "
+                          f"{self.identity_cache.hit_ratio():.0%} of lookups served without recognition")
+
+                # Check frame buffer health. The rings always hold the latest
+                # frame, so there is no queue to refill
+                for name, frame_ring in list(self.camera_buffers.items()):
+                    if frame_ring.latest_timestamp > 0:
+                        frame_age = current_time - frame_ring.latest_timestamp
                         if frame_age > 3.0:
-                            print("[WATCHDOG] No new frames detected for 3 seconds!")
-
-                # Check queue health
-                queue_size = self.frame_queue.qsize()
-                if queue_size == 0:
-                    with self.lock:
-                        if self.last_frame_buffer["frame"] is not None:
-                            try:
-                                self.frame_queue.put(self.last_frame_buffer["frame"].copy(), block=False)
-                            except:
-                                pass
+                            print(f"[WATCHDOG] No new frames detected on '{name}' for 3 seconds!")
 
             except Exception as e:
                 print(f"[WATCHDOG] Error: {e}")
@@ -432,11 +1000,11 @@ class DetectionSystem:
         print("[THREAD] Watchdog thread stopped")
 
 
-    def get_next_available_face_id():
+    def get_next_available_face_id(self):
         """Get next available face ID by scanning database"""
         highest_id = -1
         try:
-            existing_dirs = [d for d in os.listdir(db_path) if os.path.isdir(os.path.join(db_path, d))]
+            existing_dirs = [d for d in os.listdir(self.db_path) if os.path.isdir(os.path.join(self.db_path, d))]
 
             for d in existing_dirs:
                 if d.startswith("User_"):
@@ -450,7 +1018,7 @@ class DetectionSystem:
                     if current_id > highest_id:
                         highest_id = current_id
         except FileNotFoundError:
-            print(f"Database path not found: {db_path}")
+            print(f"Database path not found: {self.db_path}")
             return 0
 
         return highest_id + 1
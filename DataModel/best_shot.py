@@ -0,0 +1,85 @@
+import time
+import heapq
+
+
+class ShotWindow:
+    """Best crops collected for one face track in the current window."""
+    def __init__(self, timestamp):
+        self.started = timestamp
+        self.offered = 0
+        self.shots = []        # min-heap of (quality, counter, crop)
+        self.fallback = None   # (quality, crop) of the best crop below min_quality
+
+
+class BestShotBuffer:
+    """
+    Per-track buffer that keeps the top-K face crops by quality score over
+    a short window and hands out only the best one for recognition.
+
+    Instead of recognizing whatever crop of a face comes first, crops are
+    collected for 'window' seconds (or 'max_frames' frames, whichever comes
+    first) and the sharpest, best-lit, largest one is recognized. Crops
+    below 'min_quality' only count once a track has gone 'fallback_windows'
+    windows in a row without a better one (e.g. a dim or low-resolution
+    camera): its best crop is recognized anyway rather than never.
+    """
+    def __init__(self, top_k=3, window=0.5, max_frames=12, min_quality=50.0, fallback_windows=3):
+        self.top_k = top_k
+        self.window = window
+        self.max_frames = max_frames
+        self.min_quality = min_quality
+        self.fallback_windows = fallback_windows
+        self.tracks = {}
+        self.failed_windows = {}  # track id -> windows in a row without a crop above min_quality
+        self.counter = 0  # Tie breaker so crops are never compared
+
+    def add(self, track_id, crop, quality):
+        """
+        Offer a crop of a track. The crop is copied only if it makes the top-K.
+        Returns True if the track's window is complete and pop() should be called.
+        """
+        now = time.time()
+        window = self.tracks.get(track_id)
+        if window is None:
+            window = self.tracks[track_id] = ShotWindow(now)
+        window.offered += 1
+
+        if quality >= self.min_quality:
+            self.counter += 1
+            if len(window.shots) < self.top_k:
+                heapq.heappush(window.shots, (quality, self.counter, crop.copy()))
+            elif quality > window.shots[0][0]:
+                heapq.heapreplace(window.shots, (quality, self.counter, crop.copy()))
+        elif not window.shots and (window.fallback is None or quality > window.fallback[0]):
+            window.fallback = (quality, crop.copy())
+
+        return now - window.started >= self.window or window.offered >= self.max_frames
+
+    def pop(self, track_id):
+        """
+        Close a track's window and return (best_crop, quality), or (None, None)
+        if no crop was good enough and the track is not yet due for its
+        fallback. The next add() starts a new window.
+        """
+        window = self.tracks.pop(track_id, None)
+        if window is None:
+            return None, None
+        if window.shots:
+            self.failed_windows.pop(track_id, None)
+            quality, _, crop = max(window.shots)
+            return crop, quality
+
+        failed = self.failed_windows.get(track_id, 0) + 1
+        if window.fallback is None or failed < self.fallback_windows:
+            self.failed_windows[track_id] = failed
+            return None, None
+        self.failed_windows.pop(track_id, None)
+        quality, crop = window.fallback
+        return crop, quality
+
+    def forget(self, track_id):
+        self.tracks.pop(track_id, None)
+        self.failed_windows.pop(track_id, None)
+
+    def __len__(self):
+        return len(self.tracks)
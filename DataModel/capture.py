@@ -0,0 +1,170 @@
+import time
+import cv2
+
+LIVE_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+def is_live_source(source):
+    """Camera indexes and network streams deliver frames in real time; files do not."""
+    return isinstance(source, int) or str(source).lower().startswith(LIVE_PREFIXES)
+
+
+class CaptureEngine:
+    """
+    Video capture that only decodes frames somebody wants.
+
+    grab() advances the stream every tick without decoding the frame, and
+    retrieve() decodes the grabbed frame only when a consumer asked for one
+    (e.g. FrameRing.wants_frame()), so frames that would be dropped anyway
+    never cost a decode. Files are paced by the stream's own timestamps
+    (CAP_PROP_POS_MSEC) instead of a fixed sleep; live sources are paced
+    by the camera. Frames can be scaled down to 'max_size' (width, height)
+    for analytics, straight into the ring slot they are published in.
+    Hardware decoding is requested where the OpenCV build supports it.
+    Every frame published to a ring carries the number of grabbed frames
+    that were not published before it, so consumers still see the drops.
+    """
+    def __init__(self, source, max_size=None, hw_acceleration=True, pace=None):
+        self.source = source
+        self.max_size = max_size
+        self.hw_acceleration = hw_acceleration
+        self.pace = not is_live_source(source) if pace is None else pace
+        self.cap = None
+        self.frame_size = None   # (width, height) of the decoded stream
+        self.output_size = None  # (width, height) of retrieved frames
+        self.fps = 0.0
+        self.anchor = None       # (monotonic time, stream ms) pacing is measured from
+        self.last_position = None
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.frames_published = 0  # Frames published to a FrameRing
+
+    def open(self):
+        """Open the source. Returns True on success."""
+        self.cap = None
+        if self.hw_acceleration and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            cap = cv2.VideoCapture(self.source, cv2.CAP_ANY,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+            if cap.isOpened():
+                self.cap = cap
+        if self.cap is None:
+            cap = cv2.VideoCapture(self.source)
+            if not cap.isOpened():
+                return False
+            self.cap = cap
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.set_frame_size(width, height)
+        return True
+
+    def set_frame_size(self, width, height):
+        self.frame_size = (width, height)
+        self.output_size = self.frame_size
+        if self.max_size is not None and width > 0 and height > 0:
+            scale = min(self.max_size[0] / width, self.max_size[1] / height)
+            if scale < 1:
+                # Only scale down if the video is too large for the limit
+                self.output_size = (int(width * scale), int(height * scale))
+
+    def wait_for_timestamp(self):
+        """Sleep until the grabbed frame is due according to its stream timestamp."""
+        position = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if self.last_position is not None and position <= self.last_position:
+            # Backend without usable timestamps: fall back to the nominal frame rate
+            position = self.last_position + 1000.0 / (self.fps if self.fps > 0 else 25.0)
+        self.last_position = position
+
+        now = time.monotonic()
+        if self.anchor is None:
+            self.anchor = (now, position)
+            return
+
+        delay = self.anchor[0] + (position - self.anchor[1]) / 1000.0 - now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -1.0:
+            # Far behind (e.g. the system was suspended): restart pacing from here
+            self.anchor = (now, position)
+
+    def grab(self):
+        """Advance to the next frame without decoding it. Returns False at the end of the stream."""
+        if not self.cap.grab():
+            return False
+        self.frames_grabbed += 1
+        if self.pace:
+            self.wait_for_timestamp()
+        return True
+
+    def retrieve(self, frame_ring=None):
+        """
+        Decode the last grabbed frame. With a FrameRing, the frame is decoded
+        (or scaled) straight into a free slot and published.
+        Returns: the frame, or None if decoding failed or every slot was pinned
+        """
+        scaled = self.output_size != self.frame_size
+
+        if frame_ring is not None and not scaled and self.frame_size[0] > 0:
+            shape = (self.frame_size[1], self.frame_size[0], 3)
+            slot = frame_ring.begin_write(shape)
+            if slot is None:
+                return None
+            ret, frame = self.cap.retrieve(slot)
+            if ret and frame is slot:
+                self.frames_decoded += 1
+                self.publish(frame_ring)
+                return frame
+            # Nothing was decoded into the slot
+            frame_ring.abort_write()
+            if not ret:
+                return None
+        else:
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                return None
+
+        self.frames_decoded += 1
+        height, width = frame.shape[:2]
+        if (width, height) != self.frame_size:
+            # The stream reported the wrong size, or changed resolution
+            self.set_frame_size(width, height)
+            scaled = self.output_size != self.frame_size
+
+        if frame_ring is None:
+            if scaled:
+                frame = cv2.resize(frame, self.output_size, interpolation=cv2.INTER_AREA)
+            return frame
+
+        if scaled:
+            out_width, out_height = self.output_size
+            slot = frame_ring.begin_write((out_height, out_width) + frame.shape[2:], frame.dtype)
+            if slot is None:
+                return None
+            cv2.resize(frame, self.output_size, dst=slot, interpolation=cv2.INTER_AREA)
+            self.publish(frame_ring)
+            return slot
+
+        self.publish(frame_ring, frame)
+        return frame
+
+    def frames_skipped(self):
+        """Grabbed frames that were not published to a ring (not decoded, or decoded for display only)."""
+        return self.frames_grabbed - self.frames_published
+
+    def publish(self, frame_ring, frame=None):
+        """Commit the slot reserved in 'frame_ring', or copy 'frame' into it."""
+        self.frames_published += 1
+        if frame is None:
+            frame_ring.commit_write(self.frames_skipped())
+        elif frame_ring.write(frame, self.frames_skipped()) is None:
+            self.frames_published -= 1
+
+    def decode_ratio(self):
+        """Fraction of grabbed frames that were decoded."""
+        return self.frames_decoded / self.frames_grabbed if self.frames_grabbed else 0.0
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
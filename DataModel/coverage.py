@@ -0,0 +1,179 @@
+import math
+import cv2
+import numpy as np
+
+from fov_geometry import (DEFAULT_VIEW_ANGLE, DEFAULT_VIEW_RANGE, DEFAULT_VIEW_RAYS,
+                          fov_polygon, load_layout, range_rect)
+
+DEFAULT_CELL_SIZE = 8.0  # Side of a coverage cell in scene pixels
+
+
+class CoverageGrid:
+    """
+    Raster of square cells over a rectangle of the floor plan. A cell is
+    seen by a camera when its centre lies inside the camera's FOV polygon.
+    """
+    def __init__(self, x1, y1, x2, y2, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.x1, self.y1 = float(x1), float(y1)
+        self.cols = max(1, int(math.ceil((x2 - x1) / self.cell_size)))
+        self.rows = max(1, int(math.ceil((y2 - y1) / self.cell_size)))
+        # Scene coordinates of the cell centres
+        self.xs = self.x1 + (np.arange(self.cols) + 0.5) * self.cell_size
+        self.ys = self.y1 + (np.arange(self.rows) + 0.5) * self.cell_size
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    @property
+    def cell_area(self):
+        return self.cell_size * self.cell_size
+
+    def window(self, x1, y1, x2, y2):
+        """(rows, cols) slices of the cells whose centres lie in the rectangle."""
+        col1 = max(0, int(math.ceil((min(x1, x2) - self.x1) / self.cell_size - 0.5)))
+        col2 = min(self.cols, int(math.floor((max(x1, x2) - self.x1) / self.cell_size - 0.5)) + 1)
+        row1 = max(0, int(math.ceil((min(y1, y2) - self.y1) / self.cell_size - 0.5)))
+        row2 = min(self.rows, int(math.floor((max(y1, y2) - self.y1) / self.cell_size - 0.5)) + 1)
+        return slice(row1, max(row1, row2)), slice(col1, max(col1, col2))
+
+
+def visible_cells(grid, polygon, rotation, view_angle=DEFAULT_VIEW_ANGLE, view_range=DEFAULT_VIEW_RANGE):
+    """
+    Cells of 'grid' inside a camera's FOV polygon, as fov_polygon returns
+    it: the camera position followed by the end points of its rays. Each
+    cell centre is assigned to the pair of rays around it by its angle, and
+    is seen when it lies on the camera's side of the edge joining their
+    end points, so only the cells within view range are tested.
+    Returns: (rows slice, cols slice, bool mask of the cells in that window)
+    """
+    polygon = np.asarray(polygon, dtype=np.float64)
+    origin, points = polygon[0], polygon[1:]
+    view_rays = len(points) - 1
+    rows, cols = grid.window(*range_rect(origin, view_range))
+    dx = grid.xs[cols][None, :] - origin[0]
+    dy = grid.ys[rows][:, None] - origin[1]
+    if dx.size == 0 or dy.size == 0 or view_rays < 1:
+        return rows, cols, np.zeros((dy.shape[0], dx.shape[1]), dtype=bool)
+
+    # Angle of each cell from the first ray, in the rays' (y up) convention
+    first_ray = -rotation - view_angle / 2
+    offset = np.mod(np.degrees(np.arctan2(-dy, dx)) - first_ray, 360.0)
+    position = offset * (view_rays / view_angle)
+    in_sector = position <= view_rays
+    index = np.minimum(position.astype(np.intp), view_rays - 1)
+
+    # Same side of the edge p[i] -> p[i + 1] as the camera
+    start = points[index]
+    edge = points[index + 1] - start
+    cell_side = edge[..., 0] * (dy + origin[1] - start[..., 1]) - edge[..., 1] * (dx + origin[0] - start[..., 0])
+    camera_side = edge[..., 0] * (origin[1] - start[..., 1]) - edge[..., 1] * (origin[0] - start[..., 0])
+    return rows, cols, in_sector & (cell_side * camera_side >= 0)
+
+
+class CoverageMap:
+    """
+    Number of cameras that see every cell of a CoverageGrid.
+
+    The visible cells of each camera are kept, so moving or removing one
+    camera only subtracts its old cells from the counts and adds its new
+    ones. Wall cells are never blind spots; the floor is the bounding box
+    of the walls (the whole grid when there are none).
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.counts = np.zeros(grid.shape, dtype=np.int32)
+        self.walls = np.zeros(grid.shape, dtype=bool)
+        self.floor = np.ones(grid.shape, dtype=bool)
+        self.views = {}  # camera key -> (rows slice, cols slice, mask)
+
+    def set_walls(self, segments):
+        """Rasterize the walls, given as their edges (S, 4) in groups of four per wall."""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        walls = np.zeros(self.grid.shape, dtype=np.uint8)
+        self.floor = np.ones(self.grid.shape, dtype=bool)
+        if len(segments) >= 4:
+            corners = segments[: len(segments) // 4 * 4, :2].reshape(-1, 4, 2)
+            # Cell coordinates with 4 fractional bits, cell centres on integers
+            cell_points = (corners - (self.grid.x1, self.grid.y1)) / self.grid.cell_size - 0.5
+            cv2.fillPoly(walls, list(np.round(cell_points * 16).astype(np.int32)), 1, cv2.LINE_8, 4)
+
+            x1, y1 = corners.reshape(-1, 2).min(axis=0)
+            x2, y2 = corners.reshape(-1, 2).max(axis=0)
+            rows, cols = self.grid.window(x1, y1, x2, y2)
+            self.floor[:] = False
+            self.floor[rows, cols] = True
+        self.walls = walls.astype(bool)
+
+    def set_camera(self, key, polygon, rotation, view_angle=DEFAULT_VIEW_ANGLE, view_range=DEFAULT_VIEW_RANGE):
+        """Add a camera, or replace its previous FOV, from its FOV polygon."""
+        self.remove_camera(key)
+        rows, cols, mask = visible_cells(self.grid, polygon, rotation, view_angle, view_range)
+        self.counts[rows, cols] += mask
+        self.views[key] = (rows, cols, mask)
+
+    def remove_camera(self, key):
+        view = self.views.pop(key, None)
+        if view is not None:
+            rows, cols, mask = view
+            self.counts[rows, cols] -= mask
+
+    def clear(self):
+        self.counts[:] = 0
+        self.views.clear()
+
+    def area_mask(self):
+        """Cells that should be covered: floor that is not wall."""
+        return self.floor & ~self.walls
+
+    def blind_spots(self):
+        """Bool mask of floor cells no camera sees."""
+        return self.area_mask() & (self.counts == 0)
+
+    def report(self):
+        """
+        Coverage summary in scene pixels squared.
+        Returns: dict with floor_area, covered_area, blind_spot_area, overlap_area
+                 (seen by two or more cameras) and coverage (covered fraction)
+        """
+        area = self.area_mask()
+        floor_cells = int(area.sum())
+        covered_cells = int((area & (self.counts > 0)).sum())
+        cell_area = self.grid.cell_area
+        return {
+            "floor_area": floor_cells * cell_area,
+            "covered_area": covered_cells * cell_area,
+            "blind_spot_area": (floor_cells - covered_cells) * cell_area,
+            "overlap_area": int((area & (self.counts > 1)).sum()) * cell_area,
+            "coverage": covered_cells / floor_cells if floor_cells else 0.0,
+        }
+
+
+def layout_grid(segments, cameras, cell_size=DEFAULT_CELL_SIZE, view_range=DEFAULT_VIEW_RANGE):
+    """CoverageGrid over the walls of a layout, or around its cameras if it has none."""
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if len(segments):
+        points = segments.reshape(-1, 2)
+        (x1, y1), (x2, y2) = points.min(axis=0), points.max(axis=0)
+    elif cameras:
+        positions = np.array([camera["pos"] for camera in cameras], dtype=np.float64)
+        (x1, y1), (x2, y2) = positions.min(axis=0) - view_range, positions.max(axis=0) + view_range
+    else:
+        x1 = y1 = x2 = y2 = 0.0
+    return CoverageGrid(x1, y1, x2, y2, cell_size)
+
+
+def layout_coverage(path, cell_size=DEFAULT_CELL_SIZE, view_angle=DEFAULT_VIEW_ANGLE,
+                    view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS):
+    """
+    Coverage of a map.json layout, without a Qt scene.
+    Returns: CoverageMap keyed by camera name; see CoverageMap.report()
+    """
+    segments, cameras = load_layout(path)
+    coverage = CoverageMap(layout_grid(segments, cameras, cell_size, view_range))
+    coverage.set_walls(segments)
+    for camera in cameras:
+        polygon = fov_polygon(camera["pos"], camera["rot"], segments, view_angle, view_range, view_rays)
+        coverage.set_camera(camera["name"], polygon, camera["rot"], view_angle, view_range)
+    return coverage
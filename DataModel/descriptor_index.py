@@ -0,0 +1,165 @@
+import numpy as np
+
+# Bits set in every byte value, for NumPy versions without np.bitwise_count
+POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def hamming_distances(queries, descriptors):
+    """
+    Hamming distances between every row of two uint8 binary descriptor
+    matrices (e.g. 32-byte ORB descriptors).
+    Returns: (len(queries), len(descriptors)) uint16 matrix
+
+    Rows are compared one 64-bit word (or byte) column at a time, so every
+    step is a single XOR and popcount over the whole distance matrix and no
+    (queries, descriptors, words) intermediate is built.
+    """
+    distances = np.zeros((len(queries), len(descriptors)), dtype=np.uint16)
+    if len(queries) == 0 or len(descriptors) == 0:
+        return distances
+
+    if hasattr(np, "bitwise_count") and queries.shape[1] % 8 == 0:
+        word_type = np.uint64
+    else:
+        word_type = np.uint8
+    query_words = np.ascontiguousarray(queries).view(word_type)
+    descriptor_words = np.ascontiguousarray(np.ascontiguousarray(descriptors).view(word_type).T)
+
+    xor = np.empty(distances.shape, dtype=word_type)
+    for column in range(query_words.shape[1]):
+        np.bitwise_xor(query_words[:, column, None], descriptor_words[column][None, :], out=xor)
+        if word_type is np.uint64:
+            distances += np.bitwise_count(xor)
+        else:
+            distances += POPCOUNT_TABLE[xor]
+
+    return distances
+
+
+class DescriptorIndex:
+    """
+    All stored ORB descriptors packed into one contiguous uint8 matrix.
+
+    Each row has an owner (the face id it belongs to) and the rows of one
+    owner are kept contiguous, so a query is matched against every stored
+    face with one bulk Hamming distance computation followed by vectorized
+    per-owner reductions, instead of one BFMatcher per face.
+    """
+    def __init__(self, descriptor_size=32):
+        self.descriptor_size = descriptor_size
+        self.descriptors = np.empty((0, descriptor_size), dtype=np.uint8)
+        self.owners = np.empty(0, dtype=np.int32)  # Owner slot of every row
+        self.size = 0
+        self.face_ids = []       # Owner slot -> face id, in insertion order
+        self.segments = []       # Owner slot -> (first row, row count)
+
+    @classmethod
+    def from_dict(cls, stored_descriptors):
+        """Build an index from a {face_id: descriptors} dict, skipping None entries."""
+        index = cls()
+        for face_id, descriptors in stored_descriptors.items():
+            if descriptors is not None:
+                index.add(face_id, descriptors)
+        return index
+
+    def reserve(self, rows):
+        if rows <= len(self.descriptors):
+            return
+        capacity = max(rows, 2 * len(self.descriptors), 256)
+        descriptors = np.empty((capacity, self.descriptor_size), dtype=np.uint8)
+        owners = np.empty(capacity, dtype=np.int32)
+        descriptors[:self.size] = self.descriptors[:self.size]
+        owners[:self.size] = self.owners[:self.size]
+        self.descriptors, self.owners = descriptors, owners
+
+    def add(self, face_id, descriptors):
+        """
+        Store (or replace) the descriptors of a face. A face without
+        descriptors is not stored, so every face owns at least one row.
+        """
+        if face_id in self.face_ids:
+            self.remove(face_id)
+        descriptors = np.asarray(descriptors, dtype=np.uint8).reshape(-1, self.descriptor_size)
+
+        count = len(descriptors)
+        if count == 0:
+            return
+        self.reserve(self.size + count)
+        self.descriptors[self.size:self.size + count] = descriptors
+        self.owners[self.size:self.size + count] = len(self.face_ids)
+        self.segments.append((self.size, count))
+        self.face_ids.append(face_id)
+        self.size += count
+
+    def remove(self, face_id):
+        """Drop a face's descriptors, keeping the remaining rows packed."""
+        if face_id not in self.face_ids:
+            return
+        slot = self.face_ids.index(face_id)
+        start, count = self.segments[slot]
+        end = start + count
+
+        self.descriptors[start:self.size - count] = self.descriptors[end:self.size]
+        self.owners[start:self.size - count] = self.owners[end:self.size] - 1
+        self.size -= count
+
+        del self.face_ids[slot]
+        del self.segments[slot]
+        self.segments[slot:] = [(first - count, rows) for first, rows in self.segments[slot:]]
+
+    def match(self, query_descriptors, min_matches=6):
+        """
+        Cross-checked nearest-neighbour matching of a query against every
+        stored face, with the same result as a BFMatcher(NORM_HAMMING,
+        crossCheck=True) per face.
+        Returns: (best_face_id, best_score), score = mean match distance / 100
+                 capped at 1.0, lower is better. (None, 1.0) if no face has
+                 'min_matches' cross-checked matches.
+        """
+        if query_descriptors is None or self.size == 0:
+            return None, 1.0
+
+        query = np.asarray(query_descriptors, dtype=np.uint8).reshape(-1, self.descriptor_size)
+        if len(query) == 0:
+            return None, 1.0
+
+        distances = hamming_distances(query, self.descriptors[:self.size])
+        owners = self.owners[:self.size]
+        starts = np.array([start for start, _ in self.segments], dtype=np.intp)
+
+        # Nearest row of every query row within every face, (queries, faces).
+        # Distance and row number are folded into one key so a single
+        # reduction finds the minimum and, on ties, the first row at it, as
+        # BFMatcher does
+        key_type = np.int32 if 257 * self.size < 2 ** 31 else np.int64
+        rows = np.arange(self.size, dtype=key_type)
+        keys = distances.astype(key_type)
+        keys *= self.size
+        keys += rows
+        face_nearest = np.minimum.reduceat(keys, starts, axis=1) % self.size
+
+        # Cross-check: stored row j matches query row i if each is the
+        # other's nearest
+        nearest_query = np.argmin(distances, axis=0)
+        matched_rows = rows[face_nearest[nearest_query, owners] == rows]
+        row_distance = distances[nearest_query, rows]
+
+        match_owners = owners[matched_rows]
+        faces = len(self.face_ids)
+        match_counts = np.bincount(match_owners, minlength=faces)
+        distance_sums = np.bincount(match_owners, weights=row_distance[matched_rows], minlength=faces)
+
+        scores = np.ones(faces)
+        enough = match_counts >= min_matches
+        scores[enough] = np.minimum(1.0, distance_sums[enough] / match_counts[enough] / 100.0)
+
+        best = int(np.argmin(scores))
+        if scores[best] >= 1.0:
+            return None, 1.0
+        return self.face_ids[best], float(scores[best])
+
+    def __len__(self):
+        return len(self.face_ids)
+
+    def __contains__(self, face_id):
+        return face_id in self.face_ids
@@ -0,0 +1,63 @@
+class CameraStrideState:
+    """Detection stride bookkeeping of one camera."""
+    def __init__(self):
+        self.stride = 1                  # Run detection on every Nth frame
+        self.frames_since_detection = 0
+        self.calm_frames = 0             # Consecutive frames taken without drops
+
+
+class AdaptiveStride:
+    """
+    Per-camera detect-every-N-frames controller.
+
+    N goes up by one whenever the pipeline falls behind a camera (frames were
+    dropped before the processing thread got to them) and comes back down
+    after 'patience' frames in a row without drops. It is capped by the
+    number of live tracks, since crowded scenes need fresh detections to
+    keep identities apart. Frames between detections are filled in from the
+    tracker's Kalman predictions.
+    """
+    def __init__(self, max_stride=5, tracks_per_step=4, patience=25):
+        self.max_stride = max(1, max_stride)
+        self.tracks_per_step = tracks_per_step  # Every this many tracks lowers the cap by one
+        self.patience = patience
+        self.cameras = {}
+
+    def state_for(self, camera_name):
+        state = self.cameras.get(camera_name)
+        if state is None:
+            state = self.cameras[camera_name] = CameraStrideState()
+        return state
+
+    def should_detect(self, camera_name):
+        """True if this camera's current frame is due for detection."""
+        state = self.state_for(camera_name)
+        if state.frames_since_detection + 1 >= state.stride:
+            state.frames_since_detection = 0
+            return True
+        state.frames_since_detection += 1
+        return False
+
+    def update(self, camera_name, dropped_frames, track_count):
+        """Adapt a camera's stride after a frame was taken. Returns the new stride."""
+        state = self.state_for(camera_name)
+
+        if dropped_frames > 0:
+            state.stride += 1
+            state.calm_frames = 0
+        else:
+            state.calm_frames += 1
+            if state.calm_frames >= self.patience and state.stride > 1:
+                state.stride -= 1
+                state.calm_frames = 0
+
+        track_cap = self.max_stride - track_count // self.tracks_per_step
+        state.stride = max(1, min(state.stride, self.max_stride, track_cap))
+        return state.stride
+
+    def strides(self):
+        """Return {camera_name: current stride}."""
+        return {name: state.stride for name, state in self.cameras.items()}
+
+    def forget(self, camera_name):
+        self.cameras.pop(camera_name, None)
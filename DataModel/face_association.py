@@ -0,0 +1,104 @@
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional, fall back to greedy assignment
+    linear_sum_assignment = None
+
+
+def association_matrices(current_boxes, previous_boxes):
+    """
+    Geometric similarity between every pair of face boxes.
+    'current_boxes' is (M, 4) and 'previous_boxes' (N, 4), as (x, y, w, h).
+    Returns: (iou, overlap_ratio, normalized_distance, size_ratio), each (M, N)
+      - iou: intersection over union
+      - overlap_ratio: intersection over the smaller box's area
+      - normalized_distance: centre distance over the average face side
+      - size_ratio: product of the width and height ratios (smaller / larger)
+    """
+    current = np.asarray(current_boxes, dtype=np.float64).reshape(-1, 1, 4)
+    previous = np.asarray(previous_boxes, dtype=np.float64).reshape(1, -1, 4)
+    cx, cy, cw, ch = (current[..., i] for i in range(4))
+    px, py, pw, ph = (previous[..., i] for i in range(4))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 1. Intersection over Union (IoU)
+        intersection_w = np.clip(np.minimum(cx + cw, px + pw) - np.maximum(cx, px), 0, None)
+        intersection_h = np.clip(np.minimum(cy + ch, py + ph) - np.maximum(cy, py), 0, None)
+        intersection_area = intersection_w * intersection_h
+
+        current_area = cw * ch
+        previous_area = pw * ph
+        union_area = current_area + previous_area - intersection_area
+        iou = np.where(union_area > 0, intersection_area / union_area, 0.0)
+
+        # 2. Centre distance, normalized by average face size
+        center_distance = np.hypot((cx + cw / 2) - (px + pw / 2), (cy + ch / 2) - (py + ph / 2))
+        avg_size = (cw + ch + pw + ph) / 4
+        normalized_distance = np.where(avg_size > 0, center_distance / avg_size, np.inf)
+
+        # 3. Overlap ratio
+        smaller_area = np.minimum(current_area, previous_area)
+        overlap_ratio = np.where(smaller_area > 0, intersection_area / smaller_area, 0.0)
+
+        # 4. Size similarity
+        width_ratio = np.minimum(cw, pw) / np.maximum(cw, pw)
+        height_ratio = np.minimum(ch, ph) / np.maximum(ch, ph)
+        size_ratio = np.nan_to_num(width_ratio * height_ratio, nan=0.0)
+
+    return iou, overlap_ratio, normalized_distance, size_ratio
+
+
+def same_face_matrix(iou, overlap_ratio, normalized_distance, size_ratio,
+                     iou_threshold=0.5, overlap_threshold=0.7, distance_threshold=0.3):
+    """
+    Apply the is_same_face_by_location decision rules to association matrices.
+    Returns: (M, N) bool matrix, True where the boxes are likely the same face
+    """
+    return ((iou >= iou_threshold)
+            | ((overlap_ratio >= overlap_threshold) & (normalized_distance <= distance_threshold))
+            | ((normalized_distance <= distance_threshold * 0.5) & (size_ratio >= 0.7)))
+
+
+def greedy_assignment(cost, allowed):
+    """Pair rows and columns by increasing cost, each used at most once."""
+    pairs = []
+    used_rows, used_cols = set(), set()
+    rows, cols = np.nonzero(allowed)
+    for index in np.argsort(cost[rows, cols], kind="stable"):
+        row, col = int(rows[index]), int(cols[index])
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        pairs.append((row, col))
+    return pairs
+
+
+def associate_faces(current_boxes, previous_boxes, method="hungarian",
+                    iou_threshold=0.5, overlap_threshold=0.7, distance_threshold=0.3):
+    """
+    Link new face boxes (M, 4) to previous ones (N, 4), (x, y, w, h) each.
+    Only pairs passing the same-face rules can be linked; among those the
+    assignment maximizes IoU and minimizes centre distance, either optimally
+    ("hungarian", needs scipy, falls back to greedy) or "greedy"ly.
+    Returns: list of (current_index, previous_index) pairs
+    """
+    if len(current_boxes) == 0 or len(previous_boxes) == 0:
+        return []
+
+    iou, overlap_ratio, normalized_distance, size_ratio = association_matrices(current_boxes, previous_boxes)
+    allowed = same_face_matrix(iou, overlap_ratio, normalized_distance, size_ratio,
+                               iou_threshold, overlap_threshold, distance_threshold)
+    if not allowed.any():
+        return []
+
+    cost = np.where(allowed, normalized_distance - iou, 0.0)
+
+    if method == "hungarian" and linear_sum_assignment is not None:
+        # Disallowed pairs get a cost no allowed assignment can beat, then are dropped
+        blocked = np.where(allowed, cost, cost[allowed].max() + 1e6)
+        rows, cols = linear_sum_assignment(blocked)
+        return [(int(row), int(col)) for row, col in zip(rows, cols) if allowed[row, col]]
+
+    return greedy_assignment(cost, allowed)
@@ -2,7 +2,10 @@ from datetime import datetime
 import cv2
 import os
 import numpy as np
-from deepface import DeepFace
+from face_gallery import FaceGallery
+from descriptor_index import DescriptorIndex
+from face_association import association_matrices, same_face_matrix
+from face_kalman import TRANSITION, MEASUREMENT, PROCESS_NOISE, MEASUREMENT_NOISE, INITIAL_COVARIANCE
 
 # Setup
 db_path = "Faces_db"
@@ -13,99 +16,139 @@ CONFIDENCE_THRESHOLD = 0.6
 MIN_FACE_SIZE = (120, 120)
 MAX_FACES_PER_USER = 10
 QUALITY_THRESHOLD = 100
+RECOGNITION_DISTANCE_THRESHOLD = 0.68  # ArcFace cosine threshold used by DeepFace.verify
+
+# Gallery search index: "exact", "ivf" (NumPy IVF-flat) or "hnsw" (needs hnswlib)
+GALLERY_INDEX_BACKEND = "exact"
+GALLERY_INDEX_PARAMS = {}  # e.g. {"nlist": 256, "nprobe": 8} for "ivf", {"ef": 64} for "hnsw"
+GALLERY_TARGET_RECALL = 0.99  # Approximate indexes widen their search until recall@1 reaches this
 
 # Feature detector for ORB
 orb = cv2.ORB_create(nfeatures=100, scaleFactor=1.2, WTA_K=2, scoreType=cv2.ORB_HARRIS_SCORE)
 
+# Embedding gallery for recognition, built on first use
+face_gallery = None
+
+# Frame size face sizes are normalized against when the real one is not known
+DEFAULT_FRAME_SHAPE = (480, 640)
+
+# Scratch buffers reused by calculate_face_quality_batch, grown on demand
+quality_gray_buffer = np.empty(0, dtype=np.uint8)
+quality_laplacian_buffer = np.empty(0, dtype=np.float32)
+
+
+def get_face_gallery():
+    """
+    Return the shared embedding gallery for db_path, loading it from the
+    on-disk cache the first time it is needed. Loading never writes the
+    cache; update_user_faces and flush_face_gallery do.
+    """
+    global face_gallery
+    if face_gallery is None:
+        face_gallery = FaceGallery(db_path, model_name="ArcFace",
+                                   distance_threshold=RECOGNITION_DISTANCE_THRESHOLD,
+                                   index_backend=GALLERY_INDEX_BACKEND,
+                                   index_params=GALLERY_INDEX_PARAMS,
+                                   target_recall=GALLERY_TARGET_RECALL)
+        face_gallery.load()
+    return face_gallery
+
 
-def calculate_face_quality(face_img):
+def flush_face_gallery():
+    """Write pending gallery changes to the on-disk cache, if it was ever loaded."""
+    if face_gallery is not None:
+        face_gallery.flush()
+
+
+def calculate_face_quality(face_img, frame_shape=DEFAULT_FRAME_SHAPE):
     """
     Calculate a quality score for a face image based on:
     - Sharpness (Laplacian variance)
     - Lighting balance (histogram entropy)
-    - Face size
+    - Face size relative to the frame it was cropped from
     """
-    if len(face_img.shape) > 2:
-        gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = face_img
+    return float(calculate_face_quality_batch([face_img], frame_shape)[0])
 
-    # 1. Sharpness score
-    laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
 
-    # 2. Lighting balance (entropy)
-    hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-    hist_normalized = hist / hist.sum()
-    hist_distribution = np.sum(-hist_normalized * np.log2(hist_normalized + 1e-10))
+def calculate_face_quality_batch(face_imgs, frame_shape=DEFAULT_FRAME_SHAPE):
+    """
+    Score many face crops in one call with the calculate_face_quality formula.
+    'frame_shape' is the (height, width) of the frame the crops come from, or
+    a list with one shape per crop when they come from different cameras.
+    Returns: float32 array of quality scores, in input order
+
+    Grayscale conversion and the Laplacian write into reused float32 scratch
+    buffers, and the entropies of all crops are computed in one vectorized
+    step from their 256-bin histograms. Not thread-safe: call it from one
+    thread (the processing thread).
+    """
+    global quality_gray_buffer, quality_laplacian_buffer
+
+    count = len(face_imgs)
+    sharpness = np.zeros(count, dtype=np.float32)
+    histograms = np.zeros((count, 256), dtype=np.float32)
+    size_ratios = np.zeros(count, dtype=np.float32)
+    if count == 0:
+        return sharpness
+
+    largest = max(img.shape[0] * img.shape[1] for img in face_imgs)
+    if quality_gray_buffer.size < largest:
+        quality_gray_buffer = np.empty(largest, dtype=np.uint8)
+        quality_laplacian_buffer = np.empty(largest, dtype=np.float32)
+
+    per_crop_shapes = isinstance(frame_shape[0], (tuple, list))
+    for i, face_img in enumerate(face_imgs):
+        height, width = face_img.shape[:2]
+        if height == 0 or width == 0:
+            continue
 
-    # 3. Size ratio
-    face_size_ratio = (face_img.shape[0] * face_img.shape[1]) / (640 * 480)
+        if face_img.ndim > 2:
+            gray = quality_gray_buffer[:height * width].reshape(height, width)
+            cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY, dst=gray)
+        else:
+            gray = face_img
 
-    # Combined score
-    quality_score = (laplacian_var * 0.5) + (hist_distribution * 50) + (face_size_ratio * 50)
+        # 1. Sharpness score
+        laplacian = quality_laplacian_buffer[:height * width].reshape(height, width)
+        cv2.Laplacian(gray, cv2.CV_32F, dst=laplacian)
+        _, std = cv2.meanStdDev(laplacian)
+        sharpness[i] = std[0, 0] ** 2
 
-    return quality_score
+        # 2. Histogram for the lighting balance
+        histograms[i] = np.bincount(gray.ravel(), minlength=256)
 
+        # 3. Size ratio
+        frame_h, frame_w = (frame_shape[i] if per_crop_shapes else frame_shape)[:2]
+        size_ratios[i] = (height * width) / (frame_h * frame_w)
 
-def recognize_face(face_img_path):
+    # Lighting balance (entropy) of all crops at once
+    totals = histograms.sum(axis=1, keepdims=True)
+    probabilities = histograms / np.maximum(totals, 1)
+    entropy = -np.sum(probabilities * np.log2(probabilities + 1e-10), axis=1)
+
+    # Combined score
+    return sharpness * 0.5 + entropy * 50 + size_ratios * 50
+
+
+def recognize_face(face_img):
     """
     Recognize a face by comparing it against all users in the database.
+    'face_img' can be a BGR numpy array (e.g. a crop of the current frame)
+    or an image path.
     Returns: (user_folder_name, confidence_score)
 
+    The probe is embedded once and compared against the whole embedding
+    gallery with a single cosine search.
+
     Lower confidence score means better match.
     Returns ("Unknown", 1.0) if no match found.
     """
     try:
-        # Check if database has any entries
-        if not any(os.path.isdir(os.path.join(db_path, d)) for d in os.listdir(db_path)):
+        gallery = get_face_gallery()
+        if len(gallery) == 0:
             return "Unknown", 1.0
 
-        best_match = "Unknown"
-        best_confidence = 1.0
-
-        # Iterate through all user folders
-        for user_folder in os.listdir(db_path):
-            user_path = os.path.join(db_path, user_folder)
-
-            if not os.path.isdir(user_path):
-                continue
-
-            # Get all image files in the user folder
-            image_files = [f for f in os.listdir(user_path)
-                           if f.endswith(('.jpg', '.jpeg', '.png'))]
-
-            if not image_files:
-                continue
-
-            # Verify against up to 3 reference images per user for speed
-            for img_file in image_files[:3]:
-                reference_img = os.path.join(user_path, img_file)
-
-                try:
-                    result = DeepFace.verify(
-                        img1_path=face_img_path,
-                        img2_path=reference_img,
-                        enforce_detection=False,
-                        model_name="ArcFace"  # ArcFace is most accurate
-                    )
-
-                    if result["verified"] and result["distance"] < best_confidence:
-                        best_match = user_folder
-                        best_confidence = result["distance"]
-
-                        # Early exit for very good matches
-                        if best_confidence < 0.2:
-                            break
-
-                except Exception as e:
-                    # Skip this comparison if it fails
-                    continue
-
-            # Early exit for very good matches
-            if best_confidence < 0.3:
-                break
-
-        return best_match, best_confidence
+        return gallery.recognize(face_img)
 
     except Exception as e:
         print(f"Recognition error: {e}")
@@ -143,6 +186,9 @@ def update_user_faces(user_folder, face_img, quality_score):
         # Sort by quality (lowest first)
         images.sort(key=lambda x: x[1])
 
+        # Keep the embedding gallery in sync with the files on disk
+        gallery = get_face_gallery()
+
         # Replace worst quality image if at capacity
         if len(images) >= MAX_FACES_PER_USER:
             if quality_score > images[0][1]:
@@ -150,12 +196,16 @@ def update_user_faces(user_folder, face_img, quality_score):
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 new_file = os.path.join(user_path, f"face_{timestamp}_q{quality_score:.1f}.jpg")
                 cv2.imwrite(new_file, face_img)
+                # One (debounced) cache write for the whole rotation
+                gallery.remove_image(images[0][0], save=False)
+                gallery.add_image(user_folder, new_file, face_img)
                 print(f"[UPDATED] Replaced low quality face (q: {quality_score:.1f}) for {user_folder}")
         else:
             # Add new image if under capacity
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             new_file = os.path.join(user_path, f"face_{timestamp}_q{quality_score:.1f}.jpg")
             cv2.imwrite(new_file, face_img)
+            gallery.add_image(user_folder, new_file, face_img)
             print(f"[ADDED] New face image (q: {quality_score:.1f}) for {user_folder}")
 
     except Exception as e:
@@ -189,6 +239,9 @@ def extract_face_features(face_img):
 def match_face_features(new_descriptor, stored_descriptors, threshold=0.75):
     """
     Match face descriptors using ORB feature matching.
+    'stored_descriptors' is a DescriptorIndex, or a {face_id: descriptors}
+    dict that is packed into one for this call. Keep a DescriptorIndex of
+    the live faces to match against many faces repeatedly.
     Returns: (best_face_id, best_score)
 
     Lower score means better match.
@@ -196,33 +249,15 @@ def match_face_features(new_descriptor, stored_descriptors, threshold=0.75):
     if new_descriptor is None or not stored_descriptors:
         return None, 1.0
 
-    best_match = None
-    best_score = 1.0
-
-    for face_id, descriptor in stored_descriptors.items():
-        if descriptor is None:
-            continue
-
-        # Use brute-force matcher with Hamming distance
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-
-        try:
-            matches = bf.match(new_descriptor, descriptor)
-
-            if len(matches) > 5:  # Need sufficient matches
-                # Calculate match quality (lower is better)
-                avg_distance = sum(match.distance for match in matches) / len(matches)
-                normalized_score = min(1.0, avg_distance / 100.0)
-
-                if normalized_score < best_score:
-                    best_score = normalized_score
-                    best_match = face_id
-
-        except Exception as e:
-            print(f"Error matching features: {e}")
-            continue
+    try:
+        if not isinstance(stored_descriptors, DescriptorIndex):
+            stored_descriptors = DescriptorIndex.from_dict(stored_descriptors)
+        # Need sufficient matches: more than 5
+        return stored_descriptors.match(new_descriptor, min_matches=6)
 
-    return best_match, best_score
+    except Exception as e:
+        print(f"Error matching features: {e}")
+        return None, 1.0
 
 
 def is_same_face_by_location(current_face, previous_face,
@@ -242,55 +277,13 @@ def is_same_face_by_location(current_face, previous_face,
 
     Returns:
         bool: True if faces are likely the same
-    """
-    # 1. Calculate Intersection over Union (IoU)
-    x_left = max(current_face['x'], previous_face['x'])
-    y_top = max(current_face['y'], previous_face['y'])
-    x_right = min(current_face['x'] + current_face['w'],
-                  previous_face['x'] + previous_face['w'])
-    y_bottom = min(current_face['y'] + current_face['h'],
-                   previous_face['y'] + previous_face['h'])
-
-    intersection_area = max(0, x_right - x_left) * max(0, y_bottom - y_top)
-
-    current_area = current_face['w'] * current_face['h']
-    previous_area = previous_face['w'] * previous_face['h']
-
-    union_area = current_area + previous_area - intersection_area
-    iou = intersection_area / union_area if union_area > 0 else 0
-
-    # 2. Calculate center distance
-    current_center_x = current_face['x'] + current_face['w'] / 2
-    current_center_y = current_face['y'] + current_face['h'] / 2
-    previous_center_x = previous_face['x'] + previous_face['w'] / 2
-    previous_center_y = previous_face['y'] + previous_face['h'] / 2
-
-    center_distance = ((current_center_x - previous_center_x) ** 2 +
-                       (current_center_y - previous_center_y) ** 2) ** 0.5
-
-    # Normalize by average face size
-    avg_size = (current_face['w'] + current_face['h'] +
-                previous_face['w'] + previous_face['h']) / 4
-    normalized_distance = center_distance / avg_size if avg_size > 0 else float('inf')
 
-    # 3. Calculate overlap ratio
-    smaller_area = min(current_area, previous_area)
-    overlap_ratio = intersection_area / smaller_area if smaller_area > 0 else 0
-
-    # 4. Check size similarity
-    width_ratio = min(current_face['w'], previous_face['w']) / max(current_face['w'], previous_face['w'])
-    height_ratio = min(current_face['h'], previous_face['h']) / max(current_face['h'], previous_face['h'])
-    size_ratio = width_ratio * height_ratio
-
-    # Decision logic
-    if iou >= iou_threshold:
-        return True
-    elif overlap_ratio >= overlap_threshold and normalized_distance <= distance_threshold:
-        return True
-    elif normalized_distance <= distance_threshold * 0.5 and size_ratio >= 0.7:
-        return True
-
-    return False
+    Use face_association.associate_faces to link many faces at once.
+    """
+    current_box = [current_face['x'], current_face['y'], current_face['w'], current_face['h']]
+    previous_box = [previous_face['x'], previous_face['y'], previous_face['w'], previous_face['h']]
+    matrices = association_matrices([current_box], [previous_box])
+    return bool(same_face_matrix(*matrices, iou_threshold, overlap_threshold, distance_threshold)[0, 0])
 
 
 def create_kalman_filter():
@@ -298,35 +291,20 @@ def create_kalman_filter():
     Create and initialize a Kalman filter for tracking face position and velocity.
     State: [x, y, w, h, vx, vy]
     Measurement: [x, y, w, h]
+
+    Uses the model of face_kalman; BatchedKalmanTracker runs the same
+    filter for many faces at once.
     """
     kalman = cv2.KalmanFilter(6, 4)
 
-    # State transition matrix (F)
-    kalman.transitionMatrix = np.array([
-        [1, 0, 0, 0, 1, 0],  # x = x + vx
-        [0, 1, 0, 0, 0, 1],  # y = y + vy
-        [0, 0, 1, 0, 0, 0],  # w = w
-        [0, 0, 0, 1, 0, 0],  # h = h
-        [0, 0, 0, 0, 1, 0],  # vx = vx
-        [0, 0, 0, 0, 0, 1]  # vy = vy
-    ], np.float32)
-
-    # Measurement matrix (H)
-    kalman.measurementMatrix = np.array([
-        [1, 0, 0, 0, 0, 0],
-        [0, 1, 0, 0, 0, 0],
-        [0, 0, 1, 0, 0, 0],
-        [0, 0, 0, 1, 0, 0]
-    ], np.float32)
-
-    # Process noise covariance (Q) - uncertainty in model
-    kalman.processNoiseCov = np.eye(6, dtype=np.float32) * 0.1
-    kalman.processNoiseCov[4:, 4:] *= 0.5  # Higher noise for velocity
-
-    # Measurement noise covariance (R) - uncertainty in measurements
-    kalman.measurementNoiseCov = np.eye(4, dtype=np.float32) * 1.0
-
-    # Error covariance (P) - initial uncertainty
-    kalman.errorCovPre = np.eye(6, dtype=np.float32) * 10
-
-    return kalman
\ No newline at end of file
+    kalman.transitionMatrix = TRANSITION.copy()           # F
+    kalman.measurementMatrix = MEASUREMENT.copy()         # H
+    kalman.processNoiseCov = PROCESS_NOISE.copy()         # Q
+    kalman.measurementNoiseCov = MEASUREMENT_NOISE.copy()  # R
+
+    # Error covariance (P) - initial uncertainty. predict() derives errorCovPre
+    # from errorCovPost, so that is the one to initialize
+    kalman.errorCovPre = INITIAL_COVARIANCE.copy()
+    kalman.errorCovPost = INITIAL_COVARIANCE.copy()
+
+    return kalman
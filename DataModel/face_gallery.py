@@ -0,0 +1,437 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import numpy as np
+from deepface import DeepFace
+from face_index import create_index, measure_recall_at_1
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Persisted embedding store, kept next to the user folders in db_path: one
+# line of JSON manifest followed by the embedding matrix in .npy format
+CACHE_FILE = ".gallery_cache"
+
+
+class FaceGallery:
+    """
+    In-memory gallery of L2-normalized face embeddings for every reference
+    image in the face database.
+
+    The database is embedded once. Recognizing a probe then costs a single
+    forward pass plus one matrix-vector cosine search against all references,
+    instead of one DeepFace.verify (two forward passes) per reference image.
+
+    Embeddings are persisted in db_path as a single cache file: a JSON
+    manifest recording the path, mtime and size of the image behind every
+    row, followed by the .npy matrix. The file is replaced atomically, so
+    readers in other processes never pair a matrix with another manifest.
+    On startup the matrix is memory-mapped and only images that were added,
+    removed or rewritten since the last run are embedded again.
+
+    load() never writes the cache; only the process that changes the
+    database (update_user_faces) does. Changes mark the gallery dirty and
+    are written at most once per 'save_interval' seconds, or by flush().
+    The images on disk stay the source of truth: a cache write lost in a
+    crash only costs embedding those images again on the next load.
+
+    Searches go through a pluggable nearest-neighbour index (see face_index).
+    Every row carries a stable integer id so the index can be updated
+    incrementally when update_user_faces rotates images.
+    """
+    def __init__(self, db_path, model_name="ArcFace", distance_threshold=0.68,
+                 index_backend="exact", index_params=None, target_recall=None,
+                 save_interval=10.0):
+        self.db_path = db_path
+        self.model_name = model_name
+        # Cosine distance at which DeepFace.verify reports a match for ArcFace
+        self.distance_threshold = distance_threshold
+
+        # Nearest-neighbour index configuration
+        self.index_backend = index_backend
+        self.index_params = index_params or {}
+        self.target_recall = target_recall  # Minimum recall@1 vs. exact search
+        self.index = None
+        self.ids = []           # Stable index id for each row
+        self.id_to_row = {}
+        self.next_id = 0
+
+        self.embeddings = None  # (N, D) float32, rows are unit length
+        self.labels = []        # User folder name for each row
+        self.paths = []         # Reference image path for each row
+        self.file_stats = []    # (mtime, size) of the image behind each row
+        self.lock = threading.Lock()
+
+        self.cache_file = os.path.join(db_path, CACHE_FILE)
+        self.cached_matrix = None
+        self.save_interval = save_interval  # Minimum seconds between cache writes
+        self.dirty = False                  # In-memory rows differ from the cache file
+        self.last_save = 0.0
+
+    def embed(self, img):
+        """
+        Compute the L2-normalized embedding of a face.
+        'img' can be an image path or a BGR numpy array.
+        Returns None if no embedding could be produced.
+        """
+        try:
+            representations = DeepFace.represent(
+                img_path=img,
+                model_name=self.model_name,
+                enforce_detection=False
+            )
+        except Exception as e:
+            print(f"Error embedding face: {e}")
+            return None
+
+        if not representations:
+            return None
+
+        embedding = np.asarray(representations[0]["embedding"], dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return None
+        return embedding / norm
+
+    def load(self, save=False):
+        """
+        Load the persisted gallery and bring it up to date with the database.
+        Only images whose path, mtime or size changed are embedded again.
+        The cache is only rewritten with save=True; otherwise a stale cache
+        just marks the gallery dirty for the next save_if_due() or flush().
+        """
+        cached = self.read_cache()
+
+        labels, paths, file_stats, rows = [], [], [], []
+        reused = embedded = 0
+        in_order = True
+
+        for user_folder, image_path in self.scan_references():
+            stat = self.stat_file(image_path)
+            if stat is None:
+                continue
+
+            entry = cached.get(self.relative_path(image_path))
+            if entry is not None and entry["stat"] == stat:
+                rows.append(self.cached_matrix[entry["index"]])
+                in_order = in_order and entry["index"] == reused
+                reused += 1
+            else:
+                embedding = self.embed(image_path)
+                if embedding is None:
+                    continue
+                rows.append(embedding)
+                embedded += 1
+
+            labels.append(user_folder)
+            paths.append(image_path)
+            file_stats.append(stat)
+
+        unchanged = embedded == 0 and reused == len(cached) and in_order
+
+        with self.lock:
+            self.labels = labels
+            self.paths = paths
+            self.file_stats = file_stats
+            if unchanged and reused > 0:
+                # Nothing changed on disk, keep serving from the memory map
+                self.embeddings = self.cached_matrix
+            else:
+                self.embeddings = np.vstack(rows).astype(np.float32) if rows else None
+            self.dirty = not unchanged
+        self.cached_matrix = None
+
+        if save and not unchanged:
+            self.save()
+        self.rebuild_index()
+
+        print(f"[INFO] Face gallery loaded: {reused} cached, {embedded} embedded, "
+              f"{len(cached) - reused} removed.")
+
+    def build(self):
+        """Embed every reference image in the database, ignoring the cache."""
+        labels, paths, file_stats, vectors = [], [], [], []
+
+        for user_folder, image_path in self.scan_references():
+            stat = self.stat_file(image_path)
+            embedding = self.embed(image_path)
+            if stat is None or embedding is None:
+                continue
+            labels.append(user_folder)
+            paths.append(image_path)
+            file_stats.append(stat)
+            vectors.append(embedding)
+
+        with self.lock:
+            self.labels = labels
+            self.paths = paths
+            self.file_stats = file_stats
+            self.embeddings = np.vstack(vectors) if vectors else None
+            self.dirty = True
+
+        self.save()
+        self.rebuild_index()
+        print(f"[INFO] Face gallery built with {len(paths)} reference images.")
+
+    def rebuild_index(self):
+        """Build the nearest-neighbour index over all rows from scratch."""
+        with self.lock:
+            self.ids = list(range(len(self.paths)))
+            self.id_to_row = {vector_id: row for row, vector_id in enumerate(self.ids)}
+            self.next_id = len(self.ids)
+
+            if self.embeddings is None:
+                self.index = None
+                return
+
+            self.index = create_index(self.index_backend, self.embeddings.shape[1], **self.index_params)
+            self.index.build(self.ids, self.embeddings)
+
+        if self.target_recall is not None:
+            self.calibrate(self.target_recall)
+
+    def measure_recall(self, num_queries=200, noise=0.05, seed=0):
+        """
+        Measure recall@1 of the index against exact search.
+        Queries are stored embeddings perturbed with Gaussian noise, so they
+        behave like fresh probes of people already in the database.
+        """
+        with self.lock:
+            if self.index is None:
+                return 1.0
+
+            rng = np.random.default_rng(seed)
+            rows = rng.choice(len(self.ids), min(num_queries, len(self.ids)), replace=False)
+            queries = self.embeddings[rows] + rng.normal(0, noise, (len(rows), self.embeddings.shape[1]))
+            queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+            return measure_recall_at_1(self.index, self.ids, self.embeddings, queries)
+
+    def calibrate(self, target_recall):
+        """Widen the index search until recall@1 reaches 'target_recall'."""
+        recall = self.measure_recall()
+        while recall < target_recall:
+            with self.lock:
+                widened = self.index.tune_up()
+            if not widened:
+                break
+            recall = self.measure_recall()
+
+        print(f"[INFO] Face index '{self.index_backend}' recall@1: {recall:.3f}")
+        return recall
+
+    def read_cache(self):
+        """
+        Read the persisted manifest and memory-map its embedding matrix.
+        Returns: {relative_path: {"stat": (mtime, size), "index": row}}
+        """
+        self.cached_matrix = None
+        try:
+            with open(self.cache_file, 'rb') as f:
+                manifest = json.loads(f.readline())
+                if manifest.get("model") != self.model_name:
+                    return {}
+                entries = manifest.get("entries", [])
+                if not entries:
+                    return {}
+
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                offset = f.tell()
+
+            if len(shape) != 2 or shape[0] != len(entries):
+                print("[WARNING] Face gallery cache is inconsistent, rebuilding.")
+                return {}
+            matrix = np.memmap(self.cache_file, dtype=dtype, mode='r', shape=shape,
+                               offset=offset, order='F' if fortran_order else 'C')
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[WARNING] Could not read face gallery cache: {e}")
+            return {}
+
+        self.cached_matrix = matrix
+        return {entry["path"]: {"stat": (entry["mtime"], entry["size"]), "index": row}
+                for row, entry in enumerate(entries)}
+
+    def save(self):
+        """
+        Persist the manifest and embedding matrix as one file. It is written
+        to a temporary file and swapped in with a single os.replace, so a
+        reader or a crash never sees a matrix paired with another manifest.
+        """
+        with self.lock:
+            entries = [{"path": self.relative_path(path), "label": label,
+                        "mtime": stat[0], "size": stat[1]}
+                       for path, label, stat in zip(self.paths, self.labels, self.file_stats)]
+            matrix = self.embeddings
+            if matrix is None:
+                matrix = np.empty((0, 0), dtype=np.float32)
+            else:
+                # Detach from any memory map of the file we are about to replace
+                matrix = np.array(matrix, dtype=np.float32)
+                self.embeddings = matrix
+
+            tmp_file = None
+            try:
+                fd, tmp_file = tempfile.mkstemp(dir=self.db_path, prefix=CACHE_FILE, suffix=".tmp")
+                with os.fdopen(fd, 'wb') as f:
+                    # json.dumps escapes newlines, so the manifest is exactly one line
+                    f.write(json.dumps({"model": self.model_name, "entries": entries}).encode() + b"\n")
+                    np.lib.format.write_array(f, matrix)
+                os.replace(tmp_file, self.cache_file)
+                self.dirty = False
+            except Exception as e:
+                print(f"[WARNING] Could not save face gallery cache: {e}")
+                if tmp_file is not None:
+                    try:
+                        os.remove(tmp_file)
+                    except OSError:
+                        pass
+            self.last_save = time.time()
+
+    def save_if_due(self):
+        """Write the cache if it is stale and 'save_interval' has passed since the last write."""
+        if self.dirty and time.time() - self.last_save >= self.save_interval:
+            self.save()
+
+    def flush(self):
+        """Write any pending changes to the cache now."""
+        if self.dirty:
+            self.save()
+
+    def relative_path(self, image_path):
+        return os.path.relpath(image_path, self.db_path).replace(os.sep, '/')
+
+    @staticmethod
+    def stat_file(image_path):
+        """Return the (mtime, size) pair used to detect rewritten files."""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def scan_references(self):
+        """Yield (user_folder, image_path) for every reference image on disk."""
+        if not os.path.isdir(self.db_path):
+            return
+
+        for user_folder in sorted(os.listdir(self.db_path)):
+            user_path = os.path.join(self.db_path, user_folder)
+            if not os.path.isdir(user_path):
+                continue
+
+            for img_file in sorted(os.listdir(user_path)):
+                if img_file.endswith(IMAGE_EXTENSIONS):
+                    yield user_folder, os.path.join(user_path, img_file)
+
+    def add_image(self, user_folder, image_path, img=None, save=True):
+        """
+        Add a single reference image to the gallery.
+        'img' can be passed to avoid reading the file back from disk.
+        The change is written to the cache by save_if_due(), so bursts of
+        updates cost one write; with save=False the write is left to a later
+        save_if_due() or flush().
+        """
+        embedding = self.embed(img if img is not None else image_path)
+        stat = self.stat_file(image_path)
+        if embedding is None or stat is None:
+            return False
+
+        with self.lock:
+            vector_id = self.next_id
+            self.next_id += 1
+
+            if image_path in self.paths:
+                # The file was rewritten in place, replace its row
+                row = self.paths.index(image_path)
+                self.embeddings = np.array(self.embeddings)
+                self.embeddings[row] = embedding
+                self.labels[row] = str(user_folder)
+                self.file_stats[row] = stat
+                if self.index is not None:
+                    self.index.remove([self.ids[row]])
+                del self.id_to_row[self.ids[row]]
+                self.ids[row] = vector_id
+                self.id_to_row[vector_id] = row
+            else:
+                if self.embeddings is None:
+                    self.embeddings = embedding[np.newaxis, :]
+                else:
+                    self.embeddings = np.vstack([self.embeddings, embedding])
+                self.labels.append(str(user_folder))
+                self.paths.append(image_path)
+                self.file_stats.append(stat)
+                self.ids.append(vector_id)
+                self.id_to_row[vector_id] = len(self.ids) - 1
+
+            if self.index is None:
+                self.index = create_index(self.index_backend, len(embedding), **self.index_params)
+            self.index.add([vector_id], embedding[np.newaxis, :])
+            self.dirty = True
+
+        if save:
+            self.save_if_due()
+        return True
+
+    def remove_image(self, image_path, save=True):
+        """Remove a reference image from the gallery (see add_image for 'save')."""
+        with self.lock:
+            if image_path not in self.paths:
+                return False
+
+            row = self.paths.index(image_path)
+            if self.index is not None:
+                self.index.remove([self.ids[row]])
+            del self.labels[row]
+            del self.paths[row]
+            del self.file_stats[row]
+            del self.ids[row]
+            self.id_to_row = {vector_id: r for r, vector_id in enumerate(self.ids)}
+            self.embeddings = np.delete(self.embeddings, row, axis=0)
+            if len(self.embeddings) == 0:
+                self.embeddings = None
+            self.dirty = True
+
+        if save:
+            self.save_if_due()
+        return True
+
+    def search(self, embedding):
+        """
+        Find the closest reference to an already normalized embedding.
+        Returns: (user_folder_name, cosine_distance)
+        Returns ("Unknown", 1.0) if nothing is within the threshold.
+        """
+        with self.lock:
+            if self.index is None or embedding is None:
+                return "Unknown", 1.0
+
+            # Rows are unit length, so the inner product is the cosine similarity
+            found, similarities = self.index.search(embedding, k=1)
+            if len(found) == 0:
+                return "Unknown", 1.0
+            # Rounding can push the similarity of a near duplicate just above 1
+            best_distance = max(0.0, float(1.0 - similarities[0]))
+            best_label = self.labels[self.id_to_row[int(found[0])]]
+
+        if best_distance <= self.distance_threshold and best_distance < 1.0:
+            return best_label, best_distance
+        return "Unknown", 1.0
+
+    def recognize(self, img):
+        """
+        Embed a face and search the gallery.
+        Returns: (user_folder_name, cosine_distance)
+        """
+        if self.embeddings is None:
+            return "Unknown", 1.0
+        return self.search(self.embed(img))
+
+    def __len__(self):
+        return len(self.paths)
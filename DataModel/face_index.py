@@ -0,0 +1,291 @@
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+class ExactIndex:
+    """
+    Brute-force inner product index over unit-length vectors.
+    Every search is one matrix-vector product against all stored vectors.
+    """
+    def __init__(self, dim):
+        self.dim = dim
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+
+    def build(self, ids, vectors):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+
+    def add(self, ids, vectors):
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+        self.vectors = np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)])
+
+    def remove(self, ids):
+        keep = ~np.isin(self.ids, np.asarray(ids, dtype=np.int64))
+        self.ids = self.ids[keep]
+        self.vectors = self.vectors[keep]
+
+    def search(self, query, k=1):
+        """Returns: (ids, similarities) of the k best matches, best first."""
+        if len(self.ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        similarities = self.vectors @ query
+        return top_k(self.ids, similarities, k)
+
+    def tune_up(self):
+        """Exact search cannot be made more accurate."""
+        return False
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class IVFFlatIndex:
+    """
+    Inverted-file index with flat (uncompressed) lists, written in NumPy.
+
+    Vectors are bucketed by their nearest spherical k-means centroid and a
+    query only scans the 'nprobe' buckets whose centroids are closest to it.
+    The quantizer is retrained once the index has grown well past the size
+    it was trained on.
+    """
+    MIN_POINTS_PER_LIST = 8
+    RETRAIN_GROWTH = 4
+    KMEANS_ITERATIONS = 10
+
+    def __init__(self, dim, nlist=64, nprobe=4, seed=0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.rng = np.random.default_rng(seed)
+
+        self.centroids = None
+        self.list_ids = []
+        self.list_vectors = []
+        self.id_to_list = {}
+        self.trained_size = 0
+
+    def build(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        self.train(vectors)
+        self.list_ids = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self.list_vectors = [np.empty((0, self.dim), dtype=np.float32) for _ in range(len(self.centroids))]
+        self.id_to_list = {}
+        self.insert(ids, vectors)
+
+    def train(self, vectors):
+        """Spherical k-means on the stored vectors."""
+        n = len(vectors)
+        nlist = max(1, min(self.nlist, n // self.MIN_POINTS_PER_LIST))
+        self.trained_size = n
+
+        if n == 0:
+            self.centroids = np.zeros((1, self.dim), dtype=np.float32)
+            return
+
+        centroids = vectors[self.rng.choice(n, nlist, replace=False)].copy()
+        for _ in range(self.KMEANS_ITERATIONS):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            counts = np.bincount(assignment, minlength=nlist)
+
+            # Reseed empty clusters with random points
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = vectors[self.rng.choice(n, int(empty.sum()))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+
+        self.centroids = centroids.astype(np.float32)
+
+    def insert(self, ids, vectors):
+        if len(ids) == 0:
+            return
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for list_no in np.unique(assignment):
+            members = assignment == list_no
+            self.list_ids[list_no] = np.concatenate([self.list_ids[list_no], ids[members]])
+            self.list_vectors[list_no] = np.vstack([self.list_vectors[list_no], vectors[members]])
+            for vector_id in ids[members]:
+                self.id_to_list[int(vector_id)] = int(list_no)
+
+    def add(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+
+        if self.centroids is None:
+            self.build(ids, vectors)
+            return
+
+        total = len(self) + len(ids)
+        if total > max(self.trained_size, self.MIN_POINTS_PER_LIST) * self.RETRAIN_GROWTH:
+            # The quantizer no longer represents the data, retrain from scratch
+            all_ids = np.concatenate(self.list_ids + [ids])
+            all_vectors = np.vstack(self.list_vectors + [vectors])
+            self.build(all_ids, all_vectors)
+            return
+
+        self.insert(ids, vectors)
+
+    def remove(self, ids):
+        by_list = {}
+        for vector_id in ids:
+            list_no = self.id_to_list.pop(int(vector_id), None)
+            if list_no is not None:
+                by_list.setdefault(list_no, []).append(int(vector_id))
+
+        for list_no, removed in by_list.items():
+            keep = ~np.isin(self.list_ids[list_no], removed)
+            self.list_ids[list_no] = self.list_ids[list_no][keep]
+            self.list_vectors[list_no] = self.list_vectors[list_no][keep]
+
+    def search(self, query, k=1):
+        """Returns: (ids, similarities) of the k best matches, best first."""
+        if self.centroids is None or len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        ids = np.concatenate([self.list_ids[p] for p in probes])
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        vectors = np.vstack([self.list_vectors[p] for p in probes])
+        return top_k(ids, vectors @ query, k)
+
+    def tune_up(self):
+        """Probe more lists. Returns False once every list is scanned."""
+        if self.centroids is None or self.nprobe >= len(self.centroids):
+            return False
+        self.nprobe = min(self.nprobe * 2, len(self.centroids))
+        return True
+
+    def __len__(self):
+        return len(self.id_to_list)
+
+
+class HNSWIndex:
+    """
+    HNSW graph index backed by the optional 'hnswlib' package.
+    Removed vectors are marked deleted and their slots are reused on insert.
+    """
+    MAX_EF = 1024
+
+    def __init__(self, dim, M=16, ef_construction=200, ef=64, initial_capacity=1024):
+        if hnswlib is None:
+            raise ImportError("The 'hnsw' index backend requires the hnswlib package.")
+
+        self.dim = dim
+        self.ef = ef
+        self.M = M
+        self.ef_construction = ef_construction
+        self.initial_capacity = initial_capacity
+        self.live_ids = set()
+        self.index = None
+
+    def build(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+
+        self.index = hnswlib.Index(space='ip', dim=self.dim)
+        self.index.init_index(max_elements=max(self.initial_capacity, len(ids)),
+                              ef_construction=self.ef_construction, M=self.M,
+                              allow_replace_deleted=True)
+        self.index.set_ef(self.ef)
+        self.live_ids = set()
+        self.add(ids, vectors)
+
+    def add(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if self.index is None:
+            self.build(ids, vectors)
+            return
+        if len(ids) == 0:
+            return
+
+        # Grow the graph capacity geometrically
+        needed = self.index.get_current_count() + len(ids)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, self.index.get_max_elements() * 2))
+
+        self.index.add_items(vectors, ids, replace_deleted=True)
+        self.live_ids.update(int(i) for i in ids)
+
+    def remove(self, ids):
+        for vector_id in ids:
+            vector_id = int(vector_id)
+            if vector_id in self.live_ids:
+                self.index.mark_deleted(vector_id)
+                self.live_ids.discard(vector_id)
+
+    def search(self, query, k=1):
+        """Returns: (ids, similarities) of the k best matches, best first."""
+        if self.index is None or not self.live_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        k = min(k, len(self.live_ids))
+        labels, distances = self.index.knn_query(query.reshape(1, -1), k=k)
+        # hnswlib reports inner product distance as 1 - dot
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def tune_up(self):
+        """Widen the search beam. Returns False once it is at its maximum."""
+        if self.index is None or self.ef >= self.MAX_EF:
+            return False
+        self.ef = min(self.ef * 2, self.MAX_EF)
+        self.index.set_ef(self.ef)
+        return True
+
+    def __len__(self):
+        return len(self.live_ids)
+
+
+INDEX_BACKENDS = {
+    "exact": ExactIndex,
+    "ivf": IVFFlatIndex,
+    "hnsw": HNSWIndex,
+}
+
+
+def create_index(backend, dim, **params):
+    """Create a gallery index by backend name ('exact', 'ivf' or 'hnsw')."""
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown face index backend: {backend}")
+    return INDEX_BACKENDS[backend](dim, **params)
+
+
+def top_k(ids, similarities, k):
+    """Pick the k highest similarities, best first."""
+    k = min(k, len(ids))
+    if k < len(ids):
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+    else:
+        candidates = np.arange(len(ids))
+    order = candidates[np.argsort(-similarities[candidates])]
+    return ids[order], similarities[order]
+
+
+def measure_recall_at_1(index, ids, vectors, queries):
+    """
+    Fraction of queries for which 'index' returns the same nearest
+    neighbour as an exact search over (ids, vectors).
+    """
+    if len(queries) == 0 or len(ids) == 0:
+        return 1.0
+
+    exact_best = np.asarray(ids)[np.argmax(queries @ vectors.T, axis=1)]
+    hits = 0
+    for query, expected in zip(queries, exact_best):
+        found, _ = index.search(query, k=1)
+        if len(found) and found[0] == expected:
+            hits += 1
+    return hits / len(queries)
@@ -0,0 +1,142 @@
+import numpy as np
+
+# Constant-velocity model of a face box.
+# State: [x, y, w, h, vx, vy], measurement: [x, y, w, h]
+
+# State transition matrix (F)
+TRANSITION = np.array([
+    [1, 0, 0, 0, 1, 0],  # x = x + vx
+    [0, 1, 0, 0, 0, 1],  # y = y + vy
+    [0, 0, 1, 0, 0, 0],  # w = w
+    [0, 0, 0, 1, 0, 0],  # h = h
+    [0, 0, 0, 0, 1, 0],  # vx = vx
+    [0, 0, 0, 0, 0, 1]   # vy = vy
+], np.float32)
+
+# Measurement matrix (H)
+MEASUREMENT = np.array([
+    [1, 0, 0, 0, 0, 0],
+    [0, 1, 0, 0, 0, 0],
+    [0, 0, 1, 0, 0, 0],
+    [0, 0, 0, 1, 0, 0]
+], np.float32)
+
+# Process noise covariance (Q) - uncertainty in model, higher for velocity
+PROCESS_NOISE = np.eye(6, dtype=np.float32) * 0.1
+PROCESS_NOISE[4:, 4:] *= 0.5
+
+# Measurement noise covariance (R) - uncertainty in measurements
+MEASUREMENT_NOISE = np.eye(4, dtype=np.float32) * 1.0
+
+# Error covariance (P) - initial uncertainty
+INITIAL_COVARIANCE = np.eye(6, dtype=np.float32) * 10
+
+
+class BatchedKalmanTracker:
+    """
+    Constant-velocity Kalman filters of all live faces in stacked arrays.
+
+    States are rows of one (capacity, 6) array and covariances slices of one
+    (capacity, 6, 6) array, so predict and correct run for any number of
+    faces in a single vectorized call instead of one cv2.KalmanFilter per
+    face. Faces are added at the end and removed by moving the last face
+    into the freed row, so both are O(1).
+    """
+    def __init__(self, capacity=64):
+        self.states = np.zeros((capacity, 6), dtype=np.float32)
+        self.covariances = np.zeros((capacity, 6, 6), dtype=np.float32)
+        self.face_ids = []  # Row -> face id
+        self.rows = {}      # Face id -> row
+
+    def grow(self):
+        capacity = 2 * len(self.states)
+        states = np.zeros((capacity, 6), dtype=np.float32)
+        covariances = np.zeros((capacity, 6, 6), dtype=np.float32)
+        states[:len(self.face_ids)] = self.states[:len(self.face_ids)]
+        covariances[:len(self.face_ids)] = self.covariances[:len(self.face_ids)]
+        self.states, self.covariances = states, covariances
+
+    def add(self, face_id, box):
+        """Start tracking a face at 'box' (x, y, w, h) with zero velocity."""
+        if face_id in self.rows:
+            self.remove(face_id)
+        if len(self.face_ids) == len(self.states):
+            self.grow()
+
+        row = len(self.face_ids)
+        self.states[row, :4] = box
+        self.states[row, 4:] = 0
+        self.covariances[row] = INITIAL_COVARIANCE
+        self.face_ids.append(face_id)
+        self.rows[face_id] = row
+
+    def remove(self, face_id):
+        row = self.rows.pop(face_id, None)
+        if row is None:
+            return
+        last = len(self.face_ids) - 1
+        if row != last:
+            # Move the last face into the freed row
+            moved_id = self.face_ids[last]
+            self.states[row] = self.states[last]
+            self.covariances[row] = self.covariances[last]
+            self.face_ids[row] = moved_id
+            self.rows[moved_id] = row
+        self.face_ids.pop()
+
+    def row_indices(self, face_ids):
+        if face_ids is None:
+            return np.arange(len(self.face_ids))
+        return np.array([self.rows[face_id] for face_id in face_ids], dtype=np.intp)
+
+    def predict(self, face_ids=None):
+        """
+        Advance the given faces (all if None) by one frame.
+        Returns: (K, 4) predicted boxes
+        """
+        rows = self.row_indices(face_ids)
+        states = self.states[rows] @ TRANSITION.T
+        covariances = TRANSITION @ self.covariances[rows] @ TRANSITION.T + PROCESS_NOISE
+        self.states[rows] = states
+        self.covariances[rows] = covariances
+        return states[:, :4]
+
+    def correct(self, face_ids, measurements):
+        """
+        Update the given faces with measured boxes, (K, 4) as (x, y, w, h).
+        Returns: (K, 4) corrected boxes
+        """
+        rows = self.row_indices(face_ids)
+        measurements = np.asarray(measurements, dtype=np.float32).reshape(-1, 4)
+        states = self.states[rows]
+        covariances = self.covariances[rows]
+
+        # Innovation and its covariance: y = z - Hx, S = HPH' + R
+        innovation = measurements - states @ MEASUREMENT.T
+        innovation_cov = MEASUREMENT @ covariances @ MEASUREMENT.T + MEASUREMENT_NOISE
+
+        # Gain K = PH'S^-1, solved as S K' = H P' since S is symmetric
+        gain = np.linalg.solve(innovation_cov, MEASUREMENT @ covariances.transpose(0, 2, 1)).transpose(0, 2, 1)
+
+        states = states + np.einsum("kij,kj->ki", gain, innovation)
+        covariances = covariances - gain @ MEASUREMENT @ covariances
+        self.states[rows] = states
+        self.covariances[rows] = covariances
+        return states[:, :4]
+
+    def step(self, face_ids, measurements):
+        """Predict and correct the given faces in one go. Returns (K, 4) boxes."""
+        if len(face_ids) == 0:
+            return np.empty((0, 4), dtype=np.float32)
+        self.predict(face_ids)
+        return self.correct(face_ids, measurements)
+
+    def box(self, face_id):
+        """Current (x, y, w, h) estimate of a face."""
+        return self.states[self.rows[face_id], :4]
+
+    def __len__(self):
+        return len(self.face_ids)
+
+    def __contains__(self, face_id):
+        return face_id in self.rows
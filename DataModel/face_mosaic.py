@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+
+
+def upper_body_box(person_box, frame_shape, fraction=0.5):
+    """
+    Return the clipped (x1, y1, x2, y2) of the top 'fraction' of a person box,
+    where the face is, or None if it lies outside the frame.
+    """
+    px, py, pw, ph = person_box
+    frame_h, frame_w = frame_shape[:2]
+    x1, y1 = max(0, px), max(0, py)
+    x2 = min(frame_w, px + pw)
+    y2 = min(frame_h, py + int(ph * fraction))
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+def build_mosaics(crops, cell_size=192, grid=(4, 4)):
+    """
+    Tile image crops into square mosaics of grid[0] x grid[1] cells.
+    Each crop is scaled to fit its cell, keeping its aspect ratio.
+    Returns: list of (mosaic, placements), one placement per tiled crop:
+             (crop_index, cell_x, cell_y, scale)
+    """
+    cols, rows = grid
+    per_mosaic = cols * rows
+    mosaics = []
+
+    for start in range(0, len(crops), per_mosaic):
+        mosaic = np.zeros((rows * cell_size, cols * cell_size, 3), dtype=np.uint8)
+        placements = []
+
+        for cell, crop_index in enumerate(range(start, min(start + per_mosaic, len(crops)))):
+            crop = crops[crop_index]
+            crop_h, crop_w = crop.shape[:2]
+            scale = min(cell_size / crop_w, cell_size / crop_h)
+            new_w = max(1, min(cell_size, int(round(crop_w * scale))))
+            new_h = max(1, min(cell_size, int(round(crop_h * scale))))
+
+            cell_x = (cell % cols) * cell_size
+            cell_y = (cell // cols) * cell_size
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            cv2.resize(crop, (new_w, new_h), dst=mosaic[cell_y:cell_y + new_h, cell_x:cell_x + new_w],
+                       interpolation=interpolation)
+            placements.append((crop_index, cell_x, cell_y, scale))
+
+        mosaics.append((mosaic, placements))
+
+    return mosaics
+
+
+def map_mosaic_boxes(boxes_xyxy, confidences, placements, cell_size):
+    """
+    Map face boxes detected on a mosaic back to the crops they came from.
+    A box belongs to the cell containing its centre and is clipped to it.
+    Returns: {crop_index: [(x1, y1, x2, y2, confidence), ...]} in crop coordinates
+    """
+    by_cell = {(cell_x // cell_size, cell_y // cell_size): (crop_index, cell_x, cell_y, scale)
+               for crop_index, cell_x, cell_y, scale in placements}
+    mapped = {}
+
+    for (x1, y1, x2, y2), confidence in zip(boxes_xyxy, confidences):
+        cell = (int((x1 + x2) / 2) // cell_size, int((y1 + y2) / 2) // cell_size)
+        placement = by_cell.get(cell)
+        if placement is None:
+            continue
+
+        crop_index, cell_x, cell_y, scale = placement
+        # Clip to the cell so a box never reaches into a neighbouring crop
+        x1, x2 = np.clip([x1, x2], cell_x, cell_x + cell_size)
+        y1, y2 = np.clip([y1, y2], cell_y, cell_y + cell_size)
+        mapped.setdefault(crop_index, []).append((
+            (x1 - cell_x) / scale, (y1 - cell_y) / scale,
+            (x2 - cell_x) / scale, (y2 - cell_y) / scale,
+            float(confidence)))
+
+    return mapped
@@ -0,0 +1,114 @@
+import json
+import numpy as np
+
+# Defaults of CameraItem's FOV settings
+DEFAULT_VIEW_ANGLE = 70.0   # Field of View in degrees
+DEFAULT_VIEW_RANGE = 200.0  # Max range in pixels
+DEFAULT_VIEW_RAYS = 90      # Number of rays to cast
+
+
+def ray_directions(rotation, view_angle=DEFAULT_VIEW_ANGLE, view_rays=DEFAULT_VIEW_RAYS):
+    """
+    Unit directions of a camera's rays in scene coordinates, as CameraItem
+    casts them: 'view_rays' + 1 rays spread over 'view_angle' degrees
+    around the camera's rotation (Qt rotation, clockwise, y down).
+    Returns: (view_rays + 1, 2) array
+    """
+    angles = np.radians(-rotation - view_angle / 2 + view_angle * np.arange(view_rays + 1) / view_rays)
+    return np.stack([np.cos(angles), -np.sin(angles)], axis=1)  # Y is inverted
+
+
+def cast_rays(origin, directions, segments, max_range):
+    """
+    Intersect rays from 'origin' with wall segments in one vectorized pass.
+    'directions' is (R, 2) unit vectors and 'segments' (S, 4) as
+    (x1, y1, x2, y2), all in scene coordinates.
+    Returns: (distances (R,), hit points (R, 2)); rays that hit nothing end
+             at 'max_range'.
+    """
+    origin = np.asarray(origin, dtype=np.float64)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 2)
+    distances = np.full(len(directions), float(max_range))
+
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if len(segments):
+        # Ray: origin + t * d, segment: a + u * e, solved for every (ray, segment) pair
+        starts = segments[:, :2]
+        edges = segments[:, 2:] - starts
+        offsets = starts - origin
+
+        denominator = directions[:, 0:1] * edges[None, :, 1] - directions[:, 1:2] * edges[None, :, 0]
+        t_numerator = offsets[None, :, 0] * edges[None, :, 1] - offsets[None, :, 1] * edges[None, :, 0]
+        u_numerator = offsets[None, :, 0] * directions[:, 1:2] - offsets[None, :, 1] * directions[:, 0:1]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = t_numerator / denominator
+            u = u_numerator / denominator
+        # Parallel pairs (zero denominator) come out as inf or nan and fail these tests
+        hit = (t >= 0) & (t <= max_range) & (u >= 0) & (u <= 1)
+        if hit.any():
+            distances = np.minimum(distances, np.where(hit, t, np.inf).min(axis=1))
+
+    return distances, origin + directions * distances[:, None]
+
+
+def fov_polygon(origin, rotation, segments, view_angle=DEFAULT_VIEW_ANGLE,
+                view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS):
+    """
+    FOV polygon of a camera in scene coordinates: the camera position
+    followed by the nearest wall hit (or range limit) of every ray.
+    Returns: (view_rays + 2, 2) array
+    """
+    _, points = cast_rays(origin, ray_directions(rotation, view_angle, view_rays), segments, view_range)
+    return np.vstack([np.asarray(origin, dtype=np.float64).reshape(1, 2), points])
+
+
+def range_rect(origin, view_range=DEFAULT_VIEW_RANGE):
+    """(x1, y1, x2, y2) box around a camera that holds everything it can see."""
+    x, y = origin
+    return x - view_range, y - view_range, x + view_range, y + view_range
+
+
+def wall_segments(width, height, pos, rotation):
+    """
+    The four edges of a wall as WallItem places it: a width x height
+    rectangle centred on its origin, rotated by 'rotation' degrees and
+    moved to 'pos'.
+    Returns: (4, 4) array of (x1, y1, x2, y2)
+    """
+    corners = np.array([[-width / 2, -height / 2], [width / 2, -height / 2],
+                        [width / 2, height / 2], [-width / 2, height / 2]])
+    rad = np.radians(rotation)
+    cos, sin = np.cos(rad), np.sin(rad)
+    # Qt rotation maps (x, y) to (x cos - y sin, x sin + y cos)
+    rotated = np.stack([corners[:, 0] * cos - corners[:, 1] * sin,
+                        corners[:, 0] * sin + corners[:, 1] * cos], axis=1) + np.asarray(pos, dtype=np.float64)
+    return np.hstack([rotated, np.roll(rotated, -1, axis=0)])
+
+
+def layout_segments(layout):
+    """Edges of every wall of a map.json layout. Returns: (S, 4) array"""
+    walls = layout.get("walls", [])
+    if not walls:
+        return np.empty((0, 4))
+    return np.vstack([wall_segments(wall["width"], wall["height"], wall["pos"], wall["rot"]) for wall in walls])
+
+
+def load_layout(path):
+    """
+    Read a map.json layout saved by MainWindow.
+    Returns: (wall segments (S, 4), list of camera dicts with name, url, pos and rot)
+    """
+    with open(path, 'r') as f:
+        layout = json.load(f)
+    return layout_segments(layout), layout.get("cameras", [])
+
+
+def layout_fovs(path, view_angle=DEFAULT_VIEW_ANGLE, view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS):
+    """
+    FOV polygons of every camera of a map.json layout, without a Qt scene.
+    Returns: {camera_name: (view_rays + 2, 2) polygon in scene coordinates}
+    """
+    segments, cameras = load_layout(path)
+    return {camera["name"]: fov_polygon(camera["pos"], camera["rot"], segments, view_angle, view_range, view_rays)
+            for camera in cameras}
@@ -0,0 +1,249 @@
+import sys
+import time
+import threading
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+WRITING = -1  # Slot sequence number while a frame is being written
+
+
+class FrameRing:
+    """
+    Preallocated fixed-slot frame buffer with latest-frame semantics.
+
+    Producers write (or decode, see begin_write) straight into a free slot
+    and consumers get a NumPy view of the newest frame, so a frame is never
+    copied on its way from the camera to the consumers. A consumer pins the
+    slot it reads until it calls release(seq); the producer skips pinned
+    slots, and drops the frame if every slot is pinned. Producers that do
+    not publish every frame they grab report how many they skipped, so
+    consumers can tell consecutive sequence numbers from consecutive frames
+    (see skipped_count).
+    """
+    def __init__(self, slots=4):
+        self.slots = slots
+        self.frames = None                    # (slots, H, W, C) storage, allocated on first write
+        self.slot_seq = [WRITING] * slots     # Sequence number held by each slot
+        self.slot_skipped = [0] * slots       # Producer's skipped-frame count when each slot was published
+        self.pins = {}                        # seq -> number of readers holding it
+        self.latest_slot = None
+        self.latest_seq = -1
+        self.latest_timestamp = 0.0
+        self.last_read_seq = -1               # Newest sequence number a consumer has taken
+        self.next_seq = 0
+        self.write_slot = None                # Slot reserved by begin_write
+        self.condition = threading.Condition()
+
+    def begin_write(self, shape, dtype=np.uint8):
+        """
+        Reserve a free slot and return a writable view of it, e.g. to pass to
+        cv2.VideoCapture.read(image=...) or cv2.resize(dst=...).
+        Finish with commit_write(), or abort_write() if nothing was written.
+        The latest frame's slot is never reserved: a consumer may still take
+        it. Returns None (the frame is dropped) if every other slot is pinned.
+        """
+        with self.condition:
+            if self.frames is None or self.frames.shape[1:] != tuple(shape) or self.frames.dtype != dtype:
+                # (Re)allocate; readers still holding old views keep the old storage alive
+                self.frames = np.empty((self.slots,) + tuple(shape), dtype=dtype)
+                self.slot_seq = [WRITING] * self.slots
+                self.slot_skipped = [0] * self.slots
+                self.latest_slot = None
+
+            start = 0 if self.latest_slot is None else self.latest_slot + 1
+            for offset in range(self.slots):
+                slot = (start + offset) % self.slots
+                if slot != self.latest_slot and self.slot_seq[slot] not in self.pins:
+                    self.slot_seq[slot] = WRITING
+                    self.write_slot = slot
+                    return self.frames[slot]
+            return None
+
+    def commit_write(self, skipped=0):
+        """
+        Publish the slot reserved by begin_write. 'skipped' is the number of
+        frames the producer grabbed without publishing them so far.
+        Returns its sequence number.
+        """
+        with self.condition:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.slot_seq[self.write_slot] = seq
+            self.slot_skipped[self.write_slot] = skipped
+            self.latest_slot = self.write_slot
+            self.latest_seq = seq
+            self.latest_timestamp = time.time()
+            self.write_slot = None
+            self.condition.notify_all()
+            return seq
+
+    def abort_write(self):
+        """Give back the slot reserved by begin_write without publishing it."""
+        with self.condition:
+            self.write_slot = None
+
+    def write(self, frame, skipped=0):
+        """Copy a frame into the ring. Returns its sequence number, or None if dropped."""
+        slot = self.begin_write(frame.shape, frame.dtype)
+        if slot is None:
+            return None
+        slot[...] = frame
+        return self.commit_write(skipped)
+
+    def get_latest(self, after_seq=-1, timeout=None):
+        """
+        Return (seq, view) of the newest frame newer than 'after_seq', waiting
+        up to 'timeout' seconds for one (None waits forever, 0 does not wait).
+        The slot stays pinned until release(seq). Returns (None, None) on timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.has_new(after_seq), timeout):
+                return None, None
+            seq = self.latest_seq
+            self.pins[seq] = self.pins.get(seq, 0) + 1
+            self.last_read_seq = max(self.last_read_seq, seq)
+            return seq, self.frames[self.latest_slot]
+
+    def release(self, seq):
+        """Let the producer reuse the slot of frame 'seq'."""
+        with self.condition:
+            count = self.pins.get(seq, 0) - 1
+            if count > 0:
+                self.pins[seq] = count
+            else:
+                self.pins.pop(seq, None)
+
+    def skipped_count(self, seq):
+        """
+        The producer's skipped-frame count when frame 'seq' was published
+        (call while holding it). The difference between two frames' counts
+        is the number of frames grabbed but never published between them.
+        Returns None if the frame is no longer in the ring.
+        """
+        with self.condition:
+            for slot, slot_seq in enumerate(self.slot_seq):
+                if slot_seq == seq:
+                    return self.slot_skipped[slot]
+            return None
+
+    def has_new(self, after_seq):
+        """True if a frame newer than 'after_seq' is available."""
+        return self.latest_slot is not None and self.latest_seq > after_seq
+
+    def wants_frame(self):
+        """
+        True if the producer should publish a new frame: nothing is buffered,
+        or a consumer has already taken the latest one. Lets a capture loop
+        skip decoding frames nobody would read.
+        """
+        return self.latest_slot is None or self.latest_seq <= self.last_read_seq
+
+    def clear(self):
+        """Forget all frames and free the storage."""
+        with self.condition:
+            self.frames = None
+            self.slot_seq = [WRITING] * self.slots
+            self.slot_skipped = [0] * self.slots
+            self.latest_slot = None
+
+
+def attach_untracked(name):
+    """
+    Attach to an existing shared_memory block without registering it with
+    this process's resource tracker, which would otherwise unlink it (and
+    warn about a leak) when a reader exits; only the creator owns the block.
+    Before Python 3.13 the registration is suppressed rather than undone:
+    spawned readers share the creator's tracker, so unregistering there
+    would also drop the creator's own registration.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+
+    def register_unless_shared_memory(resource, rtype):
+        if rtype != "shared_memory":
+            register(resource, rtype)
+
+    resource_tracker.register = register_unless_shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedFrameRing:
+    """
+    Fixed-slot ring of frames in a multiprocessing.shared_memory block.
+
+    The block starts with one int64 sequence number per slot followed by the
+    frame slots themselves. A single producer writes frame 'seq' into slot
+    'seq % slots'; any process that attached to the block by name can read
+    it back as a NumPy view without the frame ever being pickled. Readers
+    check the slot's sequence number before and after using a frame, so a
+    frame overwritten in the meantime is detected instead of silently used.
+    """
+    def __init__(self, shape, slots=4, dtype=np.uint8, name=None, create=True):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header_bytes = slots * np.dtype(np.int64).itemsize
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+        else:
+            self.shm = attach_untracked(name)
+
+        self.name = self.shm.name
+        self.owner = create
+        self.sequence = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype,
+                                 buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self.sequence[:] = WRITING
+        self.next_seq = 0
+
+    @classmethod
+    def attach(cls, name, shape, slots, dtype=np.uint8):
+        """Attach to a ring created by another process."""
+        return cls(shape, slots, dtype, name=name, create=False)
+
+    def write(self, frame):
+        """Copy a frame into the next slot. Returns its sequence number."""
+        seq = self.next_seq
+        slot = seq % self.slots
+        self.sequence[slot] = WRITING
+        self.frames[slot][...] = frame
+        self.sequence[slot] = seq
+        self.next_seq += 1
+        return seq
+
+    def read(self, seq):
+        """
+        Return a view of frame 'seq', or None if it has been overwritten.
+        Call is_valid(seq) after using the view to make sure it was not
+        overwritten while it was being read.
+        """
+        slot = seq % self.slots
+        if self.sequence[slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def is_valid(self, seq):
+        return self.sequence[seq % self.slots] == seq
+
+    def close(self):
+        """Detach from the block, and free it if this process created it."""
+        self.sequence = None
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A view of a frame is still alive somewhere; the mapping goes with the process
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
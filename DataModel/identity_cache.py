@@ -0,0 +1,125 @@
+import time
+import numpy as np
+
+
+class CachedIdentity:
+    """Last recognition result of one person track."""
+    def __init__(self, name, distance, feature_vector, timestamp):
+        self.name = name
+        self.distance = distance              # Recognition distance, lower is better
+        self.feature_vector = feature_vector  # Re-ID embedding when the identity was verified
+        self.timestamp = timestamp
+        self.last_reid_request = timestamp
+
+
+def cosine_distance(a, b):
+    a = np.ravel(a)
+    b = np.ravel(b)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    if norm == 0:
+        return 1.0
+    return 1.0 - float(np.dot(a, b)) / norm
+
+
+class IdentityCache:
+    """
+    Identities of person tracks, keyed by (camera_name, track_id).
+
+    Once a track has been recognized its identity is reused frame after
+    frame, so face detection and recognition only run on new tracks and on
+    tracks due for re-verification. An identity is re-verified when:
+      - it is older than 'ttl' seconds,
+      - its confidence has decayed: the margin between the recognition
+        distance and 'distance_threshold' halves every 'half_life' seconds
+        and the identity expires once it drops below 'min_margin',
+      - the track's Re-ID embedding has drifted more than 'max_drift'
+        (cosine distance) from the one it had when it was recognized,
+        e.g. after an ID switch in the tracker.
+    "Unknown" results are cached for 'unknown_ttl' seconds only, so
+    unrecognized tracks are retried regularly but not on every frame.
+    """
+    def __init__(self, distance_threshold=0.68, ttl=30.0, half_life=10.0, min_margin=0.1,
+                 max_drift=0.3, unknown_ttl=1.0, reid_interval=2.0):
+        self.distance_threshold = distance_threshold
+        self.ttl = ttl
+        self.half_life = half_life
+        self.min_margin = min_margin
+        self.max_drift = max_drift
+        self.unknown_ttl = unknown_ttl
+        self.reid_interval = reid_interval  # Seconds between Re-ID refreshes of a cached track
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, track_key, name, distance, feature_vector=None):
+        """
+        Record a recognition result for a track. Every face of a track is
+        recognized separately, so a result only replaces a still valid one
+        if it is better: a known name beats "Unknown", then the lower
+        distance wins.
+        """
+        now = time.time()
+        entry = self.entries.get(track_key)
+        if entry is not None and self.is_valid(entry, None, now):
+            known, entry_known = name != "Unknown", entry.name != "Unknown"
+            if entry_known > known or (entry_known == known and entry.distance <= distance):
+                return
+        self.entries[track_key] = CachedIdentity(name, distance, feature_vector, now)
+
+    def margin(self, entry, now):
+        """Decayed confidence of an identity, 1.0 for a perfect fresh match, 0.0 at the threshold."""
+        margin = max(0.0, (self.distance_threshold - entry.distance) / self.distance_threshold)
+        return margin * 0.5 ** ((now - entry.timestamp) / self.half_life)
+
+    def is_valid(self, entry, feature_vector, now):
+        age = now - entry.timestamp
+        if entry.name == "Unknown":
+            return age < self.unknown_ttl
+        if age >= self.ttl or self.margin(entry, now) < self.min_margin:
+            return False
+
+        if feature_vector is not None:
+            if entry.feature_vector is None:
+                # Recognized before the track's first Re-ID pass finished
+                entry.feature_vector = feature_vector
+            elif cosine_distance(entry.feature_vector, feature_vector) > self.max_drift:
+                return False
+        return True
+
+    def lookup(self, track_key, feature_vector=None):
+        """
+        Return the cached identity of a track, or None if the track has to
+        be (re-)recognized. Expired identities are dropped.
+        """
+        entry = self.entries.get(track_key)
+        if entry is not None and not self.is_valid(entry, feature_vector, time.time()):
+            del self.entries[track_key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def reid_due(self, track_key):
+        """True if a cached track's Re-ID embedding should be refreshed to check for drift."""
+        entry = self.entries.get(track_key)
+        if entry is None:
+            return False
+        now = time.time()
+        if now - entry.last_reid_request < self.reid_interval:
+            return False
+        entry.last_reid_request = now
+        return True
+
+    def hit_ratio(self):
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def forget(self, track_key):
+        self.entries.pop(track_key, None)
+
+    def __len__(self):
+        return len(self.entries)
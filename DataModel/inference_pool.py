@@ -0,0 +1,247 @@
+import os
+import time
+import queue
+import multiprocessing as mp
+from frame_ring import SharedFrameRing
+
+
+def yolo_boxes_to_detections(boxes):
+    """Convert YOLO person boxes to DeepSort detections ([x, y, w, h], confidence, class)."""
+    xyxy = boxes.xyxy.cpu().numpy()
+    confidences = boxes.conf.cpu().numpy()
+    return [([float(x1), float(y1), float(x2 - x1), float(y2 - y1)], float(conf), "person")
+            for (x1, y1, x2, y2), conf in zip(xyxy, confidences)]
+
+
+def worker_main(task_queue, result_queue, config):
+    """
+    Entry point of an inference worker process.
+    Frames to detect on are read from the coordinator's shared memory
+    rings; face crops to recognize arrive with their task. Only the small
+    detection and recognition results are sent back.
+    """
+    # Imported here so each worker loads its own copy of the models
+    from ultralytics import YOLO
+    from face_detection import recognize_face, get_face_gallery
+
+    person_model = YOLO(config["person_model"])
+    rings = {}  # camera name -> SharedFrameRing attached by this worker
+    gallery_mtime = None
+    last_gallery_check = 0.0
+
+    print(f"[WORKER {os.getpid()}] Inference worker started")
+
+    while True:
+        task = task_queue.get()
+        kind = task[0]
+        if kind == "stop":
+            break
+
+        task_id = task[1]
+        try:
+            if kind == "detect":
+                camera_name, ring_name, shape, slots, seq = task[2:7]
+                ring = rings.get(camera_name)
+                if ring is None or ring.name != ring_name:
+                    # The camera's ring was (re)created, e.g. after a resolution change
+                    if ring is not None:
+                        ring.close()
+                    ring = SharedFrameRing.attach(ring_name, shape, slots)
+                    rings[camera_name] = ring
+
+                detections = None
+                frame = ring.read(seq)
+                if frame is not None:
+                    results = person_model(frame, classes=[0], conf=config["person_confidence"], verbose=False)
+                    detections = yolo_boxes_to_detections(results[0].boxes)
+                    if not ring.is_valid(seq):
+                        detections = None  # The frame changed under us
+                result_queue.put(("detect", task_id, detections))
+
+            elif kind == "recognize":
+                face_id, face_crop = task[2], task[3]
+
+                # Pick up faces the coordinator added to the database
+                if time.time() - last_gallery_check > config["gallery_refresh_interval"]:
+                    last_gallery_check = time.time()
+                    gallery = get_face_gallery()
+                    try:
+                        mtime = os.path.getmtime(gallery.cache_file)
+                    except OSError:
+                        mtime = None
+                    if gallery_mtime is not None and mtime != gallery_mtime:
+                        # Read-only: only the coordinator writes the cache
+                        gallery.load(save=False)
+                    gallery_mtime = mtime
+
+                name, confidence = recognize_face(face_crop)
+                result_queue.put(("recognize", task_id, face_id, name, confidence))
+
+        except Exception as e:
+            print(f"[WORKER {os.getpid()}] Error processing {kind} task: {e}")
+            if kind == "detect":
+                result_queue.put(("detect", task_id, None))
+            else:
+                result_queue.put(("recognize", task_id, task[2], None, None))
+
+    for ring in rings.values():
+        ring.close()
+    print(f"[WORKER {os.getpid()}] Inference worker stopped")
+
+
+class InferencePool:
+    """
+    Pool of worker processes running person detection and face recognition.
+
+    The coordinator copies each frame once into a per-camera shared memory
+    ring and only sends (ring name, sequence number) to the workers, so
+    frames are never pickled. Face crops to recognize are small and may
+    come from frames the ring has already recycled (best shots), so they
+    travel with their task. Workers return detection lists and
+    (name, distance) pairs.
+
+    Detection can be split into submit_detections and collect_detections
+    so the coordinator can queue the next tick's frames before it collects
+    (and tracks) the current one. Workers open the face gallery read-only.
+    """
+    def __init__(self, num_workers, person_model="yolov8n.pt", person_confidence=0.5,
+                 ring_slots=4, gallery_refresh_interval=5.0):
+        # Spawn rather than fork: torch and CUDA state are not fork-safe
+        self.context = mp.get_context("spawn")
+        self.num_workers = num_workers
+        self.ring_slots = ring_slots
+        self.config = {
+            "person_model": person_model,
+            "person_confidence": person_confidence,
+            "gallery_refresh_interval": gallery_refresh_interval,
+        }
+
+        self.task_queue = None
+        self.result_queue = None
+        self.workers = []
+        self.rings = {}  # camera name -> SharedFrameRing
+        self.next_task_id = 0
+        self.recognition_results = []  # (face_id, name, confidence) not yet polled
+        self.pending_detections = set()  # Detection task ids not yet collected
+        self.detection_results = {}      # task id -> detections, for tasks not yet collected
+
+    def start(self):
+        """Spawn the worker processes."""
+        self.task_queue = self.context.Queue()
+        self.result_queue = self.context.Queue()
+        for _ in range(self.num_workers):
+            worker = self.context.Process(target=worker_main,
+                                          args=(self.task_queue, self.result_queue, self.config),
+                                          daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        print(f"[INFO] Started {self.num_workers} inference workers.")
+
+    def close(self):
+        """Stop the workers and free the shared memory rings."""
+        for _ in self.workers:
+            self.task_queue.put(("stop",))
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
+
+    def publish_frame(self, camera_name, frame):
+        """Copy a frame into the camera's shared ring. Returns its sequence number."""
+        ring = self.rings.get(camera_name)
+        if ring is None or ring.shape != frame.shape:
+            if ring is not None:
+                ring.close()
+            ring = SharedFrameRing(frame.shape, self.ring_slots)
+            self.rings[camera_name] = ring
+        return ring.write(frame)
+
+    def submit(self, kind, camera_name, seq, *payload):
+        ring = self.rings[camera_name]
+        task_id = self.next_task_id
+        self.next_task_id += 1
+        self.task_queue.put((kind, task_id, camera_name, ring.name, ring.shape, ring.slots, seq) + payload)
+        return task_id
+
+    def submit_detections(self, camera_frames):
+        """
+        Queue person detection on one frame per camera, spread over the
+        workers, without waiting for the results.
+        'camera_frames' is a list of (camera_name, frame).
+        Returns: (task id per frame, ring sequence number per frame)
+        """
+        task_ids, seqs = [], []
+        for camera_name, frame in camera_frames:
+            seq = self.publish_frame(camera_name, frame)
+            task_id = self.submit("detect", camera_name, seq)
+            self.pending_detections.add(task_id)
+            task_ids.append(task_id)
+            seqs.append(seq)
+        return task_ids, seqs
+
+    def collect_detections(self, task_ids, timeout=5.0):
+        """
+        Wait for the detections of tasks queued by submit_detections.
+        Returns: detections per task, [] for tasks that failed or timed out
+        """
+        deadline = time.time() + timeout
+        while any(task_id not in self.detection_results for task_id in task_ids):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                missing = sum(task_id not in self.detection_results for task_id in task_ids)
+                print(f"[WARNING] {missing} detection tasks timed out.")
+                break
+            try:
+                result = self.result_queue.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            self.handle_result(result)
+
+        detections = []
+        for task_id in task_ids:
+            self.pending_detections.discard(task_id)
+            detections.append(self.detection_results.pop(task_id, None) or [])
+        return detections
+
+    def detect_persons(self, camera_frames, timeout=5.0):
+        """
+        Detect persons in one frame per camera and wait for the results.
+        'camera_frames' is a list of (camera_name, frame).
+        Returns: (detections per frame, ring sequence number per frame)
+        """
+        task_ids, seqs = self.submit_detections(camera_frames)
+        return self.collect_detections(task_ids, timeout), seqs
+
+    def submit_recognition(self, face_id, face_crop):
+        """Queue recognition of a face crop. Returns the task id."""
+        task_id = self.next_task_id
+        self.next_task_id += 1
+        self.task_queue.put(("recognize", task_id, face_id, face_crop))
+        return task_id
+
+    def poll_recognitions(self):
+        """
+        Return finished recognitions as (face_id, name, confidence) without
+        blocking. 'name' is None if recognition failed.
+        """
+        while True:
+            try:
+                result = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_result(result)
+
+        results, self.recognition_results = self.recognition_results, []
+        return results
+
+    def handle_result(self, result):
+        if result[0] == "recognize":
+            self.recognition_results.append(result[2:])
+        elif result[1] in self.pending_detections:
+            # Detection results that arrive after their timeout are dropped
+            self.detection_results[result[1]] = result[2]
@@ -0,0 +1,125 @@
+import cv2
+import numpy as np
+
+
+class CameraMotionState:
+    """Background model and statistics of one camera."""
+    def __init__(self):
+        self.background = None     # float32 running average of the downscaled gray frame
+        self.score_mean = 0.0      # Running mean of the changed-pixel fraction
+        self.score_var = 0.0       # Running variance of the changed-pixel fraction
+        self.last_score = 0.0
+        self.last_threshold = 0.0  # Adaptive threshold the last score was compared against
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.consecutive_skips = 0
+
+
+class MotionGate:
+    """
+    Cheap motion pre-filter that decides whether a frame is worth running
+    person detection on.
+
+    Each frame is shrunk to a small gray image and compared against a running
+    average background. The fraction of pixels that changed is compared
+    against a per-camera adaptive threshold (running mean plus 'sensitivity'
+    standard deviations of that camera's own scores), so sensor noise,
+    flicker and compression artefacts of a given camera do not count as motion.
+    A detection is still forced every 'max_skip' frames so a static scene is
+    periodically re-checked. The same score, relative to the threshold,
+    weighs cameras in motion-based scheduling (see activity).
+    """
+    def __init__(self, sample_width=160, pixel_threshold=15, sensitivity=3.0,
+                 min_changed=0.002, learning_rate=0.05, stats_rate=0.02, max_skip=50):
+        self.sample_width = sample_width
+        self.pixel_threshold = pixel_threshold   # Gray level change that counts a pixel as changed
+        self.sensitivity = sensitivity
+        self.min_changed = min_changed           # Floor of the adaptive threshold: smaller changes are never motion
+        self.learning_rate = learning_rate       # Background adaptation speed
+        self.stats_rate = stats_rate             # Noise statistics adaptation speed
+        self.max_skip = max_skip
+        self.cameras = {}
+
+    def downscale(self, frame):
+        height, width = frame.shape[:2]
+        sample_height = max(1, int(height * self.sample_width / width))
+        small = cv2.resize(frame, (self.sample_width, sample_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def state_for(self, camera_name):
+        state = self.cameras.get(camera_name)
+        if state is None:
+            state = self.cameras[camera_name] = CameraMotionState()
+        return state
+
+    def update(self, camera_name, frame):
+        """
+        Compare 'frame' with the camera's background and learn from it.
+        Returns True if the scene changed (always for a camera's first frame).
+        """
+        state = self.state_for(camera_name)
+        small = self.downscale(frame)
+
+        if state.background is None or state.background.shape != small.shape:
+            state.background = small.astype(np.float32)
+            state.last_score = state.last_threshold = 0.0
+            return True
+
+        diff = cv2.absdiff(small, cv2.convertScaleAbs(state.background))
+        score = float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+        cv2.accumulateWeighted(small, state.background, self.learning_rate)
+
+        threshold = max(self.min_changed, state.score_mean + self.sensitivity * np.sqrt(state.score_var))
+        state.last_score, state.last_threshold = score, threshold
+        motion = score > threshold
+
+        if not motion:
+            # Learn this camera's noise floor from frames judged static
+            delta = score - state.score_mean
+            state.score_mean += self.stats_rate * delta
+            state.score_var = (1 - self.stats_rate) * (state.score_var + self.stats_rate * delta * delta)
+        return motion
+
+    def check(self, camera_name, frame):
+        """
+        Return True if 'frame' should go through detection, False if the
+        scene is unchanged and detection can be skipped.
+        """
+        motion = self.update(camera_name, frame)
+        state = self.cameras[camera_name]
+        state.frames_seen += 1
+
+        if motion or state.consecutive_skips >= self.max_skip:
+            state.consecutive_skips = 0
+            return True
+
+        state.consecutive_skips += 1
+        state.frames_skipped += 1
+        return False
+
+    def activity(self, camera_name, min_weight=0.0):
+        """
+        Scheduling weight of a camera from its last update: 1.0 once the
+        change reaches the motion threshold (or for a camera not seen yet),
+        proportionally less below it, but at least 'min_weight'.
+        """
+        state = self.cameras.get(camera_name)
+        if state is None or state.last_threshold <= 0:
+            return 1.0
+        return min(1.0, max(min_weight, state.last_score / state.last_threshold))
+
+    def skip_ratio(self, camera_name):
+        """Fraction of a camera's frames for which detection was skipped."""
+        state = self.cameras.get(camera_name)
+        if state is None or state.frames_seen == 0:
+            return 0.0
+        return state.frames_skipped / state.frames_seen
+
+    def stats(self):
+        """Return {camera_name: skip_ratio} for every camera seen so far."""
+        return {name: self.skip_ratio(name) for name in self.cameras}
+
+    def forget(self, camera_name):
+        self.cameras.pop(camera_name, None)
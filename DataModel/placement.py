@@ -0,0 +1,261 @@
+import argparse
+import json
+import multiprocessing as mp
+import numpy as np
+
+from coverage import CoverageMap, layout_grid, visible_cells
+from descriptor_index import POPCOUNT_TABLE
+from fov_geometry import (DEFAULT_VIEW_ANGLE, DEFAULT_VIEW_RANGE, DEFAULT_VIEW_RAYS,
+                          fov_polygon, layout_segments, range_rect)
+
+PLACEMENT_CELL_SIZE = 16.0   # Coarser than the editor's heatmap; candidates are many
+DEFAULT_SPACING = 40.0       # Distance between candidate positions in scene pixels
+DEFAULT_ROTATION_STEP = 15.0 # Degrees between candidate rotations
+MAX_REFINE_ROUNDS = 10
+
+# Set in every worker process by init_worker
+worker_state = {}
+
+
+def count_bits(packed):
+    """Set bits per row of a packed uint8 matrix."""
+    if hasattr(np, "bitwise_count"):
+        if packed.shape[-1] % 8 == 0 and packed.flags.c_contiguous:
+            packed = packed.view(np.uint64)  # Eight bytes per popcount
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    return POPCOUNT_TABLE[packed].sum(axis=-1, dtype=np.int64)
+
+
+def nearby_segments(segments, origin, view_range):
+    """Segments whose bounding box overlaps the camera's view range."""
+    x1, y1, x2, y2 = range_rect(origin, view_range)
+    keep = ((np.minimum(segments[:, 0], segments[:, 2]) <= x2) & (np.maximum(segments[:, 0], segments[:, 2]) >= x1) &
+            (np.minimum(segments[:, 1], segments[:, 3]) <= y2) & (np.maximum(segments[:, 1], segments[:, 3]) >= y1))
+    return segments[keep]
+
+
+def candidate_positions(coverage, spacing=DEFAULT_SPACING):
+    """Lattice points 'spacing' apart on the floor, outside walls. Returns: (P, 2) array"""
+    grid = coverage.grid
+    area = coverage.area_mask()
+    rows, cols = np.nonzero(area)
+    if len(rows) == 0:
+        return np.empty((0, 2))
+    x1, x2 = grid.xs[cols].min(), grid.xs[cols].max()
+    y1, y2 = grid.ys[rows].min(), grid.ys[rows].max()
+    xs, ys = np.meshgrid(np.arange(x1, x2 + 1e-9, spacing), np.arange(y1, y2 + 1e-9, spacing))
+    positions = np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+    # Keep the points whose cell is floor
+    cell_cols = np.clip(((positions[:, 0] - grid.x1) / grid.cell_size).astype(np.intp), 0, grid.cols - 1)
+    cell_rows = np.clip(((positions[:, 1] - grid.y1) / grid.cell_size).astype(np.intp), 0, grid.rows - 1)
+    return positions[area[cell_rows, cell_cols]]
+
+
+def position_coverage(origin, segments, grid, floor_index, floor_count, rotations,
+                      view_angle=DEFAULT_VIEW_ANGLE, view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS):
+    """
+    Floor cells a camera at 'origin' sees for every rotation in 'rotations'.
+    One all-round ray cast, at the camera's angular resolution, serves all
+    rotations; each rotation then keeps the visible cells within its view
+    angle. 'floor_index' maps grid cells to floor cell numbers (-1 off the
+    floor).
+    Returns: (len(rotations), ceil(floor_count / 64) * 8) packed bits
+    """
+    rays = max(view_rays, int(round(view_rays * 360.0 / view_angle)))
+    polygon = fov_polygon(origin, 0.0, nearby_segments(segments, origin, view_range), 360.0, view_range, rays)
+    rows, cols, seen = visible_cells(grid, polygon, 0.0, 360.0, view_range)
+
+    cells = floor_index[rows, cols]
+    seen &= cells >= 0
+    dx = grid.xs[cols][None, :] - origin[0]
+    dy = grid.ys[rows][:, None] - origin[1]
+    angles = np.degrees(np.arctan2(-dy, dx))[seen]
+    cells = cells[seen]
+
+    # A camera rotated by r looks at angle -r (the rays' y up convention)
+    in_view = np.mod(angles[None, :] + rotations[:, None] + view_angle / 2, 360.0) <= view_angle
+    # Padded to whole 64-bit words for count_bits
+    visible = np.zeros((len(rotations), -(-floor_count // 64) * 64), dtype=bool)
+    rotation_rows, cell_columns = np.nonzero(in_view)
+    visible[rotation_rows, cells[cell_columns]] = True
+    return np.packbits(visible, axis=1)
+
+
+def init_worker(state):
+    worker_state.update(state)
+
+
+def worker_position_coverage(origin):
+    state = worker_state
+    return position_coverage(origin, state["segments"], state["grid"], state["floor_index"], state["floor_count"],
+                             state["rotations"], state["view_angle"], state["view_range"], state["view_rays"])
+
+
+def candidate_coverage(positions, segments, coverage, rotations, view_angle=DEFAULT_VIEW_ANGLE,
+                       view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS, workers=None):
+    """
+    Packed floor cells seen by every candidate placement, positions spread
+    over 'workers' processes (all CPUs by default, 1 runs in this process).
+    Returns: (len(positions) * len(rotations), packed width) uint8; row p * len(rotations) + r
+             is position p with rotation r
+    """
+    area = coverage.area_mask()
+    floor_index = np.full(area.shape, -1, dtype=np.intp)
+    floor_index[area] = np.arange(int(area.sum()))
+    state = {
+        "segments": np.asarray(segments, dtype=np.float64).reshape(-1, 4),
+        "grid": coverage.grid,
+        "floor_index": floor_index,
+        "floor_count": int(area.sum()),
+        "rotations": np.asarray(rotations, dtype=np.float64),
+        "view_angle": view_angle,
+        "view_range": view_range,
+        "view_rays": view_rays,
+    }
+
+    workers = mp.cpu_count() if workers is None else workers
+    if workers <= 1:
+        init_worker(state)
+        results = [worker_position_coverage(origin) for origin in positions]
+    else:
+        context = mp.get_context("spawn")
+        with context.Pool(workers, initializer=init_worker, initargs=(state,)) as pool:
+            chunk_size = max(1, len(positions) // (workers * 8))
+            results = pool.map(worker_position_coverage, list(positions), chunksize=chunk_size)
+    return np.concatenate(results, axis=0)
+
+
+def greedy_placement(candidates, count):
+    """
+    Pick 'count' candidate rows, each adding the most cells not yet covered.
+    Returns: list of row indexes
+    """
+    covered = np.zeros(candidates.shape[1], dtype=np.uint8)
+    chosen = []
+    for _ in range(count):
+        gains = count_bits(candidates & ~covered)
+        gains[chosen] = -1
+        best = int(np.argmax(gains))
+        chosen.append(best)
+        covered |= candidates[best]
+    return chosen
+
+
+def refine_placement(candidates, chosen, max_rounds=MAX_REFINE_ROUNDS):
+    """
+    Swap single cameras for the candidate that adds most to the others,
+    until no swap improves coverage.
+    Returns: the improved list of row indexes
+    """
+    chosen = list(chosen)
+    for _ in range(max_rounds):
+        improved = False
+        for slot in range(len(chosen)):
+            others = np.zeros(candidates.shape[1], dtype=np.uint8)
+            for other_slot, row in enumerate(chosen):
+                if other_slot != slot:
+                    others |= candidates[row]
+            gains = count_bits(candidates & ~others)
+            best = int(np.argmax(gains))
+            if gains[best] > gains[chosen[slot]]:
+                chosen[slot] = best
+                improved = True
+        if not improved:
+            break
+    return chosen
+
+
+def layout_report(coverage, segments, cameras, view_angle=DEFAULT_VIEW_ANGLE,
+                  view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS):
+    """CoverageMap.report() of 'cameras' with their exact FOV polygons."""
+    coverage.clear()
+    for camera in cameras:
+        polygon = fov_polygon(camera["pos"], camera["rot"], segments, view_angle, view_range, view_rays)
+        coverage.set_camera(camera["name"], polygon, camera["rot"], view_angle, view_range)
+    return coverage.report()
+
+
+def optimize_placement(layout, count, cell_size=PLACEMENT_CELL_SIZE, spacing=DEFAULT_SPACING,
+                       rotation_step=DEFAULT_ROTATION_STEP, view_angle=DEFAULT_VIEW_ANGLE,
+                       view_range=DEFAULT_VIEW_RANGE, view_rays=DEFAULT_VIEW_RAYS, workers=None):
+    """
+    Propose positions and rotations for 'count' cameras in a map.json layout
+    (as loaded with json). Every candidate placement, a position on a
+    lattice over the floor times a rotation, is turned into the floor cells
+    it sees; 'count' of them are picked greedily by the cells they add and
+    then improved by swapping one camera at a time. The layout's cameras
+    keep their names and urls, in order; extra ones are named 'Camera <n>'.
+    Returns: (proposed layout dict, CoverageMap.report() of the proposal)
+    """
+    segments = layout_segments(layout)
+    cameras = layout.get("cameras", [])
+    coverage = CoverageMap(layout_grid(segments, cameras, cell_size, view_range))
+    coverage.set_walls(segments)
+
+    positions = candidate_positions(coverage, spacing)
+    if len(positions) == 0:
+        raise ValueError("The layout has no floor to place cameras on")
+    rotations = np.arange(0.0, 360.0, rotation_step)
+    candidates = candidate_coverage(positions, segments, coverage, rotations,
+                                    view_angle, view_range, view_rays, workers)
+    chosen = refine_placement(candidates, greedy_placement(candidates, count))
+
+    proposed = []
+    for number, row in enumerate(chosen):
+        position = positions[row // len(rotations)]
+        rotation = float(rotations[row % len(rotations)])
+        camera = dict(cameras[number]) if number < len(cameras) else {"name": f"Camera {number + 1}", "url": ""}
+        camera["pos"] = [float(position[0]), float(position[1])]
+        camera["rot"] = rotation - 360.0 if rotation > 180.0 else rotation
+        proposed.append(camera)
+
+    report = layout_report(coverage, segments, proposed, view_angle, view_range, view_rays)
+    return dict(layout, cameras=proposed), report
+
+
+def print_report(title, report):
+    print(f"[INFO] {title}: {report['coverage']:.1%} of {report['floor_area']:.0f} px² covered, "
+          f"blind spots {report['blind_spot_area']:.0f} px²")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose camera positions and rotations for a map.json floor plan.")
+    parser.add_argument("layout", help="map.json saved by the floor plan editor")
+    parser.add_argument("--cameras", "-k", type=int, default=None,
+                        help="number of cameras to place (default: as many as the layout has)")
+    parser.add_argument("--output", "-o", help="write the proposed layout here instead of printing it")
+    parser.add_argument("--cell-size", type=float, default=PLACEMENT_CELL_SIZE)
+    parser.add_argument("--spacing", type=float, default=DEFAULT_SPACING)
+    parser.add_argument("--rotation-step", type=float, default=DEFAULT_ROTATION_STEP)
+    parser.add_argument("--view-angle", type=float, default=DEFAULT_VIEW_ANGLE)
+    parser.add_argument("--view-range", type=float, default=DEFAULT_VIEW_RANGE)
+    parser.add_argument("--view-rays", type=int, default=DEFAULT_VIEW_RAYS)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    with open(args.layout, 'r') as f:
+        layout = json.load(f)
+    count = args.cameras if args.cameras is not None else max(1, len(layout.get("cameras", [])))
+
+    segments = layout_segments(layout)
+    if layout.get("cameras"):
+        current = CoverageMap(layout_grid(segments, layout["cameras"], args.cell_size, args.view_range))
+        current.set_walls(segments)
+        print_report("Current layout", layout_report(current, segments, layout["cameras"], args.view_angle,
+                                                     args.view_range, args.view_rays))
+
+    proposed, report = optimize_placement(layout, count, args.cell_size, args.spacing, args.rotation_step,
+                                          args.view_angle, args.view_range, args.view_rays, args.workers)
+    print_report(f"Proposed layout ({count} cameras)", report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(proposed, f, indent=4)
+        print(f"[INFO] Layout saved to {args.output}")
+    else:
+        print(json.dumps(proposed, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import math
+
+
+class SegmentGrid:
+    """
+    Uniform grid spatial index of line segments grouped by owner (e.g. the
+    four edges of a wall).
+
+    Every owner is registered in the cells its segments' bounding boxes
+    cover, so the segments near a point (e.g. within a camera's view
+    range) are found without looking at the others.
+    """
+    def __init__(self, cell_size=64.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}           # (cx, cy) -> set of owners
+        self.owner_segments = {}  # owner -> list of (x1, y1, x2, y2)
+        self.owner_cells = {}     # owner -> list of (cx, cy)
+
+    def cell_of(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def update(self, owner, segments):
+        """(Re)register an owner's segments, given as (x1, y1, x2, y2)."""
+        self.remove(owner)
+        segments = [tuple(float(v) for v in segment) for segment in segments]
+        covered = set()
+        for x1, y1, x2, y2 in segments:
+            cx1, cy1 = self.cell_of(min(x1, x2), min(y1, y2))
+            cx2, cy2 = self.cell_of(max(x1, x2), max(y1, y2))
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    covered.add((cx, cy))
+
+        for cell in covered:
+            self.cells.setdefault(cell, set()).add(owner)
+        self.owner_segments[owner] = segments
+        self.owner_cells[owner] = list(covered)
+
+    def remove(self, owner):
+        for cell in self.owner_cells.pop(owner, ()):
+            owners = self.cells.get(cell)
+            if owners is not None:
+                owners.discard(owner)
+                if not owners:
+                    del self.cells[cell]
+        self.owner_segments.pop(owner, None)
+
+    def clear(self):
+        self.cells.clear()
+        self.owner_segments.clear()
+        self.owner_cells.clear()
+
+    def query_rect(self, x1, y1, x2, y2):
+        """Return the owners registered in any cell overlapping the rectangle."""
+        cx1, cy1 = self.cell_of(min(x1, x2), min(y1, y2))
+        cx2, cy2 = self.cell_of(max(x1, x2), max(y1, y2))
+        found = set()
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self.cells):
+            # Large rectangle: cheaper to check the occupied cells
+            for (cx, cy), owners in self.cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    found |= owners
+            return found
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                owners = self.cells.get((cx, cy))
+                if owners:
+                    found |= owners
+        return found
+
+    def segments_in_rect(self, x1, y1, x2, y2):
+        """Return the segments of every owner overlapping the rectangle."""
+        return [segment for owner in self.query_rect(x1, y1, x2, y2)
+                for segment in self.owner_segments[owner]]
+
+    def __len__(self):
+        return len(self.owner_segments)
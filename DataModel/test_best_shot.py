@@ -0,0 +1,52 @@
+import numpy as np
+
+from best_shot import BestShotBuffer
+
+
+def crop(value):
+    return np.full((8, 8, 3), value, dtype=np.uint8)
+
+
+def offer_window(buffer, track_id, qualities):
+    """Offer one crop per quality; True once the window is complete."""
+    done = False
+    for quality in qualities:
+        done = buffer.add(track_id, crop(int(quality) % 256), quality)
+    return done
+
+
+def test_best_crop_of_a_window_is_recognized():
+    buffer = BestShotBuffer(top_k=2, window=60.0, max_frames=4, min_quality=100.0)
+    assert offer_window(buffer, 1, [150, 400, 50, 300])
+    best, quality = buffer.pop(1)
+    assert quality == 400 and (best == 400 % 256).all()
+    assert len(buffer) == 0
+
+
+def test_low_quality_track_falls_back_to_its_best_crop():
+    buffer = BestShotBuffer(window=60.0, max_frames=3, min_quality=300.0, fallback_windows=3)
+    for _ in range(2):
+        assert offer_window(buffer, 1, [120, 180, 90])
+        assert buffer.pop(1) == (None, None)
+
+    # Third window in a row without a good crop: its best one is used anyway
+    assert offer_window(buffer, 1, [100, 250, 200])
+    best, quality = buffer.pop(1)
+    assert quality == 250 and (best == 250).all()
+
+    # The count starts over
+    offer_window(buffer, 1, [100, 100, 100])
+    assert buffer.pop(1) == (None, None)
+
+
+def test_good_window_resets_the_fallback_count():
+    buffer = BestShotBuffer(window=60.0, max_frames=2, min_quality=300.0, fallback_windows=2)
+    offer_window(buffer, 1, [100, 100])
+    assert buffer.pop(1) == (None, None)
+    offer_window(buffer, 1, [100, 350])
+    assert buffer.pop(1)[1] == 350
+    offer_window(buffer, 1, [100, 100])
+    assert buffer.pop(1) == (None, None)
+
+    buffer.forget(1)
+    assert not buffer.failed_windows
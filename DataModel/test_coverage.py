@@ -0,0 +1,94 @@
+import os
+import cv2
+import numpy as np
+
+from coverage import CoverageGrid, CoverageMap, layout_coverage, visible_cells
+from fov_geometry import fov_polygon, wall_segments
+
+MAP_PATH = os.path.join(os.path.dirname(__file__), "..", "maps", "map.json")
+
+
+def point_polygon_cells(grid, polygon):
+    """
+    Cells whose centre cv2.pointPolygonTest puts inside or on the polygon,
+    and those within a hair of its outline, where either answer is fine.
+    """
+    contour = np.asarray(polygon, dtype=np.float32).reshape(-1, 1, 2)
+    inside = np.zeros(grid.shape, dtype=bool)
+    borderline = np.zeros(grid.shape, dtype=bool)
+    for row, y in enumerate(grid.ys):
+        for col, x in enumerate(grid.xs):
+            distance = cv2.pointPolygonTest(contour, (float(x), float(y)), True)
+            inside[row, col] = distance >= 0
+            borderline[row, col] = abs(distance) < 1e-3
+    return inside, borderline
+
+
+def test_visible_cells_match_point_polygon_test():
+    rng = np.random.default_rng(0)
+    grid = CoverageGrid(0, 0, 400, 400, cell_size=5)
+    segments = np.vstack([wall_segments(rng.uniform(20, 150), 8, rng.uniform(0, 400, 2), rng.uniform(0, 180))
+                          for _ in range(15)])
+    for _ in range(12):
+        origin = rng.uniform(50, 350, 2)
+        rotation, view_angle = rng.uniform(-180, 180), rng.uniform(30, 150)
+        polygon = fov_polygon(origin, rotation, segments, view_angle, 150.0, 60)
+
+        rows, cols, mask = visible_cells(grid, polygon, rotation, view_angle, 150.0)
+        seen = np.zeros(grid.shape, dtype=bool)
+        seen[rows, cols] = mask
+        expected, borderline = point_polygon_cells(grid, polygon)
+        assert not ((seen != expected) & ~borderline).any()
+        assert seen.any()
+
+
+def test_camera_moves_and_removals_keep_counts_exact():
+    grid = CoverageGrid(0, 0, 300, 300, cell_size=6)
+    coverage = CoverageMap(grid)
+    cameras = {"a": ((100, 100), 0.0), "b": ((120, 110), 45.0), "c": ((200, 200), 180.0)}
+
+    def recount():
+        counts = np.zeros(grid.shape, dtype=np.int32)
+        for origin, rotation in cameras.values():
+            rows, cols, mask = visible_cells(grid, fov_polygon(origin, rotation, []), rotation)
+            counts[rows, cols] += mask
+        return counts
+
+    for key, (origin, rotation) in cameras.items():
+        coverage.set_camera(key, fov_polygon(origin, rotation, []), rotation)
+    np.testing.assert_array_equal(coverage.counts, recount())
+
+    cameras["a"] = ((150, 60), 90.0)
+    coverage.set_camera("a", fov_polygon(*cameras["a"], []), cameras["a"][1])
+    del cameras["b"]
+    coverage.remove_camera("b")
+    np.testing.assert_array_equal(coverage.counts, recount())
+    assert coverage.counts.max() >= 1
+
+
+def test_report_of_a_walled_room():
+    # 200 x 200 room, one camera in a corner looking across it
+    grid = CoverageGrid(0, 0, 200, 200, cell_size=4)
+    coverage = CoverageMap(grid)
+    walls = np.vstack([wall_segments(200, 4, (100, 2), 0), wall_segments(200, 4, (100, 198), 0),
+                       wall_segments(4, 200, (2, 100), 0), wall_segments(4, 200, (198, 100), 0)])
+    coverage.set_walls(walls)
+    assert coverage.walls[0].all() and not coverage.walls[25, 25]
+
+    report = coverage.report()
+    assert report["covered_area"] == 0 and report["coverage"] == 0.0
+    assert report["blind_spot_area"] == report["floor_area"] == coverage.area_mask().sum() * grid.cell_area
+
+    polygon = fov_polygon((10, 10), 45.0, walls, 90.0, 400.0, 90)
+    coverage.set_camera("corner", polygon, 45.0, 90.0, 400.0)
+    report = coverage.report()
+    assert report["coverage"] > 0.95
+    assert report["covered_area"] + report["blind_spot_area"] == report["floor_area"]
+    assert report["overlap_area"] == 0
+
+
+def test_layout_coverage_of_map():
+    coverage = layout_coverage(MAP_PATH)
+    report = coverage.report()
+    assert 0.0 < report["coverage"] <= 1.0
+    assert len(coverage.views) == 2
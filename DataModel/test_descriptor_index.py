@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+from descriptor_index import DescriptorIndex, hamming_distances
+
+
+def bf_match(new_descriptor, stored_descriptors):
+    """The per-face BFMatcher loop DescriptorIndex.match replaces."""
+    best_match, best_score = None, 1.0
+    bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+    for face_id, descriptor in stored_descriptors.items():
+        matches = bf.match(new_descriptor, descriptor)
+        if len(matches) > 5:
+            avg_distance = sum(match.distance for match in matches) / len(matches)
+            normalized_score = min(1.0, avg_distance / 100.0)
+            if normalized_score < best_score:
+                best_score, best_match = normalized_score, face_id
+    return best_match, best_score
+
+
+def orb_like(rng, base, rows, flips):
+    """'rows' descriptors derived from 'base' with about 'flips' bits flipped each."""
+    descriptors = base[rng.integers(0, len(base), rows)].copy()
+    bits = np.unpackbits(descriptors, axis=1)
+    bits ^= (rng.random(bits.shape) < flips / bits.shape[1]).astype(np.uint8)
+    return np.packbits(bits, axis=1)
+
+
+def test_hamming_distances_match_bit_count():
+    rng = np.random.default_rng(0)
+    queries = rng.integers(0, 256, (7, 32), dtype=np.uint8)
+    descriptors = rng.integers(0, 256, (11, 32), dtype=np.uint8)
+    expected = np.unpackbits(queries[:, None, :] ^ descriptors[None, :, :], axis=2).sum(axis=2)
+    np.testing.assert_array_equal(hamming_distances(queries, descriptors), expected)
+    assert hamming_distances(queries[:0], descriptors).shape == (0, 11)
+
+
+def test_match_equals_bfmatcher_cross_check():
+    rng = np.random.default_rng(1)
+    for trial in range(20):
+        base = rng.integers(0, 256, (40, 32), dtype=np.uint8)
+        stored = {face_id: orb_like(rng, base, int(rng.integers(1, 60)), rng.uniform(5, 80))
+                  for face_id in range(int(rng.integers(1, 12)))}
+        query = orb_like(rng, base, int(rng.integers(1, 60)), 10)
+
+        index = DescriptorIndex.from_dict(stored)
+        face_id, score = index.match(query)
+        expected_id, expected_score = bf_match(query, stored)
+        assert face_id == expected_id, trial
+        assert abs(score - expected_score) < 1e-9, trial
+
+
+def test_match_after_replace_and_remove():
+    rng = np.random.default_rng(2)
+    base = rng.integers(0, 256, (40, 32), dtype=np.uint8)
+    stored = {face_id: orb_like(rng, base, 30, 40) for face_id in range(8)}
+    index = DescriptorIndex.from_dict(stored)
+
+    stored[3] = orb_like(rng, base, 50, 5)
+    index.add(3, stored[3])
+    for face_id in (0, 5):
+        del stored[face_id]
+        index.remove(face_id)
+
+    query = orb_like(rng, base, 40, 5)
+    assert len(index) == len(stored)
+    assert index.match(query) == bf_match(query, stored)
+
+
+def test_faces_without_descriptors_are_not_stored():
+    rng = np.random.default_rng(3)
+    base = rng.integers(0, 256, (40, 32), dtype=np.uint8)
+    index = DescriptorIndex()
+    index.add("a", orb_like(rng, base, 30, 5))
+    index.add("empty", np.empty((0, 32), dtype=np.uint8))
+    index.add("b", orb_like(rng, base, 30, 60))
+    assert "empty" not in index and len(index) == 2
+
+    # Replacing a face with no descriptors removes it
+    index.add("a", np.empty((0, 32), dtype=np.uint8))
+    assert "a" not in index
+
+    query = orb_like(rng, base, 30, 5)
+    assert index.match(query) == bf_match(query, {"b": index.descriptors[:index.size]})
+    assert DescriptorIndex().match(query) == (None, 1.0)
+    assert index.match(None) == (None, 1.0)
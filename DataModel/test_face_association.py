@@ -0,0 +1,102 @@
+import itertools
+import numpy as np
+import pytest
+
+from face_association import association_matrices, associate_faces, greedy_assignment, same_face_matrix
+
+
+def is_same_face_by_location(current_face, previous_face, iou_threshold=0.5,
+                             overlap_threshold=0.7, distance_threshold=0.3):
+    """The scalar per-pair rules association_matrices and same_face_matrix replace."""
+    cx, cy, cw, ch = current_face
+    px, py, pw, ph = previous_face
+    intersection_area = max(0, min(cx + cw, px + pw) - max(cx, px)) * max(0, min(cy + ch, py + ph) - max(cy, py))
+    current_area, previous_area = cw * ch, pw * ph
+    union_area = current_area + previous_area - intersection_area
+    iou = intersection_area / union_area if union_area > 0 else 0
+
+    center_distance = ((cx + cw / 2 - px - pw / 2) ** 2 + (cy + ch / 2 - py - ph / 2) ** 2) ** 0.5
+    avg_size = (cw + ch + pw + ph) / 4
+    normalized_distance = center_distance / avg_size if avg_size > 0 else float('inf')
+
+    smaller_area = min(current_area, previous_area)
+    overlap_ratio = intersection_area / smaller_area if smaller_area > 0 else 0
+    size_ratio = min(cw, pw) / max(cw, pw) * min(ch, ph) / max(ch, ph)
+
+    if iou >= iou_threshold:
+        return True
+    elif overlap_ratio >= overlap_threshold and normalized_distance <= distance_threshold:
+        return True
+    elif normalized_distance <= distance_threshold * 0.5 and size_ratio >= 0.7:
+        return True
+    return False
+
+
+def random_boxes(rng, count):
+    boxes = np.empty((count, 4))
+    boxes[:, :2] = rng.integers(0, 200, (count, 2))
+    boxes[:, 2:] = rng.integers(10, 80, (count, 2))
+    return boxes
+
+
+def jittered(rng, boxes, amount):
+    return boxes + rng.integers(-amount, amount + 1, boxes.shape)
+
+
+def test_same_face_matrix_matches_scalar_rules():
+    rng = np.random.default_rng(0)
+    previous = random_boxes(rng, 30)
+    current = np.vstack([jittered(rng, previous, 6), random_boxes(rng, 30)])
+    allowed = same_face_matrix(*association_matrices(current, previous))
+
+    expected = np.array([[is_same_face_by_location(tuple(c), tuple(p)) for p in previous] for c in current])
+    np.testing.assert_array_equal(allowed, expected)
+    assert allowed.any() and not allowed.all()
+
+
+def test_association_matrices_values():
+    iou, overlap_ratio, normalized_distance, size_ratio = association_matrices(
+        [[0, 0, 10, 10], [100, 100, 10, 10]], [[5, 0, 10, 10], [0, 0, 20, 20]])
+    np.testing.assert_allclose(iou, [[50 / 150, 100 / 400], [0, 0]])
+    np.testing.assert_allclose(overlap_ratio, [[0.5, 1.0], [0, 0]])
+    np.testing.assert_allclose(normalized_distance[0], [0.5, np.hypot(5, 5) / 15])
+    np.testing.assert_allclose(size_ratio, [[1.0, 0.25], [1.0, 0.25]])
+
+
+def test_hungarian_is_optimal():
+    pytest.importorskip("scipy")
+    rng = np.random.default_rng(1)
+    for trial in range(30):
+        previous = random_boxes(rng, 5)
+        current = jittered(rng, previous[rng.permutation(5)], 15)
+        iou, overlap_ratio, normalized_distance, size_ratio = association_matrices(current, previous)
+        allowed = same_face_matrix(iou, overlap_ratio, normalized_distance, size_ratio)
+        cost = normalized_distance - iou
+
+        pairs = associate_faces(current, previous, method="hungarian")
+        assert all(allowed[row, col] for row, col in pairs)
+        assert len({row for row, _ in pairs}) == len(pairs) == len({col for _, col in pairs})
+
+        # Most links first, then the lowest total cost, over every assignment
+        best = (0, 0.0)
+        for columns in itertools.permutations(range(5)):
+            links = [(row, col) for row, col in enumerate(columns) if allowed[row, col]]
+            best = max(best, (len(links), -sum(cost[row, col] for row, col in links)))
+        found = (len(pairs), -sum(cost[row, col] for row, col in pairs))
+        assert found[0] == best[0], trial
+        assert found[1] == pytest.approx(best[1]), trial
+
+
+def test_greedy_assignment_takes_cheapest_pairs_first():
+    cost = np.array([[0.1, 0.2], [0.05, 0.9]])
+    allowed = np.ones_like(cost, dtype=bool)
+    assert greedy_assignment(cost, allowed) == [(1, 0), (0, 1)]
+    allowed[0, 1] = False
+    assert greedy_assignment(cost, allowed) == [(1, 0)]
+    assert sorted(associate_faces([[0, 0, 10, 10]], [[1, 0, 10, 10]], method="greedy")) == [(0, 0)]
+
+
+def test_no_boxes_or_no_allowed_pairs():
+    assert associate_faces([], [[0, 0, 10, 10]]) == []
+    assert associate_faces([[0, 0, 10, 10]], []) == []
+    assert associate_faces([[0, 0, 10, 10]], [[500, 500, 10, 10]]) == []
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip("deepface")
+from face_gallery import CACHE_FILE, FaceGallery
+
+DIM = 16
+
+
+class FakeGallery(FaceGallery):
+    """Embeds an image as a fixed unit vector derived from its path."""
+    embedded = 0
+
+    def embed(self, img):
+        FakeGallery.embedded += 1
+        rng = np.random.default_rng(abs(hash(str(img))) % 2 ** 32)
+        vector = rng.standard_normal(DIM).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+def make_database(root, users=2, images=3):
+    for user in range(users):
+        os.makedirs(root / f"user{user}", exist_ok=True)
+        for image in range(images):
+            (root / f"user{user}" / f"face_{image}.jpg").write_bytes(b"jpeg" * (image + 1))
+
+
+def test_load_is_read_only(tmp_path):
+    make_database(tmp_path)
+    gallery = FakeGallery(str(tmp_path))
+    gallery.load()
+    assert len(gallery) == 6 and gallery.dirty
+    assert not os.path.exists(tmp_path / CACHE_FILE)
+
+    gallery.flush()
+    assert os.path.exists(tmp_path / CACHE_FILE) and not gallery.dirty
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_cache_round_trip_reuses_rows(tmp_path):
+    make_database(tmp_path)
+    gallery = FakeGallery(str(tmp_path))
+    gallery.load(save=True)
+
+    FakeGallery.embedded = 0
+    reloaded = FakeGallery(str(tmp_path))
+    reloaded.load()
+    assert FakeGallery.embedded == 0 and not reloaded.dirty
+    assert reloaded.labels == gallery.labels
+    np.testing.assert_array_equal(reloaded.embeddings, gallery.embeddings)
+    label, distance = reloaded.search(gallery.embeddings[4])
+    assert label == gallery.labels[4] and distance < 1e-5
+
+
+def test_changes_are_written_at_most_once_per_interval(tmp_path):
+    make_database(tmp_path, users=1)
+    gallery = FakeGallery(str(tmp_path), save_interval=3600)
+    gallery.load(save=True)
+    mtime = os.stat(tmp_path / CACHE_FILE).st_mtime_ns
+
+    new_file = tmp_path / "user0" / "face_9.jpg"
+    new_file.write_bytes(b"new")
+    assert gallery.add_image("user0", str(new_file))
+    os.remove(tmp_path / "user0" / "face_0.jpg")
+    assert gallery.remove_image(str(tmp_path / "user0" / "face_0.jpg"))
+    assert gallery.dirty and os.stat(tmp_path / CACHE_FILE).st_mtime_ns == mtime
+
+    gallery.flush()
+    reloaded = FakeGallery(str(tmp_path))
+    reloaded.read_cache()
+    assert len(reloaded.cached_matrix) == 3
+    reloaded.load()
+    assert not reloaded.dirty
+    assert sorted(os.path.basename(path) for path in reloaded.paths) == ["face_1.jpg", "face_2.jpg", "face_9.jpg"]
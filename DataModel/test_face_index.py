@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from face_index import ExactIndex, IVFFlatIndex, create_index, measure_recall_at_1, top_k
+
+DIM = 64
+
+
+def unit_vectors(rng, count, dim=DIM):
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def clustered_gallery(rng, people=100, images=5, noise=0.1):
+    """Several noisy embeddings per person, like a face gallery."""
+    centres = unit_vectors(rng, people)
+    vectors = np.repeat(centres, images, axis=0) + noise * rng.standard_normal((people * images, DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = centres + noise * rng.standard_normal(centres.shape)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.arange(len(vectors)) * 10, vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def brute_force(ids, vectors, query, k):
+    similarities = vectors @ query
+    order = np.argsort(-similarities, kind="stable")[:k]
+    return ids[order], similarities[order]
+
+
+def test_exact_index_matches_brute_force():
+    rng = np.random.default_rng(0)
+    ids, vectors, queries = clustered_gallery(rng)
+    index = ExactIndex(DIM)
+    index.build(ids, vectors)
+
+    for query in queries:
+        found, similarities = index.search(query, k=5)
+        expected, expected_similarities = brute_force(ids, vectors, query, 5)
+        np.testing.assert_array_equal(found, expected)
+        np.testing.assert_allclose(similarities, expected_similarities, rtol=1e-6)
+
+
+def test_exact_index_add_and_remove():
+    rng = np.random.default_rng(1)
+    ids, vectors, queries = clustered_gallery(rng, people=20)
+    index = ExactIndex(DIM)
+    index.build(ids[:50], vectors[:50])
+    index.add(ids[50:], vectors[50:])
+    removed = ids[::3]
+    index.remove(removed)
+
+    keep = ~np.isin(ids, removed)
+    assert len(index) == keep.sum()
+    for query in queries:
+        found, _ = index.search(query, k=1)
+        assert found[0] == brute_force(ids[keep], vectors[keep], query, 1)[0][0]
+
+
+def test_top_k_is_sorted_best_first():
+    similarities = np.array([0.1, 0.9, 0.5, 0.7, 0.3], dtype=np.float32)
+    ids, best = top_k(np.arange(5), similarities, 3)
+    np.testing.assert_array_equal(ids, [1, 3, 2])
+    np.testing.assert_array_equal(best, similarities[[1, 3, 2]])
+    assert len(top_k(np.arange(5), similarities, 10)[0]) == 5
+
+
+def test_ivf_recall_on_clustered_gallery():
+    rng = np.random.default_rng(2)
+    ids, vectors, queries = clustered_gallery(rng, people=200)
+    index = IVFFlatIndex(DIM, nlist=32, nprobe=4)
+    index.build(ids, vectors)
+    assert measure_recall_at_1(index, ids, vectors, queries) >= 0.9
+
+
+def test_ivf_scanning_every_list_is_exact():
+    rng = np.random.default_rng(3)
+    ids, vectors, queries = clustered_gallery(rng, people=100, noise=0.5)
+    index = IVFFlatIndex(DIM, nlist=16, nprobe=1)
+    index.build(ids, vectors)
+    while index.tune_up():
+        pass
+    assert index.nprobe == len(index.centroids)
+    assert measure_recall_at_1(index, ids, vectors, queries) == 1.0
+
+
+def test_ivf_add_retrain_and_remove():
+    rng = np.random.default_rng(4)
+    ids, vectors, queries = clustered_gallery(rng, people=100)
+    index = IVFFlatIndex(DIM, nlist=16, nprobe=16)
+    index.build(ids[:40], vectors[:40])
+    for start in range(40, len(ids), 40):
+        index.add(ids[start:start + 40], vectors[start:start + 40])
+    assert len(index) == len(ids)
+    assert index.trained_size > 40  # Retrained as it grew
+
+    removed = ids[::2]
+    index.remove(removed)
+    keep = ~np.isin(ids, removed)
+    assert len(index) == keep.sum()
+    assert measure_recall_at_1(index, ids[keep], vectors[keep], queries) == 1.0
+
+
+def test_hnsw_recall():
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(5)
+    ids, vectors, queries = clustered_gallery(rng, people=200)
+    index = create_index("hnsw", DIM)
+    index.build(ids, vectors)
+    assert measure_recall_at_1(index, ids, vectors, queries) >= 0.95
+
+    index.remove(ids[:100])
+    assert len(index) == len(ids) - 100
+    assert measure_recall_at_1(index, ids[100:], vectors[100:], queries) >= 0.95
+
+
+def test_empty_index_and_unknown_backend():
+    for backend in ("exact", "ivf"):
+        found, similarities = create_index(backend, DIM).search(np.ones(DIM, dtype=np.float32))
+        assert len(found) == 0 and len(similarities) == 0
+    with pytest.raises(ValueError):
+        create_index("annoy", DIM)
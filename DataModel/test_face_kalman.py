@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+
+from face_kalman import (INITIAL_COVARIANCE, MEASUREMENT, MEASUREMENT_NOISE, PROCESS_NOISE, TRANSITION,
+                         BatchedKalmanTracker)
+
+
+def cv2_filter(box):
+    """The per-face cv2.KalmanFilter BatchedKalmanTracker replaces."""
+    kalman = cv2.KalmanFilter(6, 4)
+    kalman.transitionMatrix = TRANSITION.copy()
+    kalman.measurementMatrix = MEASUREMENT.copy()
+    kalman.processNoiseCov = PROCESS_NOISE.copy()
+    kalman.measurementNoiseCov = MEASUREMENT_NOISE.copy()
+    kalman.errorCovPost = INITIAL_COVARIANCE.copy()
+    kalman.statePost = np.array([*box, 0, 0], np.float32).reshape(6, 1)
+    return kalman
+
+
+def test_batched_filter_matches_cv2():
+    rng = np.random.default_rng(0)
+    faces = 12
+    start = rng.uniform(0, 500, (faces, 4)).astype(np.float32)
+    velocity = rng.uniform(-5, 5, (faces, 2)).astype(np.float32)
+
+    tracker = BatchedKalmanTracker(capacity=4)  # Grows while faces are added
+    filters = {}
+    for face_id in range(faces):
+        tracker.add(face_id, start[face_id])
+        filters[face_id] = cv2_filter(start[face_id])
+
+    for frame in range(1, 30):
+        # Every frame a different subset of faces is measured
+        face_ids = [face_id for face_id in range(faces) if rng.random() < 0.7]
+        truth = start[face_ids].copy()
+        truth[:, :2] += frame * velocity[face_ids]
+        measurements = truth + rng.normal(0, 2, truth.shape).astype(np.float32)
+
+        boxes = tracker.step(face_ids, measurements)
+        for row, face_id in enumerate(face_ids):
+            filters[face_id].predict()
+            expected = filters[face_id].correct(measurements[row].reshape(4, 1))
+            np.testing.assert_allclose(boxes[row], expected[:4, 0], rtol=1e-4, atol=1e-3)
+            np.testing.assert_allclose(tracker.covariances[tracker.rows[face_id]],
+                                       filters[face_id].errorCovPost, rtol=1e-4, atol=1e-5)
+
+
+def test_predict_only_matches_cv2():
+    tracker = BatchedKalmanTracker()
+    tracker.add("a", [10, 20, 30, 40])
+    kalman = cv2_filter([10, 20, 30, 40])
+    tracker.step(["a"], [[14, 22, 30, 40]])
+    kalman.predict()
+    kalman.correct(np.array([[14], [22], [30], [40]], np.float32))
+
+    for _ in range(3):
+        predicted = tracker.predict(["a"])
+        np.testing.assert_allclose(predicted[0], kalman.predict()[:4, 0], rtol=1e-5)
+    np.testing.assert_allclose(tracker.box("a"), kalman.statePost[:4, 0], rtol=1e-5)
+
+
+def test_remove_moves_last_face_into_freed_row():
+    tracker = BatchedKalmanTracker(capacity=2)
+    for face_id in range(5):
+        tracker.add(face_id, [face_id * 10, 0, 10, 10])
+    tracker.remove(1)
+    tracker.remove(1)  # Unknown faces are ignored
+    assert len(tracker) == 4 and 1 not in tracker
+    for face_id in (0, 2, 3, 4):
+        np.testing.assert_array_equal(tracker.box(face_id), [face_id * 10, 0, 10, 10])
+
+    # Re-adding a face restarts its filter
+    tracker.add(4, [7, 7, 7, 7])
+    assert len(tracker) == 4
+    np.testing.assert_array_equal(tracker.box(4), [7, 7, 7, 7])
+    assert tracker.step([], []).shape == (0, 4)
@@ -0,0 +1,79 @@
+import math
+import os
+import numpy as np
+
+from fov_geometry import cast_rays, fov_polygon, layout_fovs, load_layout, ray_directions, wall_segments
+
+MAP_PATH = os.path.join(os.path.dirname(__file__), "..", "maps", "map.json")
+
+
+def reference_polygon(origin, rotation, segments, view_angle=70.0, view_range=200.0, view_rays=90):
+    """The per-ray, per-wall-edge loop of the original CameraItem.updateFov."""
+    ox, oy = origin
+    points = [(ox, oy)]
+    start_angle = -rotation - view_angle / 2
+    for i in range(view_rays + 1):
+        rad = math.radians(start_angle + view_angle * i / view_rays)
+        ex, ey = ox + view_range * math.cos(rad), oy - view_range * math.sin(rad)
+        closest, min_dist_sq = (ex, ey), view_range ** 2
+        for x1, y1, x2, y2 in segments:
+            # Bounded intersection of the ray segment and the wall edge
+            denominator = (ex - ox) * (y2 - y1) - (ey - oy) * (x2 - x1)
+            if denominator == 0:
+                continue
+            t = ((x1 - ox) * (y2 - y1) - (y1 - oy) * (x2 - x1)) / denominator
+            u = ((x1 - ox) * (ey - oy) - (y1 - oy) * (ex - ox)) / denominator
+            if 0 <= t <= 1 and 0 <= u <= 1:
+                hit = (ox + t * (ex - ox), oy + t * (ey - oy))
+                dist_sq = (hit[0] - ox) ** 2 + (hit[1] - oy) ** 2
+                if dist_sq < min_dist_sq:
+                    closest, min_dist_sq = hit, dist_sq
+        points.append(closest)
+    return np.array(points)
+
+
+def random_walls(rng, count):
+    return np.vstack([wall_segments(rng.uniform(20, 200), 10, rng.uniform(0, 600, 2), rng.uniform(0, 180))
+                      for _ in range(count)])
+
+
+def test_fov_polygon_matches_per_ray_loop():
+    rng = np.random.default_rng(0)
+    segments = random_walls(rng, 60)
+    for _ in range(40):
+        origin = rng.uniform(0, 600, 2)
+        rotation = rng.uniform(-180, 180)
+        view_angle, view_range = rng.uniform(30, 120), rng.uniform(50, 300)
+        polygon = fov_polygon(origin, rotation, segments, view_angle, view_range, 45)
+        expected = reference_polygon(origin, rotation, segments, view_angle, view_range, 45)
+        np.testing.assert_allclose(polygon, expected, atol=1e-6)
+
+
+def test_rays_without_walls_end_at_range():
+    directions = ray_directions(90.0, 60.0, 6)
+    assert directions.shape == (7, 2)
+    np.testing.assert_allclose(np.linalg.norm(directions, axis=1), 1.0)
+    # Rotation 90 looks down the screen (y grows downwards)
+    np.testing.assert_allclose(directions[3], [0.0, 1.0], atol=1e-12)
+
+    distances, points = cast_rays((10.0, 20.0), directions, np.empty((0, 4)), 100.0)
+    np.testing.assert_allclose(distances, 100.0)
+    np.testing.assert_allclose(points[3], [10.0, 120.0], atol=1e-9)
+
+
+def test_wall_segments_are_the_rotated_rectangle():
+    segments = wall_segments(100, 10, (50, 50), 0)
+    np.testing.assert_allclose(segments[:, :2], [[0, 45], [100, 45], [100, 55], [0, 55]])
+    np.testing.assert_allclose(segments[:, 2:], np.roll(segments[:, :2], -1, axis=0))
+
+    rotated = wall_segments(100, 10, (50, 50), 90)
+    np.testing.assert_allclose(rotated[:, :2], [[55, 0], [55, 100], [45, 100], [45, 0]], atol=1e-9)
+
+
+def test_layout_fovs_match_per_ray_loop():
+    segments, cameras = load_layout(MAP_PATH)
+    fovs = layout_fovs(MAP_PATH)
+    assert set(fovs) == {camera["name"] for camera in cameras}
+    for camera in cameras:
+        expected = reference_polygon(camera["pos"], camera["rot"], segments)
+        np.testing.assert_allclose(fovs[camera["name"]], expected, atol=1e-6)
@@ -0,0 +1,118 @@
+import numpy as np
+
+from capture import CaptureEngine
+from frame_ring import FrameRing
+
+SHAPE = (4, 6, 3)
+
+
+def frame(value, shape=SHAPE):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_latest_frame_and_release():
+    ring = FrameRing(slots=3)
+    assert ring.get_latest(timeout=0) == (None, None)
+    assert ring.wants_frame()
+
+    for value in range(5):
+        assert ring.write(frame(value)) == value
+    assert not ring.wants_frame()  # Nobody took the latest frame yet
+    seq, view = ring.get_latest(timeout=0)
+    assert seq == 4 and (view == 4).all()
+    assert ring.wants_frame()
+    assert not ring.has_new(seq)
+    assert ring.get_latest(seq, timeout=0) == (None, None)
+    ring.release(seq)
+
+
+def test_pinned_frame_is_never_overwritten():
+    ring = FrameRing(slots=3)
+    ring.write(frame(1))
+    seq, view = ring.get_latest(timeout=0)
+    for value in range(2, 20):
+        ring.write(frame(value))
+    assert (view == 1).all()
+    assert ring.skipped_count(seq) == 0  # Still in the ring
+
+    ring.release(seq)
+    for value in range(20, 23):
+        ring.write(frame(value))
+    assert ring.skipped_count(seq) is None  # Overwritten once released
+
+
+def test_latest_frame_is_kept_when_every_other_slot_is_pinned():
+    ring = FrameRing(slots=3)
+    ring.write(frame(1))
+    first, first_view = ring.get_latest(timeout=0)
+    ring.write(frame(2))
+    second, second_view = ring.get_latest(first, timeout=0)
+    latest = ring.write(frame(3))
+
+    # Both other slots are pinned: the new frame is dropped, not written over the latest one
+    assert ring.write(frame(4)) is None
+    assert ring.begin_write(SHAPE) is None
+    seq, view = ring.get_latest(second, timeout=0)
+    assert seq == latest and (view == 3).all()
+    assert (first_view == 1).all() and (second_view == 2).all()
+
+    ring.release(first)
+    assert ring.write(frame(5)) == latest + 1
+    assert (view == 3).all()  # Still pinned by the last read
+
+
+def test_abort_write_frees_the_slot():
+    ring = FrameRing(slots=2)
+    ring.write(frame(1))
+    slot = ring.begin_write(SHAPE)
+    assert slot is not None
+    ring.abort_write()
+    seq, view = ring.get_latest(timeout=0)
+    assert seq == 0 and (view == 1).all()
+    ring.release(seq)
+
+    # The aborted slot is reused for the next frame
+    assert ring.write(frame(2)) == 1
+    assert ring.write(frame(3)) == 2
+
+
+def test_reallocation_keeps_old_views_alive():
+    ring = FrameRing(slots=2)
+    ring.write(frame(7))
+    seq, old_view = ring.get_latest(timeout=0)
+
+    ring.write(frame(8, shape=(8, 8, 3)))
+    new_seq, new_view = ring.get_latest(seq, timeout=0)
+    assert new_view.shape == (8, 8, 3) and (new_view == 8).all()
+    assert (old_view == 7).all()
+    ring.release(seq)
+    ring.release(new_seq)
+
+    ring.clear()
+    assert ring.get_latest(timeout=0) == (None, None)
+
+
+def test_skipped_counts_travel_with_frames():
+    ring = FrameRing(slots=4)
+    first = ring.write(frame(1), skipped=0)
+    second = ring.write(frame(2), skipped=3)
+    assert ring.skipped_count(second) - ring.skipped_count(first) == 3
+
+
+class FailingCapture:
+    """Stands in for cv2.VideoCapture when decoding fails."""
+    def retrieve(self, image=None):
+        return False, None
+
+
+def test_failed_decode_gives_back_the_slot():
+    ring = FrameRing(slots=2)
+    capture = CaptureEngine(0)
+    capture.cap = FailingCapture()
+    capture.set_frame_size(SHAPE[1], SHAPE[0])
+    capture.frames_grabbed = 1
+    assert capture.retrieve(ring) is None
+    assert ring.write_slot is None
+
+    assert ring.write(frame(1)) == 0
+    assert ring.write(frame(2)) == 1
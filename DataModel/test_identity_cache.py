@@ -0,0 +1,49 @@
+import numpy as np
+
+from identity_cache import IdentityCache
+
+TRACK = ("cam", 1)
+
+
+def test_worse_result_does_not_replace_a_valid_identity():
+    cache = IdentityCache()
+    cache.store(TRACK, "alice", 0.2)
+    cache.store(TRACK, "bob", 0.4)      # Another face of the same person, worse match
+    cache.store(TRACK, "Unknown", 1.0)  # A face that was not recognized
+    assert cache.lookup(TRACK).name == "alice"
+    assert cache.lookup(TRACK).distance == 0.2
+
+
+def test_better_result_replaces_the_identity():
+    cache = IdentityCache()
+    cache.store(TRACK, "Unknown", 1.0)
+    cache.store(TRACK, "alice", 0.4)
+    assert cache.lookup(TRACK).name == "alice"
+    cache.store(TRACK, "carol", 0.1)
+    assert cache.lookup(TRACK).name == "carol"
+
+
+def test_expired_identity_is_replaced_by_any_result():
+    cache = IdentityCache(ttl=30.0)
+    cache.store(TRACK, "alice", 0.2)
+    cache.entries[TRACK].timestamp -= 60.0
+    cache.store(TRACK, "Unknown", 1.0)
+    assert cache.entries[TRACK].name == "Unknown"
+
+
+def test_lookup_expires_on_age_decay_and_drift():
+    cache = IdentityCache(ttl=30.0, half_life=10.0, min_margin=0.1, max_drift=0.3, unknown_ttl=1.0)
+    features = np.array([1.0, 0.0, 0.0])
+    cache.store(TRACK, "alice", 0.1, features)
+    assert cache.lookup(TRACK, features) is not None
+    assert cache.lookup(TRACK, np.array([0.0, 1.0, 0.0])) is None  # Drifted: another person
+
+    cache.store(TRACK, "alice", 0.6)  # Weak match: its margin decays below min_margin quickly
+    cache.entries[TRACK].timestamp -= 10.0
+    assert cache.lookup(TRACK) is None
+
+    cache.store(TRACK, "Unknown", 1.0)
+    assert cache.lookup(TRACK) is not None
+    cache.entries[TRACK].timestamp -= 1.0
+    assert cache.lookup(TRACK) is None
+    assert 0.0 < cache.hit_ratio() < 1.0
@@ -0,0 +1,44 @@
+import numpy as np
+
+from motion_gate import MotionGate
+
+
+def noisy_scene(rng, base, noise=2):
+    return np.clip(base + rng.normal(0, noise, base.shape), 0, 255).astype(np.uint8)
+
+
+def test_static_scene_is_skipped_and_motion_passes():
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (240, 320, 3)).astype(np.float64)
+    gate = MotionGate(max_skip=1000)
+
+    assert gate.check("cam", noisy_scene(rng, base))  # First frame always passes
+    results = [gate.check("cam", noisy_scene(rng, base)) for _ in range(50)]
+    assert not any(results[10:])
+    assert gate.activity("cam", 0.1) < 1.0
+
+    moved = base.copy()
+    moved[60:180, 80:200] = 255 - moved[60:180, 80:200]  # Something walks in
+    assert gate.check("cam", noisy_scene(rng, moved))
+    assert gate.activity("cam", 0.1) == 1.0
+    assert 0.0 < gate.skip_ratio("cam") < 1.0
+
+
+def test_detection_is_forced_every_max_skip_frames():
+    frame = np.full((120, 160, 3), 80, dtype=np.uint8)
+    gate = MotionGate(max_skip=5)
+    results = [gate.check("cam", frame) for _ in range(13)]
+    assert results == [True] + [False] * 5 + [True] + [False] * 5 + [True]
+
+
+def test_update_measures_without_counting_skips():
+    frame = np.full((120, 160, 3), 80, dtype=np.uint8)
+    gate = MotionGate()
+    assert gate.activity("cam") == 1.0  # Not seen yet
+    for _ in range(5):
+        gate.update("cam", frame)
+    assert gate.activity("cam", 0.25) == 0.25
+    assert gate.skip_ratio("cam") == 0.0
+
+    gate.forget("cam")
+    assert gate.stats() == {}
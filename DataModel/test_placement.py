@@ -0,0 +1,90 @@
+import numpy as np
+
+from coverage import CoverageGrid, CoverageMap
+from fov_geometry import layout_segments
+from placement import (candidate_coverage, candidate_positions, count_bits, greedy_placement,
+                       layout_report, optimize_placement, refine_placement)
+
+# 400 x 300 room split by a wall with a door gap
+LAYOUT = {
+    "walls": [
+        {"width": 400, "height": 6, "pos": [200, 3], "rot": 0},
+        {"width": 400, "height": 6, "pos": [200, 297], "rot": 0},
+        {"width": 6, "height": 300, "pos": [3, 150], "rot": 0},
+        {"width": 6, "height": 300, "pos": [397, 150], "rot": 0},
+        {"width": 6, "height": 200, "pos": [200, 100], "rot": 0},
+    ],
+    "cameras": [{"name": "Entrance", "url": "0", "pos": [50, 50], "rot": 45}],
+}
+
+
+def room_coverage(cell_size=10):
+    segments = layout_segments(LAYOUT)
+    coverage = CoverageMap(CoverageGrid(0, 0, 400, 300, cell_size))
+    coverage.set_walls(segments)
+    return segments, coverage
+
+
+def test_count_bits():
+    rng = np.random.default_rng(0)
+    packed = rng.integers(0, 256, (5, 24), dtype=np.uint8)
+    np.testing.assert_array_equal(count_bits(packed), np.unpackbits(packed, axis=1).sum(axis=1))
+    np.testing.assert_array_equal(count_bits(packed[:, :5]), np.unpackbits(packed[:, :5], axis=1).sum(axis=1))
+
+
+def test_candidate_bits_match_exact_coverage():
+    segments, coverage = room_coverage()
+    positions = candidate_positions(coverage, spacing=60)
+    rotations = np.arange(0.0, 360.0, 45.0)
+    candidates = candidate_coverage(positions, segments, coverage, rotations, workers=1)
+    assert candidates.shape[0] == len(positions) * len(rotations)
+
+    # Cells a candidate sees are those of the camera's own FOV polygon, up to the ray resolution
+    area = coverage.area_mask()
+    for row in range(0, len(candidates), 7):
+        camera = {"name": "c", "pos": positions[row // len(rotations)], "rot": rotations[row % len(rotations)]}
+        report = layout_report(coverage, segments, [camera])
+        covered = count_bits(candidates[row:row + 1])[0] * coverage.grid.cell_area
+        assert abs(covered - report["covered_area"]) <= 0.05 * area.sum() * coverage.grid.cell_area
+
+
+def test_worker_pool_matches_serial():
+    segments, coverage = room_coverage(cell_size=16)
+    positions = candidate_positions(coverage, spacing=80)
+    rotations = np.arange(0.0, 360.0, 90.0)
+    serial = candidate_coverage(positions, segments, coverage, rotations, workers=1)
+    pooled = candidate_coverage(positions, segments, coverage, rotations, workers=2)
+    np.testing.assert_array_equal(serial, pooled)
+
+
+def test_refine_fixes_a_greedy_pick():
+    # Greedy takes the big middle set first; the two halves cover everything
+    candidates = np.packbits(np.array([
+        [0, 1, 1, 1, 1, 1, 1, 0],
+        [1, 1, 1, 1, 0, 0, 0, 0],
+        [0, 0, 0, 0, 1, 1, 1, 1],
+    ], dtype=bool), axis=1)
+    chosen = greedy_placement(candidates, 2)
+    assert chosen[0] == 0
+    assert count_bits(np.bitwise_or.reduce(candidates[chosen]))[()] == 7
+
+    refined = refine_placement(candidates, chosen)
+    assert sorted(refined) == [1, 2]
+    assert count_bits(np.bitwise_or.reduce(candidates[refined]))[()] == 8
+
+
+def test_optimized_placement_beats_random_layouts():
+    segments, coverage = room_coverage()
+    proposed, report = optimize_placement(LAYOUT, 2, cell_size=10, spacing=40, rotation_step=30, workers=1)
+    cameras = proposed["cameras"]
+    assert [camera["name"] for camera in cameras] == ["Entrance", "Camera 2"]
+    assert cameras[0]["url"] == "0" and all(-180 <= camera["rot"] <= 180 for camera in cameras)
+
+    rng = np.random.default_rng(1)
+    positions = candidate_positions(coverage, spacing=10)
+    best_random = 0.0
+    for _ in range(30):
+        layout = [{"name": str(n), "pos": positions[rng.integers(len(positions))], "rot": rng.uniform(-180, 180)}
+                  for n in range(2)]
+        best_random = max(best_random, layout_report(coverage, segments, layout)["coverage"])
+    assert report["coverage"] > best_random
@@ -0,0 +1,61 @@
+from track_registry import TrackRegistry
+
+
+class Track:
+    """Stands in for Person / Face: only the fields the registry reads."""
+    def __init__(self, last_seen=0.0, face_id=None, person_id=None):
+        self.last_seen = last_seen
+        self.face_id = face_id
+        self.person_id = person_id
+
+
+def test_expire_removes_stale_persons_and_their_faces():
+    registry = TrackRegistry()
+    registry.add_person("a", Track(last_seen=0.0))
+    registry.add_person("b", Track(last_seen=8.0))
+    registry.add_face(Track(face_id=1, person_id="a"))
+    registry.add_face(Track(face_id=2, person_id="a"))
+    registry.add_face(Track(face_id=3, person_id="b"))
+
+    expired = registry.expire(5.0, now=10.0)
+    assert [(key, sorted(face_ids)) for key, face_ids in expired] == [("a", [1, 2])]
+    assert "a" not in registry.persons and set(registry.faces) == {3}
+    assert [face.face_id for face in registry.faces_of("b")] == [3]
+
+
+def test_refreshed_person_is_kept():
+    registry = TrackRegistry()
+    person = Track(last_seen=0.0)
+    registry.add_person("a", person)
+    person.last_seen = 9.0  # Seen again without touching the heap
+    assert registry.expire(5.0, now=10.0) == []
+    assert registry.expire(5.0, now=20.0) == [("a", [])]
+    assert len(registry) == 0 and not registry.heap
+
+
+def test_stale_entry_of_a_reused_key_does_not_evict_the_new_track():
+    registry = TrackRegistry()
+    registry.add_person("a", Track(last_seen=0.0))
+    registry.add_face(Track(face_id=1, person_id="a"))
+    registry.remove_person("a")
+
+    # The tracker was re-created and handed out the same track id again
+    person = Track(last_seen=5.0)
+    registry.add_person("a", person)
+    registry.add_face(Track(face_id=2, person_id="a"))
+    person.last_seen = 20.0
+    assert registry.expire(10.0, now=21.0) == []
+    assert registry.persons["a"] is person and set(registry.faces) == {2}
+
+    # Only the new generation's entry is left, re-pushed with the newer time
+    assert [entry[0] for entry in registry.heap] == [20.0]
+    assert registry.expire(10.0, now=31.0) == [("a", [2])]
+
+
+def test_re_adding_a_live_key_leaves_one_live_entry():
+    registry = TrackRegistry()
+    for last_seen in (1.0, 2.0, 3.0):
+        registry.add_person("a", Track(last_seen=last_seen))
+    assert registry.expire(10.0, now=12.5) == []
+    assert len(registry.heap) == 1
+    assert registry.expire(10.0, now=13.5) == [("a", [])]
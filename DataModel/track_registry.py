@@ -0,0 +1,84 @@
+import time
+import heapq
+
+
+class TrackRegistry:
+    """
+    Live persons and faces with indexed eviction.
+
+    'persons' maps person keys to Person objects and 'faces' face ids to Face
+    objects; a person -> face ids reverse index avoids scanning every face
+    to find a person's. Stale persons are found through a min-heap of
+    last-seen times holding one entry per person. Persons refresh their
+    'last_seen' without touching the heap; an entry is only re-pushed with
+    the newer time when it reaches the top, so an eviction pass costs as
+    much as the persons close to expiring, not all of them.
+
+    Track ids restart when a camera's tracker is re-created, so a person key
+    can be removed and added again while its old heap entries are still
+    queued. Every add_person starts a new generation of the key, and heap
+    entries of an older generation are discarded when they reach the top.
+    """
+    def __init__(self):
+        self.persons = {}       # person key -> Person
+        self.faces = {}         # face id -> Face
+        self.person_faces = {}  # person key -> set of face ids
+        self.heap = []          # (last_seen, counter, person key, generation)
+        self.counter = 0        # Tie breaker so person keys are never compared
+        self.generations = {}   # person key -> generation of its live heap entry
+
+    def push(self, person_key, last_seen):
+        self.counter += 1
+        heapq.heappush(self.heap, (last_seen, self.counter, person_key, self.generations[person_key]))
+
+    def add_person(self, person_key, person):
+        """Add a person, or replace the one under the same key (a reused track id)."""
+        self.persons[person_key] = person
+        # The counter is unique, so it doubles as the new generation
+        self.generations[person_key] = self.counter + 1
+        self.push(person_key, person.last_seen)
+
+    def add_face(self, face):
+        self.faces[face.face_id] = face
+        self.person_faces.setdefault(face.person_id, set()).add(face.face_id)
+
+    def faces_of(self, person_key):
+        """Return the faces of a person."""
+        return [self.faces[face_id] for face_id in self.person_faces.get(person_key, ())]
+
+    def remove_person(self, person_key):
+        """
+        Remove a person and its faces. The heap entry is dropped lazily.
+        Returns: list of removed face ids
+        """
+        self.persons.pop(person_key, None)
+        self.generations.pop(person_key, None)
+        face_ids = list(self.person_faces.pop(person_key, ()))
+        for face_id in face_ids:
+            self.faces.pop(face_id, None)
+        return face_ids
+
+    def expire(self, max_age, now=None):
+        """
+        Remove persons not seen for more than 'max_age' seconds (monotonic
+        time), together with their faces.
+        Returns: list of (person_key, removed face ids)
+        """
+        now = time.monotonic() if now is None else now
+        deadline = now - max_age
+        expired = []
+
+        while self.heap and self.heap[0][0] < deadline:
+            _, _, person_key, generation = heapq.heappop(self.heap)
+            if self.generations.get(person_key) != generation:
+                continue  # Removed, or added again since it was pushed
+            person = self.persons[person_key]
+            if person.last_seen >= deadline:
+                self.push(person_key, person.last_seen)  # Seen since it was pushed
+                continue
+            expired.append((person_key, self.remove_person(person_key)))
+
+        return expired
+
+    def __len__(self):
+        return len(self.persons)
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+class TrajectoryRing:
+    """
+    Bounded history of a track's boxes in a fixed NumPy ring buffer.
+
+    Each entry is (timestamp, x, y, w, h). Once 'capacity' entries are
+    stored the oldest is overwritten, so a track's memory stays constant
+    however long it lives.
+    """
+    __slots__ = ("entries", "next", "count")
+
+    def __init__(self, capacity=64):
+        self.entries = np.empty((capacity, 5), dtype=np.float64)
+        self.next = 0   # Row the next entry is written to
+        self.count = 0
+
+    def append(self, timestamp, x, y, w, h):
+        self.entries[self.next] = (timestamp, x, y, w, h)
+        self.next = (self.next + 1) % len(self.entries)
+        self.count = min(self.count + 1, len(self.entries))
+
+    def to_array(self, last=None):
+        """
+        Return the stored entries (or only the 'last' ones), oldest first, as
+        a (K, 5) array of (timestamp, x, y, w, h).
+        """
+        count = self.count if last is None else min(last, self.count)
+        rows = (self.next - count + np.arange(count)) % len(self.entries)
+        return self.entries[rows]
+
+    def centers(self, last=None):
+        """Return (K, 2) box centres, oldest first."""
+        history = self.to_array(last)
+        return history[:, 1:3] + history[:, 3:5] / 2
+
+    def __len__(self):
+        return self.count
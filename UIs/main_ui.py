@@ -131,6 +131,12 @@ class Ui_MainWindow(object):
 
         self.horizontalLayout_5.addWidget(self.load_map_btn)
 
+        self.coverage_btn = QPushButton(self.widget)
+        self.coverage_btn.setObjectName(u"coverage_btn")
+        self.coverage_btn.setCheckable(True)
+
+        self.horizontalLayout_5.addWidget(self.coverage_btn)
+
         self.horizontalSpacer = QSpacerItem(20, 20, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum)
 
         self.horizontalLayout_5.addItem(self.horizontalSpacer)
@@ -219,6 +225,7 @@ class Ui_MainWindow(object):
         self.add_wall_btn.setText(QCoreApplication.translate("MainWindow", u"Add Wall", None))
         self.save_map_btn.setText(QCoreApplication.translate("MainWindow", u"Save Map", None))
         self.load_map_btn.setText(QCoreApplication.translate("MainWindow", u"Load Map", None))
+        self.coverage_btn.setText(QCoreApplication.translate("MainWindow", u"Coverage", None))
         self.label_3.setText(QCoreApplication.translate("MainWindow", u"Cam Feed page", None))
         self.label_4.setText(QCoreApplication.translate("MainWindow", u"Database", None))
     # retranslateUi
@@ -3,14 +3,14 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtCore import QThread,pyqtSlot
 from components.Camera_worker import CameraWorker
-import queue
+from DataModel.frame_ring import FrameRing
 
 class CameraFeedWidget(QWidget):
     """
     A QWidget that shows a live camera feed.
     It now delegates all cv2 work to CameraWorker on a QThread.
     """
-    def __init__(self, name, url,frame_buffer: queue.Queue, parent=None):
+    def __init__(self, name, url,frame_buffer: FrameRing, parent=None):
         super().__init__(parent)
         self.name = name
         self.frame_buffer = frame_buffer
@@ -1,4 +1,3 @@
-import math
 from PyQt6.QtWidgets import (
     QGraphicsObject, 
     QGraphicsPixmapItem, 
@@ -13,9 +12,10 @@ from PyQt6.QtGui import (
     QBrush, 
     QPen
 )
-from PyQt6.QtCore import QPointF, QLineF, Qt, QRectF
+from PyQt6.QtCore import QPointF, Qt
 
 from components.Wall import WallItem
+from DataModel.fov_geometry import fov_polygon, range_rect
 
 
 class CameraItem(QGraphicsObject):
@@ -33,6 +33,7 @@ class CameraItem(QGraphicsObject):
         self.view_rays = 90     # Number of rays to cast (more is smoother)
         self.name = name
         self.url = url
+        self.fov_scene_points = None # Last FOV polygon in scene coordinates
 
         # 2. CHILD ITEMS
         # --- The camera icon ---
@@ -106,93 +107,69 @@ class CameraItem(QGraphicsObject):
     def itemChange(self, change, value):
         if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged and self.scene():
             # When the item moves, update the FOV
-            self.updateFov()
+            self.requestFovUpdate()
         
+        elif change == QGraphicsItem.GraphicsItemChange.ItemSceneChange:
+            # Leaving the current scene
+            fov_scheduler = getattr(self.scene(), "fov_scheduler", None)
+            if fov_scheduler is not None:
+                fov_scheduler.remove_camera(self)
+
         elif change == QGraphicsItem.GraphicsItemChange.ItemSceneHasChanged:
-            self.updateFov()
+            fov_scheduler = getattr(self.scene(), "fov_scheduler", None)
+            if fov_scheduler is not None:
+                fov_scheduler.add_camera(self)
+            else:
+                self.updateFov()
         
         return super().itemChange(change, value)
 
     # Also update FOV when rotated
     def setRotation(self, rotation):
         super().setRotation(rotation)
-        self.updateFov()
+        self.requestFovUpdate()
+
+    def requestFovUpdate(self):
+        """
+        Update the FOV once control returns to the event loop, coalesced with
+        any other change in the same tick (FloorPlanScene), or right away.
+        """
+        fov_scheduler = getattr(self.scene(), "fov_scheduler", None)
+        if fov_scheduler is not None:
+            fov_scheduler.camera_changed(self)
+        else:
+            self.updateFov()
 
     # 5. THE CORE LOGIC: UPDATE FOV
     def updateFov(self):
         if not self.scene():
             return # Can't do anything if not in a scene
 
-        # Get all walls from the scene
-        walls = [item for item in self.scene().items() if isinstance(item, WallItem)]
-        
-        # This will hold the points of our FOV polygon
-        fov_points = [QPointF(0, 0)] # Start at the camera's center (local 0,0)
-        
         camera_pos = self.scenePos()
-        camera_rotation = self.rotation() # Get item's rotation
-        
-        # Cast rays
-        start_angle = -camera_rotation - (self.view_angle / 2)
-        
-        for i in range(self.view_rays + 1):
-            # Calculate the angle of the current ray
-            current_angle = start_angle + (self.view_angle * i / self.view_rays)
-            
-            # Calculate the end point of the ray at max range
-            rad = math.radians(current_angle)
-            end_x = self.view_range * math.cos(rad)
-            end_y = -self.view_range * math.sin(rad) # Y is inverted
-            
-            # Create the ray as a line in SCENE coordinates
-            ray_line = QLineF(camera_pos, camera_pos + QPointF(end_x, end_y))
-            # print(f"line coordinates: {camera_pos.x(),camera_pos.y(),end_x,end_y}")
-            
-            # This will be the final end-point of our ray
-            closest_intersection = ray_line.p2()
-            min_dist_sq = self.view_range**2
-
-            # Check this ray against EVERY wall
-            for wall in walls:
-                # 1. Get the wall's 4 corners in its *local* coordinate system
-                local_rect = wall.rect()
-                p1_local = local_rect.topLeft()
-                p2_local = local_rect.topRight()
-                p3_local = local_rect.bottomRight()
-                p4_local = local_rect.bottomLeft()
-
-                # 2. Get the wall's transformation (position + rotation)
-                transform = wall.sceneTransform()
-
-                # 3. Map the 4 local corners to their *true* scene positions
-                p1_scene = transform.map(p1_local)
-                p2_scene = transform.map(p2_local)
-                p3_scene = transform.map(p3_local)
-                p4_scene = transform.map(p4_local)
-
-                # 4. Create the 4 *actual* rotated edge lines
-                wall_lines = [
-                    QLineF(p1_scene, p2_scene),
-                    QLineF(p2_scene, p3_scene),
-                    QLineF(p3_scene, p4_scene),
-                    QLineF(p4_scene, p1_scene),
-                ]
-                
-                for line in wall_lines:
-                    # Check for intersection
-                    intersect_type, intersect_point = ray_line.intersects(line)
-                    
-                    if intersect_type == QLineF.IntersectionType.BoundedIntersection:
-                        # We hit a wall! Check if it's the closest hit so far
-                        dist_sq = QLineF(camera_pos, intersect_point).length()**2
-                        if dist_sq < min_dist_sq:
-                            min_dist_sq = dist_sq
-                            closest_intersection = intersect_point
-            
-            # Add the final point to our polygon
-            # We must map it from scene coordinates back to this item's
-            # local coordinates, since the fov_item is a child.
-            fov_points.append(self.mapFromScene(closest_intersection))
+        origin = (camera_pos.x(), camera_pos.y())
+
+        # Only walls within view range can stop a ray. The scene's wall index
+        # (FloorPlanScene) finds them; without one, take every wall
+        wall_index = getattr(self.scene(), "wall_index", None)
+        if wall_index is not None:
+            segments = wall_index.segments_in_rect(*range_rect(origin, self.view_range))
+        else:
+            segments = [segment for item in self.scene().items() if isinstance(item, WallItem)
+                        for segment in item.scene_segments()]
+
+        # Cast all rays against all those walls in one vectorized pass
+        scene_points = fov_polygon(origin, self.rotation(), segments,
+                                   self.view_angle, self.view_range, self.view_rays)
+
+        self.fov_scene_points = scene_points
+
+        # Map the points from scene coordinates back to this item's local
+        # coordinates, since the fov_item is a child
+        transform, _ = self.sceneTransform().inverted()
+        local_x = transform.m11() * scene_points[:, 0] + transform.m21() * scene_points[:, 1] + transform.dx()
+        local_y = transform.m12() * scene_points[:, 0] + transform.m22() * scene_points[:, 1] + transform.dy()
+        fov_points = [QPointF(x, y) for x, y in zip(local_x, local_y)]
+        fov_points[0] = QPointF(0, 0) # Start at the camera's center (local 0,0)
 
         # Update the polygon item
         self.fov_item.setPolygon(QPolygonF(fov_points))
@@ -1,7 +1,9 @@
-from PyQt6.QtCore import  QObject, pyqtSignal ,QThread
+from PyQt6.QtCore import  QObject, pyqtSignal
+import time
 import cv2
 from PyQt6.QtGui import QImage
-import queue
+from DataModel.frame_ring import FrameRing
+from DataModel.capture import CaptureEngine
 
 class CameraWorker(QObject):
     """
@@ -15,11 +17,12 @@ class CameraWorker(QObject):
     # Signal to report a failure
     connectionFailed = pyqtSignal(str)
 
-    def __init__(self, name, url,frame_buffer: queue.Queue, parent=None):
+    def __init__(self, name, url,frame_buffer: FrameRing, parent=None, display_fps=25):
         super().__init__(parent)
         self.name = name
         self.url_str = url
         self.frame_buffer = frame_buffer
+        self.display_interval = 1.0 / display_fps  # Frames are only decoded for display this often
         self.is_running = True # Flag to control the loop
 
         try:
@@ -31,43 +34,42 @@ class CameraWorker(QObject):
         """
         The main work loop. This runs in the background thread.
         """
-        cap = None
-        
         # --- 1. Connection Phase ---
         print(f"[{self.name}] Worker thread: Trying to connect...")
         url_to_try = self.url_int if self.url_int is not None else self.url_str
-        cap = cv2.VideoCapture(url_to_try)
+        capture = CaptureEngine(url_to_try)
         
-        if not cap or not cap.isOpened():
+        if not capture.open():
             self.connectionFailed.emit(f"Failed to open:\n{self.url_str}")
             return # Stop the thread
         
         self.connectionSuccess.emit("Connected")
         
         # --- 2. Frame Grab Phase ---
+        # Every frame is grabbed, but only decoded when the ring buffer's
+        # consumers took the previous one or the display is due for a new one
+        last_display = 0.0
         while self.is_running:
-            ret, frame = cap.read()
-            
-            if not ret:
+            if not capture.grab():
                 self.connectionFailed.emit("Camera disconnected")
                 self.is_running = False # Stop loop
                 break # Exit loop
-            
-            if self.frame_buffer:
-                try:
-                    # Put a *copy* in the queue
-                    self.frame_buffer.put_nowait(frame.copy())
-                except queue.Full:
-                    # Queue is full, drop the frame
-                    # You could also drop the *oldest* frame first, then add
-                    try:
-                        self.frame_buffer.get_nowait() # Remove oldest
-                        self.frame_buffer.put_nowait(frame.copy()) # Add newest
-                    except queue.Empty:
-                        pass # Should not happen, but good to check
-                    
+
+            now = time.monotonic()
+            display_due = now - last_display >= self.display_interval
+            wanted = self.frame_buffer is not None and self.frame_buffer.wants_frame()
+            if not (display_due or wanted):
+                continue
+
+            # Decode straight into a free slot of the ring buffer
+            frame = capture.retrieve(self.frame_buffer)
+            if frame is None and display_due:
+                frame = capture.retrieve()  # Every slot is pinned, decode for display only
+            if frame is None or not display_due:
+                continue
+            last_display = now
                     
-                    # adding the captured frame as a Qimage and outputing in cameralist widget
+            # adding the captured frame as a Qimage and outputing in cameralist widget
             try:
                 rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 h, w, ch = rgb_image.shape
@@ -77,17 +79,9 @@ class CameraWorker(QObject):
             except Exception as e:
                 print(f"Error converting frame for display: {e}")
             
-            
-            # A short sleep to prevent the thread from
-            # hogging 100% CPU if the camera is fast.
-            # QThread.msleep(10) # ~100 fps max
-            
         # --- 3. Cleanup ---
-        if cap:
-            cap.release()
-        print(f"[{self.name}] Worker thread stopped.")
-        
-        QThread.msleep(10) # ~100 FPS cap, adjust as needed
+        capture.release()
+        print(f"[{self.name}] Worker thread stopped. Decoded {capture.decode_ratio():.0%} of frames.")
 
     def stop(self):
         """
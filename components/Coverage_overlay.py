@@ -0,0 +1,95 @@
+import numpy as np
+from PyQt6.QtWidgets import QGraphicsPixmapItem
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from components.Wall import WallItem
+from DataModel.coverage import DEFAULT_CELL_SIZE, CoverageGrid, CoverageMap
+
+# RGBA of floor cells seen by 0, 1, 2 and 3 or more cameras
+COVERAGE_COLORS = np.array([
+    [220, 40, 40, 110],   # Blind spot: red
+    [255, 200, 0, 50],    # One camera: yellow
+    [120, 220, 60, 60],   # Two cameras: light green
+    [40, 180, 80, 80],    # Three or more: green
+], dtype=np.uint8)
+
+
+class CoverageOverlay(QObject):
+    """
+    Heatmap of how many cameras see each cell of a FloorPlanScene, drawn
+    under the walls and cameras.
+
+    Follows the scene's FovScheduler: only the cameras it recomputed are
+    re-rasterized (CoverageMap keeps every camera's cells), and walls are
+    re-rasterized when they changed. 'reportChanged' carries the new
+    CoverageMap.report() after every update, e.g. the blind-spot area.
+    """
+    reportChanged = pyqtSignal(dict)
+
+    def __init__(self, scene, cell_size=DEFAULT_CELL_SIZE, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        rect = scene.sceneRect()
+        self.coverage = CoverageMap(CoverageGrid(rect.left(), rect.top(), rect.right(), rect.bottom(), cell_size))
+
+        # One pixel per cell, scaled up to the cell size
+        self.item = QGraphicsPixmapItem()
+        self.item.setPos(rect.left(), rect.top())
+        self.item.setScale(cell_size)
+        self.item.setZValue(-10)
+        self.item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self.colors = None
+        scene.addItem(self.item)
+
+        scene.fov_scheduler.fovsUpdated.connect(self.fovs_updated)
+        scene.fov_scheduler.cameraRemoved.connect(self.camera_removed)
+        self.rebuild()
+
+    def wall_segments(self):
+        wall_index = getattr(self.scene, "wall_index", None)
+        if wall_index is not None:
+            return [segment for segments in wall_index.owner_segments.values() for segment in segments]
+        return [segment for item in self.scene.items() if isinstance(item, WallItem)
+                for segment in item.scene_segments()]
+
+    def set_camera(self, camera):
+        if camera.fov_scene_points is not None:
+            self.coverage.set_camera(camera, camera.fov_scene_points, camera.rotation(),
+                                     camera.view_angle, camera.view_range)
+
+    def rebuild(self):
+        """Rasterize every wall and camera from scratch."""
+        self.coverage.clear()
+        self.coverage.set_walls(self.wall_segments())
+        for camera in self.scene.fov_scheduler.cameras:
+            self.set_camera(camera)
+        self.render()
+
+    def fovs_updated(self, cameras, walls_changed):
+        if walls_changed:
+            self.coverage.set_walls(self.wall_segments())
+        for camera in cameras:
+            self.set_camera(camera)
+        self.render()
+
+    def camera_removed(self, camera):
+        self.coverage.remove_camera(camera)
+        self.render()
+
+    def render(self):
+        coverage = self.coverage
+        colors = COVERAGE_COLORS[np.minimum(coverage.counts, len(COVERAGE_COLORS) - 1)]
+        colors[~coverage.area_mask()] = 0  # Transparent off the floor and on walls
+        rows, cols = coverage.grid.shape
+        self.colors = colors  # The image reads this buffer
+        image = QImage(colors.data, cols, rows, cols * 4, QImage.Format.Format_RGBA8888)
+        self.item.setPixmap(QPixmap.fromImage(image))
+        self.reportChanged.emit(coverage.report())
+
+    def detach(self):
+        """Stop following the scene and remove the heatmap from it."""
+        self.scene.fov_scheduler.fovsUpdated.disconnect(self.fovs_updated)
+        self.scene.fov_scheduler.cameraRemoved.disconnect(self.camera_removed)
+        if self.item.scene() is not None:
+            self.scene.removeItem(self.item)
@@ -0,0 +1,43 @@
+from PyQt6.QtWidgets import QGraphicsScene
+
+from DataModel.segment_grid import SegmentGrid
+from DataModel.coverage import DEFAULT_CELL_SIZE
+from components.Fov_scheduler import FovScheduler
+from components.Coverage_overlay import CoverageOverlay
+
+
+class FloorPlanScene(QGraphicsScene):
+    """
+    The floor plan scene. Keeps a uniform grid index of the scene edges of
+    every WallItem in it, which the walls update themselves whenever they
+    move, rotate or resize, so CameraItems only ray cast against the walls
+    within their view range. FOV updates of all cameras go through one
+    FovScheduler, so each camera recomputes at most once per event loop
+    tick and only when it or a wall in its view range changed. The
+    coverage heatmap (CoverageOverlay) can be shown on top of the floor.
+    """
+    def __init__(self, parent=None, wall_cell_size=64.0):
+        super().__init__(parent)
+        self.wall_index = SegmentGrid(wall_cell_size)
+        self.fov_scheduler = FovScheduler(self)
+        self.coverage = None  # CoverageOverlay while shown
+
+    def set_coverage_visible(self, visible, cell_size=DEFAULT_CELL_SIZE):
+        if visible and self.coverage is None:
+            self.coverage = CoverageOverlay(self, cell_size, self)
+        elif not visible and self.coverage is not None:
+            self.coverage.detach()
+            self.coverage.deleteLater()
+            self.coverage = None
+
+    def clear(self):
+        # Items deleted by clear() do not report leaving the scene
+        self.wall_index.clear()
+        self.fov_scheduler.clear()
+        if self.coverage is not None:
+            # Keep the heatmap item across the clear
+            self.removeItem(self.coverage.item)
+        super().clear()
+        if self.coverage is not None:
+            self.addItem(self.coverage.item)
+            self.coverage.rebuild()
@@ -0,0 +1,81 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from DataModel.fov_geometry import range_rect
+
+
+def rects_intersect(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class FovScheduler(QObject):
+    """
+    Coalesces FOV recomputations of all cameras in a scene.
+
+    Cameras that moved or rotated, and regions where walls changed, are
+    collected until control returns to the event loop; then every affected
+    camera recomputes its FOV once. A wall change only affects the cameras
+    whose view range overlaps the wall's old or new position.
+    'fovsUpdated' reports each flush (recomputed cameras, whether walls
+    changed) so views of the FOVs, like the coverage overlay, can follow.
+    """
+    fovsUpdated = pyqtSignal(list, bool)
+    cameraRemoved = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cameras = set()       # CameraItems in the scene
+        self.pending = set()       # Cameras due for recomputation
+        self.dirty_rects = []      # (x1, y1, x2, y2) scene regions where walls changed
+        self.scheduled = False
+        self.recomputations = 0
+
+    def add_camera(self, camera):
+        self.cameras.add(camera)
+        self.camera_changed(camera)
+
+    def remove_camera(self, camera):
+        self.cameras.discard(camera)
+        self.pending.discard(camera)
+        self.cameraRemoved.emit(camera)
+
+    def camera_changed(self, camera):
+        self.pending.add(camera)
+        self.schedule()
+
+    def region_changed(self, rect):
+        """Walls changed inside 'rect' (x1, y1, x2, y2)."""
+        self.dirty_rects.append(rect)
+        self.schedule()
+
+    def schedule(self):
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        """Recompute the FOV of every camera affected since the last flush."""
+        self.scheduled = False
+        dirty_rects, self.dirty_rects = self.dirty_rects, []
+        pending, self.pending = self.pending, set()
+
+        if dirty_rects:
+            for camera in self.cameras - pending:
+                pos = camera.scenePos()
+                view = range_rect((pos.x(), pos.y()), camera.view_range)
+                if any(rects_intersect(view, rect) for rect in dirty_rects):
+                    pending.add(camera)
+
+        updated = []
+        for camera in pending:
+            if camera.scene() is not None:
+                camera.updateFov()
+                updated.append(camera)
+        self.recomputations += len(updated)
+
+        if updated or dirty_rects:
+            self.fovsUpdated.emit(updated, bool(dirty_rects))
+
+    def clear(self):
+        self.cameras.clear()
+        self.pending.clear()
+        self.dirty_rects = []
@@ -6,6 +6,9 @@ class WallItem(QGraphicsRectItem):
     """
     A custom rectangular item that represents a wall.
     It can be rotated and resized using keyboard keys.
+    Its four edges in scene coordinates are cached and only recomputed
+    after the wall moves, rotates or is resized; the scene's wall index
+    is updated at the same time.
     """
     def __init__(self, x, y, width, height):
         # Call the sparent __init__ with the rectangle's geometry
@@ -24,11 +27,75 @@ class WallItem(QGraphicsRectItem):
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsFocusable) # CRITICAL: to receive key presses
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges) # Notify us of moves and rotations
+
+        self.segment_cache = None # Scene edges as (x1, y1, x2, y2), None when stale
         
         # --- Set rotation origin to the center ---
         # This makes rotation feel natural
         self.setTransformOriginPoint(0,0)
 
+    def scene_segments(self):
+        """
+        Return the wall's four edges in scene coordinates as (x1, y1, x2, y2).
+        """
+        if self.segment_cache is None:
+            # Map the 4 local corners to their *true* scene positions
+            transform = self.sceneTransform()
+            local_rect = self.rect()
+            corners = [transform.map(corner) for corner in (local_rect.topLeft(), local_rect.topRight(),
+                                                            local_rect.bottomRight(), local_rect.bottomLeft())]
+            self.segment_cache = [(corners[i].x(), corners[i].y(), corners[(i + 1) % 4].x(), corners[(i + 1) % 4].y())
+                                  for i in range(4)]
+        return self.segment_cache
+
+    def geometry_changed(self):
+        """
+        Drop the cached edges, re-index the wall in its scene and let the
+        cameras that could see its old or new position recompute their FOV.
+        """
+        old_segments = self.segment_cache
+        self.segment_cache = None
+        wall_index = getattr(self.scene(), "wall_index", None)
+        if wall_index is not None:
+            old_segments = wall_index.owner_segments.get(self, old_segments)
+            wall_index.update(self, self.scene_segments())
+        self.notify_cameras((old_segments or []) + self.scene_segments())
+
+    def notify_cameras(self, segments):
+        """Tell the scene's FOV scheduler that walls changed around 'segments'."""
+        fov_scheduler = getattr(self.scene(), "fov_scheduler", None)
+        if fov_scheduler is None or not segments:
+            return
+        xs = [x for x1, _, x2, _ in segments for x in (x1, x2)]
+        ys = [y for _, y1, _, y2 in segments for y in (y1, y2)]
+        fov_scheduler.region_changed((min(xs), min(ys), max(xs), max(ys)))
+
+    def setRect(self, *args):
+        super().setRect(*args)
+        self.geometry_changed()
+
+    def itemChange(self, change, value):
+        if change in (QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged,
+                      QGraphicsItem.GraphicsItemChange.ItemRotationHasChanged,
+                      QGraphicsItem.GraphicsItemChange.ItemScaleHasChanged,
+                      QGraphicsItem.GraphicsItemChange.ItemTransformHasChanged,
+                      QGraphicsItem.GraphicsItemChange.ItemTransformOriginPointHasChanged):
+            self.geometry_changed()
+
+        elif change == QGraphicsItem.GraphicsItemChange.ItemSceneChange:
+            # Leaving the current scene
+            if self.scene() is not None:
+                self.notify_cameras(self.scene_segments())
+            wall_index = getattr(self.scene(), "wall_index", None)
+            if wall_index is not None:
+                wall_index.remove(self)
+
+        elif change == QGraphicsItem.GraphicsItemChange.ItemSceneHasChanged:
+            self.geometry_changed()
+
+        return super().itemChange(change, value)
+
     def keyPressEvent(self, event):
         """
         This event handler is called when the item has focus and a key is pressed.
@@ -9,14 +9,22 @@ from components.Wall import WallItem
 from components.AddCamera_Dialog import AddCameraDialog
 from components.Camera_widget import CameraItem
 from components.Camera_list_widget import CameraFeedWidget
-import queue
+from components.Floor_plan_scene import FloorPlanScene
+from DataModel.frame_ring import FrameRing
+
+try:
+    from DataModel.DetectionSystem import DetectionSystem
+except ImportError as e:
+    # torch, ultralytics and deepface are only needed for detection, not for the floor plan
+    print(f"Warning: detection is unavailable ({e}).")
+    DetectionSystem = None
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         loadUi("./UIs/main.ui", self)
         
-        self.graphics_scene = QGraphicsScene()
+        self.graphics_scene = FloorPlanScene() # Indexes walls for FOV ray casting
         
         # test parameters
         self.is_running = True
@@ -29,7 +37,10 @@ class MainWindow(QMainWindow):
         
         # Adding the buffer dictionary for each 
         self.camera_buffers = {}
-        self.FRAME_BUFFER_SIZE = 10 # Max frames to hold per camera
+        self.FRAME_BUFFER_SIZE = 4 # Preallocated frame slots per camera
+
+        # One detection pipeline serves every buffer, started with the first camera
+        self.detection_system = None
 
         # 2. Tell your 'drag_area' (the QGraphicsView) to look at this new scene
         self.drag_area.setScene(self.graphics_scene)
@@ -51,7 +62,27 @@ class MainWindow(QMainWindow):
         self.add_wall_btn.clicked.connect(self.add_a_wall)
         self.save_map_btn.clicked.connect(self.save_layout)
         self.load_map_btn.clicked.connect(self.load_layout)
+        self.coverage_btn.toggled.connect(self.toggle_coverage)
     
+    def toggle_coverage(self, checked):
+        """
+        Shows or hides the coverage heatmap of the floor plan and reports
+        the blind-spot area in the status bar while it is shown.
+        """
+        self.graphics_scene.set_coverage_visible(checked)
+        if self.graphics_scene.coverage is not None:
+            self.graphics_scene.coverage.reportChanged.connect(self.show_coverage_report)
+            self.show_coverage_report(self.graphics_scene.coverage.coverage.report())
+        else:
+            self.statusBar().clearMessage()
+
+    def show_coverage_report(self, report):
+        self.statusBar().showMessage(
+            f"Coverage: {report['coverage']:.0%} of the floor, "
+            f"blind spots: {report['blind_spot_area']:.0f} px², "
+            f"seen by 2+ cameras: {report['overlap_area']:.0f} px²"
+        )
+
     def add_a_wall(self):
         wall = WallItem(30,30,150,10)
         self.drag_area.scene().addItem(wall)
@@ -94,11 +125,12 @@ class MainWindow(QMainWindow):
         
         # --- 3. Create a new buffer for this camera ---
         if name not in self.camera_buffers:
-            frame_buffer = queue.Queue(maxsize=self.FRAME_BUFFER_SIZE)
+            frame_buffer = FrameRing(slots=self.FRAME_BUFFER_SIZE)
             self.camera_buffers[name] = frame_buffer
         else:
             # This case should ideally not happen if names are unique
             frame_buffer = self.camera_buffers[name]
+        self.start_detection()
         
         # 1. Create and add LIST item (CameraFeedWidget)
         print(f"Creating feed widget for {name}")
@@ -126,6 +158,29 @@ class MainWindow(QMainWindow):
         self.graphics_scene.addItem(cam_item)
         self.scene_cameras[name] = cam_item
         
+    def start_detection(self):
+        """
+        Starts the DetectionSystem over self.camera_buffers the first time a
+        camera is created. It watches the dict itself, so cameras added or
+        removed later are picked up without restarting it.
+        """
+        if self.detection_system is not None or DetectionSystem is None:
+            return
+
+        try:
+            self.detection_system = DetectionSystem(camera_buffers=self.camera_buffers)
+            self.detection_system.start()
+        except Exception as e:
+            print(f"Error starting detection: {e}")
+            if self.detection_system is not None:
+                self.detection_system.stop()
+            self.detection_system = None
+
+    def stop_detection(self):
+        if self.detection_system is not None:
+            self.detection_system.stop()
+            self.detection_system = None
+
     def save_layout(self):
         """
         Saves the current scene layout to a JSON file.
@@ -233,13 +288,9 @@ class MainWindow(QMainWindow):
         self.scene_walls.clear()
         
         # --- 5. Clear the buffers ---
-        # Empty all queues and clear the dictionary
-        for q in self.camera_buffers.values():
-            while not q.empty():
-                try:
-                    q.get_nowait()
-                except queue.Empty:
-                    pass
+        # Free all frame rings and clear the dictionary
+        for ring in self.camera_buffers.values():
+            ring.clear()
         self.camera_buffers.clear()
 
         self.cam_list.clear()
@@ -255,6 +306,7 @@ class MainWindow(QMainWindow):
         when you close the main window.
         """
         print("Window closing, stopping all camera feeds...")
+        self.stop_detection()
         for widget in self.feed_widgets:
             widget.stop_feed()
         
@@ -303,19 +355,22 @@ class MainWindow(QMainWindow):
             return
 
         window_name = f"Buffer Feed: {camera_name} (Press 'q' to close)"
+        last_seq = -1
 
         while self.is_running:
             try:
                 # Wait up to 1 second for a new frame
-                frame = buffer.get(timeout=1.0)
+                seq, frame = buffer.get_latest(last_seq, timeout=1.0)
                 
-                # We got a frame, display it
-                cv2.imshow(window_name, frame)
+                if seq is None:
+                    # No frame in 1 second, just loop again
+                    print(f"[{camera_name} buffer] No new frame...")
+                else:
+                    # We got a frame, display it and hand the slot back
+                    cv2.imshow(window_name, frame)
+                    buffer.release(seq)
+                    last_seq = seq
 
-            except queue.Empty:
-                # No frame in 1 second, just loop again
-                print(f"[{camera_name} buffer] No new frame...")
-                pass # Just continue the loop
             except Exception as e:
                 print(f"Error in buffer test thread: {e}")
                 break
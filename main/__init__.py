@@ -0,0 +1,8 @@
+import os
+import sys
+
+# DataModel modules import their siblings by bare name, so they also run as
+# scripts (python DataModel/placement.py); the app puts DataModel on the path
+DATA_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "DataModel")
+if DATA_MODEL_DIR not in sys.path:
+    sys.path.append(DATA_MODEL_DIR)